@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+无界面批量模体分析
+
+按实验中保存的 phantom_analysis 参数，对每个实验的图像并行执行分析，
+结果写回实验JSON的 phantom_analysis["results"]。
+
+示例:
+    python batch_analysis.py                      # 分析所有已配置图像的实验
+    python batch_analysis.py --center 天津肿瘤医院 --workers 4
+    python batch_analysis.py --model-type 均匀模体 --force
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from src.models.repositories.experiment_repository import ExperimentRepository
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("batch_analysis")
+
+
+def _analyze_one(image_file, params, use_cache=True):
+    """
+    在子进程中分析单个实验（必须是模块级函数才能被进程池序列化）
+
+    Returns:
+        (results, elapsed, cached_categories, error)
+    """
+    from src.models.analysis.image_io import load_image_volume, series_source
+    from src.models.analysis.phantom_analyzer import PhantomAnalyzer
+    from src.models.analysis.results_cache import AnalysisResultsCache
+
+    start = time.perf_counter()
+    try:
+        cache = AnalysisResultsCache() if use_cache else None
+        source, cached, missing = None, {}, None
+        if cache is not None:
+            series_uid, files = series_source(image_file)
+            source = cache.source_fingerprint(series_uid, files)
+            cached, missing = cache.lookup(source, params)
+
+        if missing == [] and cached:
+            return cached, time.perf_counter() - start, len(cached), None
+
+        volume, spacing, _ = load_image_volume(image_file)
+        fresh = PhantomAnalyzer().analyze(volume, params, spacing, categories=missing, cached=cached)
+        if source is not None:
+            cache.store(source, params, fresh)
+
+        results = dict(cached)
+        results.update(fresh)
+        return results, time.perf_counter() - start, len(cached), None
+    except Exception as e:
+        return None, time.perf_counter() - start, 0, str(e)
+
+
+def select_experiments(experiments, center=None, model_type=None, ids=None):
+    """筛选出配置了有效图像路径的实验"""
+    selected = []
+    for exp in experiments:
+        if ids and exp.id not in ids:
+            continue
+        if center and center not in (exp.center or ""):
+            continue
+        if model_type and model_type not in (exp.model_type or ""):
+            continue
+
+        image_file = exp.parameters.get("phantom_analysis", {}).get("image_file", "")
+        if not image_file:
+            continue
+        if not os.path.exists(image_file):
+            logger.warning(f"图像不存在，跳过实验 {exp.name}: {image_file}")
+            continue
+        selected.append(exp)
+    return selected
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="批量执行模体分析并写回实验文件")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument("--center", help="只分析该中心的实验（包含匹配）")
+    parser.add_argument("--model-type", help="只分析该模体类型的实验（包含匹配）")
+    parser.add_argument("--ids", nargs="*", help="只分析指定ID的实验")
+    parser.add_argument("--force", action="store_true", help="忽略结果缓存，全部重新计算")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    repository = ExperimentRepository()
+    experiments = select_experiments(repository.get_all(), args.center, args.model_type, args.ids)
+    if not experiments:
+        logger.info("没有需要分析的实验")
+        return 0
+
+    workers = max(1, min(args.workers, len(experiments)))
+    logger.info(f"开始批量分析 {len(experiments)} 个实验，进程数 {workers}")
+
+    start = time.perf_counter()
+    done, failed, cached_total = 0, 0, 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # {future: 实验对象}，复制的实验文件可能共用ID，结果按对象写回
+        futures = {}
+        for exp in experiments:
+            params = exp.parameters.get("phantom_analysis", {})
+            params.setdefault("analysis_type", "Uniform")
+            # 旧结果不参与计算，也不必传给子进程
+            job_params = {k: v for k, v in params.items() if k != "results"}
+            futures[executor.submit(_analyze_one, params["image_file"], job_params, not args.force)] = exp
+
+        for future in as_completed(futures):
+            results, elapsed, cached, error = future.result()
+            exp = futures[future]
+            done += 1
+            if error:
+                failed += 1
+                logger.error(f"[{done}/{len(experiments)}] 分析失败 {exp.name}: {error}")
+                continue
+
+            # 写回在主进程中串行进行，避免多个进程同时改写实验文件
+            analysis = exp.parameters.setdefault("phantom_analysis", {})
+            analysis["results"] = results
+            analysis["analyzed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                repository.save(exp)
+            except Exception as e:
+                failed += 1
+                logger.error(f"保存实验失败 {exp.name}: {e}")
+                continue
+
+            cached_total += cached
+            source = "缓存" if cached and cached == len(results) else "计算"
+            logger.info(f"[{done}/{len(experiments)}] {exp.name} 完成 ({source}, {elapsed:.2f}s)")
+
+    total_time = time.perf_counter() - start
+    succeeded = done - failed
+    rate = succeeded / total_time * 60.0 if total_time > 0 else 0.0
+    logger.info(f"批量分析结束: 成功 {succeeded}，失败 {failed}，耗时 {total_time:.1f}s，"
+                f"吞吐量 {rate:.1f} 序列/分钟，缓存复用 {cached_total} 类结果")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+实验列表表格基准测试
+
+生成大量合成实验（不写盘），测量列式存储加载、虚拟化表格模型的首屏渲染、逐字输入
+搜索时的过滤+刷新以及单列/多列排序的耗时；可选地在较小规模上对比原来为每个单元格创建
+QTableWidgetItem 的做法。
+
+用法:
+    python benchmarks/bench_experiment_table.py
+    python benchmarks/bench_experiment_table.py --rows 100000 --legacy-rows 20000 --json table.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+
+from src.core.constants import PHANTOM_TYPES, DEVICE_MODELS, ISOTOPE_LIST
+from src.models.entities.experiment import Experiment
+from src.models.listing.store import ExperimentListStore
+from src.views.common.widgets.experiment_table_model import ExperimentTableModel
+
+CENTERS = ("天津肿瘤医院", "复旦肿瘤医院", "解放军总医院第一医学中心", "首都医科大学附属北京天坛医院",
+           "中山大学肿瘤防治中心", "四川大学华西医院", "浙江大学医学院附属第一医院", "武汉协和医院")
+COLUMNS = [("name", "实验名称"), ("center", "中心名称"), ("date", "日期"), ("model_type", "模体类型"),
+           ("isotope", "核素"), ("device_model", "设备型号"), ("remark", "备注")]
+# 模拟逐字输入的搜索词
+QUERIES = ("天", "天津", "天津肿", "NEMA", "ga-68", "Hoff", "备注1")
+
+
+def synthetic_experiments(count, seed=0):
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 3 * 365, count)
+    experiments = []
+    for i in range(count):
+        center = CENTERS[i % len(CENTERS)]
+        date = np.datetime64("2023-01-01") + int(days[i])
+        experiments.append(Experiment(
+            name=f"实验{i:06d}-{center[:2]}",
+            center=center,
+            model_type=PHANTOM_TYPES[i % len(PHANTOM_TYPES)],
+            created_at=f"{date}T{i % 24:02d}:{i % 60:02d}:00",
+            parameters={"isotope": ISOTOPE_LIST[i % len(ISOTOPE_LIST)],
+                        "device_model": DEVICE_MODELS[i % len(DEVICE_MODELS)],
+                        "remark": f"备注{i % 97}"},
+            experiment_id=f"exp-{i:06d}"))
+    return experiments
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def render(app, view):
+    """处理事件并把视口绘制到图像，迫使视图请求所有可见单元格"""
+    app.processEvents()
+    view.viewport().grab()
+
+
+def bench_model(app, experiments):
+    results = {}
+    results["store_load"], store = timed(lambda: ExperimentListStore(experiments))
+    model = ExperimentTableModel(store, COLUMNS)
+    view = QTableView()
+    view.resize(1200, 800)
+    view.setModel(model)
+    view.setSortingEnabled(True)
+    view.show()
+    results["first_render"], _ = timed(lambda: render(app, view))
+
+    keystrokes = []
+    for query in QUERIES:
+        seconds, _ = timed(lambda: (model.set_rows(store.search(query)), render(app, view)))
+        keystrokes.append({"query": query, "seconds": seconds, "rows": model.rowCount()})
+    results["filter"] = keystrokes
+    results["filter_mean"] = float(np.mean([k["seconds"] for k in keystrokes]))
+    model.reset()
+
+    results["sort_first"], _ = timed(lambda: (model.sort(0, Qt.DescendingOrder), render(app, view)))
+    results["sort_cached"], _ = timed(lambda: (model.sort(0, Qt.AscendingOrder), render(app, view)))
+    # 名称之后再按日期排序：日期为主排序键、名称为次排序键
+    results["sort_date"], _ = timed(lambda: (model.sort(2, Qt.DescendingOrder), render(app, view)))
+    model.set_rows(store.search(QUERIES[1]))
+    results["sort_filtered"], _ = timed(lambda: (model.set_rows(store.search(QUERIES[0])), render(app, view)))
+    view.close()
+    return results
+
+
+def bench_legacy(app, experiments):
+    """原实现：每个实验7个 QTableWidgetItem，每次过滤整体重建"""
+    table = QTableWidget()
+    table.setColumnCount(len(COLUMNS))
+    table.resize(1200, 800)
+    table.show()
+
+    def populate(items):
+        table.setRowCount(len(items))
+        for row, exp in enumerate(items):
+            values = (exp.name, exp.center, exp.date, exp.model_type, exp.parameters.get("isotope", ""),
+                      exp.parameters.get("device_model", ""), exp.parameters.get("remark", ""))
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(value))
+        render(app, table)
+
+    results = {}
+    results["first_render"], _ = timed(lambda: populate(experiments))
+    query = QUERIES[0].lower()
+    results["filter"], _ = timed(lambda: populate([e for e in experiments if query in e.name.lower()
+                                                   or query in e.center.lower()]))
+    table.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="实验列表表格基准测试")
+    parser.add_argument("--rows", type=int, default=100000, help="合成实验数")
+    parser.add_argument("--legacy-rows", type=int, default=10000, help="QTableWidget 对比的实验数，0 表示跳过")
+    parser.add_argument("--json", help="结果输出为JSON文件")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    seconds, experiments = timed(lambda: synthetic_experiments(args.rows))
+    print(f"生成 {args.rows} 个合成实验: {seconds:.2f}s")
+
+    model = bench_model(app, experiments)
+    print(f"\n虚拟化模型（{args.rows} 行）")
+    print(f"  存储加载        {model['store_load']:.3f}s")
+    print(f"  首屏渲染        {model['first_render']:.3f}s")
+    for k in model["filter"]:
+        print(f"  搜索 {k['query']!r:<10} {k['seconds']:.3f}s  {k['rows']} 行")
+    print(f"  按名称排序      {model['sort_first']:.3f}s（计算排序键） / {model['sort_cached']:.3f}s（缓存）")
+    print(f"  按日期+名称排序 {model['sort_date']:.3f}s")
+    print(f"  排序状态下搜索  {model['sort_filtered']:.3f}s（缓存的多列顺序）")
+
+    results = {"rows": args.rows, "model": model}
+    if args.legacy_rows:
+        legacy = bench_legacy(app, experiments[:args.legacy_rows])
+        results["legacy"] = dict(legacy, rows=args.legacy_rows)
+        print(f"\nQTableWidget（{args.legacy_rows} 行）")
+        print(f"  首屏渲染        {legacy['first_render']:.3f}s")
+        print(f"  一次搜索        {legacy['filter']:.3f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
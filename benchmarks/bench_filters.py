@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+平滑滤波基准测试
+
+在随机体数据上比较高斯滤波的 separable 直接卷积与 FFT 两条路径：逐个FWHM
+测量耗时和最大差异，给出FFT开始更快的核长度（对应 filters.FFT_CROSSOVER_TAPS），
+报告各滤波器在 auto 模式下分块处理整个体的耗时，并检查分块结果与整体滤波一致。
+
+用法:
+    python benchmarks/bench_filters.py
+    python benchmarks/bench_filters.py --shape 64 256 256 --fwhm 2 4 8 16 32 64
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.reconstruction.filters import (
+    FILTER_TYPES, FFT_CROSSOVER_TAPS, SQRT_8LN2, filter_volume, gaussian_kernel
+)
+
+# 分块与整体滤波的允许差异：FFT长度随块长变化，只有单精度舍入误差
+CHUNK_TOLERANCE = 1e-5
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_gaussian(volume, fwhm_list, repeat):
+    results = []
+    for fwhm in fwhm_list:
+        taps = gaussian_kernel(fwhm / SQRT_8LN2).size
+        direct = filter_volume(volume, (1, 1, 1), "Gaussian", fwhm, method="direct")
+        fft = filter_volume(volume, (1, 1, 1), "Gaussian", fwhm, method="fft")
+        results.append({
+            "fwhm": fwhm,
+            "taps": taps,
+            "direct": best_time(lambda: filter_volume(volume, (1, 1, 1), "Gaussian", fwhm, method="direct"), repeat),
+            "fft": best_time(lambda: filter_volume(volume, (1, 1, 1), "Gaussian", fwhm, method="fft"), repeat),
+            "max_diff": float(np.abs(direct - fft).max())
+        })
+    return results
+
+
+def chunk_max_diff(volume, kind, fwhm, chunk_slices):
+    """小块分块与整体一次滤波的最大差异"""
+    chunked = filter_volume(volume, (1, 1, 1), kind, fwhm, chunk_slices=chunk_slices)
+    whole = filter_volume(volume, (1, 1, 1), kind, fwhm, chunk_slices=volume.shape[0])
+    return float(np.abs(chunked - whole).max())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="平滑滤波基准测试")
+    parser.add_argument("--shape", type=int, nargs=3, default=[64, 192, 192], help="体数据尺寸 z y x")
+    parser.add_argument("--fwhm", type=float, nargs="+", default=[2, 4, 8, 12, 16, 24, 32, 48],
+                        help="FWHM（体素）")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk", type=int, default=7, help="一致性检查的分块层数")
+    parser.add_argument("--json", help="结果输出为JSON文件")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    volume = rng.random(tuple(args.shape), dtype=np.float32)
+
+    gaussian = run_gaussian(volume, args.fwhm, args.repeat)
+    print(f"{'FWHM':>6} {'核长度':>6} {'直接s':>8} {'FFTs':>8} {'最大差异':>10}")
+    for r in gaussian:
+        faster = "FFT" if r["fft"] < r["direct"] else "直接"
+        print(f"{r['fwhm']:>6.1f} {r['taps']:>6} {r['direct']:>8.3f} {r['fft']:>8.3f} {r['max_diff']:>10.2e}  {faster}")
+
+    crossover = next((r["taps"] for r in gaussian if r["fft"] < r["direct"]), None)
+    if crossover is None:
+        print(f"测试范围内直接卷积始终更快（当前阈值 {FFT_CROSSOVER_TAPS}）")
+    else:
+        print(f"FFT 在核长度 {crossover} 时开始更快（当前阈值 {FFT_CROSSOVER_TAPS}）")
+
+    filters = {}
+    mismatched = []
+    print(f"\n{'滤波器':>12} {'auto耗时s':>10} {'分块差异':>10}  (FWHM 4 体素，分块 {args.chunk} 层)")
+    for kind in FILTER_TYPES:
+        seconds = best_time(lambda: filter_volume(volume, (1, 1, 1), kind, 4.0), args.repeat)
+        diff = chunk_max_diff(volume, kind, 4.0, args.chunk)
+        filters[kind] = {"seconds": seconds, "chunk_max_diff": diff}
+        print(f"{kind:>12} {seconds:>10.3f} {diff:>10.2e}")
+        if diff > CHUNK_TOLERANCE:
+            mismatched.append(kind)
+    if mismatched:
+        print(f"分块结果与整体滤波不一致: {', '.join(mismatched)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"shape": args.shape, "gaussian": gaussian, "crossover_taps": crossover,
+                       "filters": filters}, f, ensure_ascii=False, indent=2)
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+序列重建基准测试套件
+
+用合成的均匀圆柱、NEMA IQ 和 Hoffman 脑模体，在多个图像尺寸下生成正弦图和列表模式
+文件，逐阶段计时：列表模式写入、分帧、系统矩阵构建、正/反投影、OSEM迭代、校正
+（随机符合、散射、衰减、衰变）、平滑滤波、DICOM 写出，以及对重建结果的模体分析。
+结果输出为JSON，可与之前保存的基线比较，任一阶段变慢超过阈值时以非零状态退出。
+
+用法:
+    python benchmarks/run_benchmarks.py --json results.json
+    python benchmarks/run_benchmarks.py --sizes 64 128 256 --phantoms "NEMA IQ"
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.constants import HALF_LIFE_TABLE
+from src.models.reconstruction.projector import SystemMatrix
+from src.models.reconstruction.osem import OSEMReconstructor
+from src.models.reconstruction.listmode import ListModeFile, write_synthetic_listmode
+from src.models.reconstruction.corrections import CorrectionPipeline, attenuation_acf
+from src.models.reconstruction.filters import filter_volume
+from src.models.reconstruction.phantoms import uniform_disk, nema_iq_slice, hoffman_slice
+from src.models.analysis.phantom_analyzer import PhantomAnalyzer
+
+RESULTS_VERSION = 1
+# 模体名称与 PHANTOM_TYPES 一致
+PHANTOMS = {
+    "Uniform Cylinder": lambda size, fov_mm: uniform_disk(size, radius=100.0 / (fov_mm / 2.0)),
+    "NEMA IQ": nema_iq_slice,
+    "Hoffman Brain": hoffman_slice
+}
+# 各模体的分析参数和记录的代表性指标 (类别, 指标)；ROI半径单位为mm，中心取图像中心
+ANALYSIS_SETTINGS = {
+    "Uniform Cylinder": ({"analysis_type": "Uniform", "roi_settings": {"radius": 75.0, "background_radius": 95.0}},
+                         ("uniformity", "integral_uniformity")),
+    "NEMA IQ": ({"analysis_type": "NEMA-IQ", "roi_settings": {"radius": 80.0, "background_radius": 105.0},
+                 "sphere_settings": {"hot_sphere_ratio": 4.0}},
+                ("recovery_coefficients", "sphere_37mm")),
+    "Hoffman Brain": ({"analysis_type": "Hoffman", "hoffman_settings": {"expected_ratio": 4.0}},
+                      ("contrast", "contrast_recovery"))
+}
+# 合成数据的视野直径（mm）和核素
+FOV_MM = 300.0
+ISOTOPE = "F-18"
+# 水的线性衰减系数（1/mm，511 keV）
+MU_WATER = 0.0096
+# 延迟符合占总事件数的比例，即时符合中混入同样多的随机符合
+DELAYED_FRACTION = 0.1
+# 比较基线时忽略绝对差小于该值（秒）的变化，避免计时噪声误报
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def best_time(func, repeat):
+    """多次运行取最短耗时，返回 (耗时, 最后一次的返回值)"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def normalized_rmse(image, truth, mask):
+    """视野内按总量归一化后的RMSE（相对真值均方根）"""
+    a = image[mask] / max(image[mask].sum(), 1e-12)
+    b = truth[mask] / max(truth[mask].sum(), 1e-12)
+    return float(np.sqrt(np.mean((a - b) ** 2)) / np.sqrt(np.mean(b ** 2)))
+
+
+def run_case(phantom, size, args, workdir):
+    """一个模体、一个尺寸的全部阶段，返回 {阶段: 记录}"""
+    stages = {}
+
+    def record(stage, seconds, **extra):
+        stages[stage] = dict(seconds=seconds, **extra)
+
+    truth = PHANTOMS[phantom](size, FOV_MM)
+    pixel_size = FOV_MM / size
+    half_life_s = HALF_LIFE_TABLE[ISOTOPE] * 60.0
+
+    seconds, system = best_time(lambda: SystemMatrix(size, size, size, subsets=args.subsets,
+                                                     pixel_size=pixel_size, bin_size=pixel_size), args.repeat)
+    record("system_matrix", seconds, nnz=int(system.matrix.nnz), matrix_mb=system.nbytes() / 1e6)
+
+    seconds, sinogram = best_time(lambda: system.forward(truth), args.repeat)
+    record("forward_projection", seconds)
+    seconds, _ = best_time(lambda: system.back(sinogram), args.repeat)
+    record("back_projection", seconds)
+
+    # 列表模式：计数率随F-18衰变。模拟与重建的校正模型一致：真符合按水的 ACF 衰减，
+    # 即时符合中混入与延迟窗期望相同的均匀随机符合（不模拟散射）
+    mumap = (truth > 0).astype(np.float32) * MU_WATER
+    trues = sinogram / attenuation_acf(system, mumap)
+    prompts = ((1.0 - 2.0 * DELAYED_FRACTION) / (1.0 - DELAYED_FRACTION) * trues / trues.sum()
+               + DELAYED_FRACTION / (1.0 - DELAYED_FRACTION) / trues.size)
+    lm_path = os.path.join(workdir, f"{size}.lm")
+    duration = args.frames * args.frame_duration
+    count_rate = args.counts / duration
+    seconds, _ = best_time(lambda: write_synthetic_listmode(lm_path, prompts, duration, count_rate,
+                                                            delayed_fraction=DELAYED_FRACTION,
+                                                            half_life=half_life_s), 1)
+    record("listmode_write", seconds, events=len(ListModeFile(lm_path)),
+           mb=os.path.getsize(lm_path) / 1e6)
+
+    seconds, framed = best_time(lambda: ListModeFile(lm_path).bin_frames(args.frame_duration, args.frames),
+                                args.repeat)
+    record("framing", seconds, frames=args.frames)
+
+    # 校正：与重建流水线相同，从磁盘上的分帧正弦图计算
+    paths = {"prompts": os.path.join(workdir, f"{size}_prompts.npy"),
+             "delayeds": os.path.join(workdir, f"{size}_delayeds.npy")}
+    np.save(paths["prompts"], framed["prompts"])
+    np.save(paths["delayeds"], framed["delayeds"])
+    params = {"random_correction": True, "scatter_correction": True,
+              "attenuation_correction": True, "decay_correction": True}
+    corrections = CorrectionPipeline(params, half_life_min=HALF_LIFE_TABLE[ISOTOPE], mumap=mumap)
+    seconds, terms = best_time(lambda: corrections.prepare(paths, system, workdir), args.repeat)
+    record("corrections", seconds)
+
+    # OSEM：重建一帧，记录每次迭代耗时和最终误差
+    recon = OSEMReconstructor(system)
+    additive = np.load(terms["additive"], mmap_mode="r")
+    multiplicative = np.load(terms["multiplicative"])
+    frame = args.frames // 2
+    iteration_times = []
+    last = [time.perf_counter()]
+
+    def on_iteration(iteration, image):
+        now = time.perf_counter()
+        iteration_times.append(now - last[0])
+        last[0] = now
+
+    image = recon.reconstruct(framed["prompts"][frame], args.iterations, additive=additive[frame],
+                              multiplicative=multiplicative, callback=on_iteration)
+    mask = recon.fov_mask.reshape(size, size)
+    record("osem_iteration", float(np.min(iteration_times)), iterations=args.iterations,
+           subsets=system.subsets, rmse=normalized_rmse(image, truth, mask))
+
+    # 衰变校正和平滑作用在整个动态堆栈上
+    osem_path = os.path.join(workdir, f"{size}_osem.npy")
+    images_path = os.path.join(workdir, f"{size}_recon.npy")
+    np.save(osem_path, np.repeat(image[None], args.frames, axis=0))
+    frames = {"frame_starts": framed["frame_starts"].tolist(),
+              "frame_durations": framed["frame_durations"].tolist(), "scan_start": 0.0}
+    seconds, _ = best_time(lambda: corrections.apply_decay(osem_path, images_path, frames), args.repeat)
+    record("decay_correction", seconds)
+
+    stack = np.load(images_path)
+    seconds, smoothed = best_time(lambda: filter_volume(stack, (1.0, pixel_size, pixel_size), "Gaussian",
+                                                        args.fwhm, axes=(1, 2)), args.repeat)
+    record("filtering", seconds, fwhm=args.fwhm)
+
+    try:
+        from src.models.reconstruction.dicom_writer import write_series
+        import pydicom  # noqa: F401
+    except ImportError:
+        record("dicom_write", None, skipped="未安装 pydicom")
+    else:
+        info = {"series_description": f"benchmark {phantom}", "pixel_size": pixel_size,
+                "isotope": ISOTOPE, "half_life_min": HALF_LIFE_TABLE[ISOTOPE], "decay_corrected": True}
+        dicom_dir = os.path.join(workdir, f"{size}_dicom")
+        seconds, _ = best_time(lambda: write_series(smoothed, frames, dicom_dir, info), args.repeat)
+        record("dicom_write", seconds, images=args.frames)
+
+    # 模体分析：把平滑后的堆栈当作层厚等于像素尺寸的体数据，每次用新的分析器（不复用ROI缓存）
+    params, (category, metric) = ANALYSIS_SETTINGS[phantom]
+    params = json.loads(json.dumps(params))
+    params.setdefault("roi_settings", {}).update(center_x=(size - 1) / 2.0, center_y=(size - 1) / 2.0)
+    spacing = (pixel_size, pixel_size, pixel_size)
+    seconds, analysis = best_time(lambda: PhantomAnalyzer().analyze(smoothed, params, spacing), args.repeat)
+    record("phantom_analysis", seconds, analysis_type=params["analysis_type"],
+           **{metric: analysis[category][metric]})
+    return stages
+
+
+def environment():
+    """结果文件中的运行环境信息，便于判断不同基线是否可比"""
+    import scipy
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    与基线逐阶段比较
+
+    Returns:
+        [(模体, 尺寸, 阶段, 基线耗时, 当前耗时, 比值)]，只含变慢超过阈值的阶段
+    """
+    regressions = []
+    for key, stages in results["cases"].items():
+        base_stages = baseline.get("cases", {}).get(key)
+        if base_stages is None:
+            continue
+        for stage, entry in stages.items():
+            old = base_stages.get(stage, {}).get("seconds")
+            new = entry.get("seconds")
+            if not old or new is None:
+                continue
+            ratio = new / old
+            if ratio > 1.0 + threshold and new - old > MIN_REGRESSION_SECONDS:
+                phantom, size = key.rsplit("@", 1)
+                regressions.append((phantom, int(size), stage, old, new, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="序列重建基准测试套件")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128], help="图像边长（像素）")
+    parser.add_argument("--phantoms", nargs="+", default=list(PHANTOMS), choices=list(PHANTOMS))
+    parser.add_argument("--frames", type=int, default=12, help="动态帧数")
+    parser.add_argument("--frame-duration", type=float, default=10.0, help="帧时长（秒）")
+    parser.add_argument("--counts", type=float, default=2e6, help="列表模式总事件数（期望值）")
+    parser.add_argument("--iterations", type=int, default=4)
+    parser.add_argument("--subsets", type=int, default=16)
+    parser.add_argument("--fwhm", type=float, default=4.0, help="平滑滤波FWHM（mm）")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="结果输出为JSON文件")
+    parser.add_argument("--compare", help="与基线JSON比较")
+    parser.add_argument("--threshold", type=float, default=0.25, help="判定变慢的相对阈值")
+    args = parser.parse_args(argv)
+
+    results = {"version": RESULTS_VERSION, "environment": environment(),
+               "settings": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+               "cases": {}}
+    with tempfile.TemporaryDirectory(prefix="rebuild_bench_") as workdir:
+        for phantom in args.phantoms:
+            for size in args.sizes:
+                stages = run_case(phantom, size, args, workdir)
+                results["cases"][f"{phantom}@{size}"] = stages
+                print(f"\n{phantom} {size}x{size}")
+                for stage, entry in stages.items():
+                    seconds = entry["seconds"]
+                    extra = "  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}"
+                                      for k, v in entry.items() if k != "seconds")
+                    text = "跳过" if seconds is None else f"{seconds:.4f}s"
+                    print(f"  {stage:<20} {text:>10}  {extra}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if not regressions:
+            print(f"\n与基线 {args.compare} 相比没有超过 {args.threshold:.0%} 的变慢")
+            return 0
+        print(f"\n与基线 {args.compare} 相比变慢超过 {args.threshold:.0%} 的阶段:")
+        for phantom, size, stage, old, new, ratio in regressions:
+            print(f"  {phantom} {size}: {stage} {old:.4f}s -> {new:.4f}s (x{ratio:.2f})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,7 @@ import sys
 import os
 import logging
 from PyQt5.QtWidgets import QApplication
-from src.viewmodels.main_viewmodel import MainViewModel
+from src.core.app_context import AppContext
 from src.views.main.main_window import MainWindow
 
 # 配置日志
@@ -25,11 +25,11 @@ if __name__ == "__main__":
     # 创建应用程序
     app = QApplication(sys.argv)
     
-    # 创建ViewModel
-    viewmodel = MainViewModel()
+    # 创建共享的应用上下文（仓库、ViewModel），实验目录只扫描一次
+    context = AppContext.instance()
     
     # 创建主窗口
-    window = MainWindow()
+    window = MainWindow(context)
     window.show()
     
     # 运行应用程序
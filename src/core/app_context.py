@@ -0,0 +1,68 @@
+# src/core/app_context.py
+
+import logging
+from typing import Optional
+
+from ..models.repositories.experiment_repository import ExperimentRepository
+from ..models.services.export_service import ExportService
+from ..viewmodels.main_viewmodel import MainViewModel
+from ..viewmodels.tabs.experiment_list_viewmodel import ExperimentListViewModel
+
+logger = logging.getLogger(__name__)
+
+
+class AppContext:
+    """应用级依赖容器
+
+    持有唯一的实验仓库（含内存缓存）、导出服务和 ViewModel，界面各处通过
+    AppContext.instance() 取得共享实例，而不是各自构造 MainViewModel 或仓库（每次构造
+    都会重新扫描实验目录）。ViewModel 在首次访问时创建，实验目录只在启动时扫描一次，
+    之后的创建、保存和删除只更新仓库缓存和列表存储。
+    """
+
+    _instance: Optional["AppContext"] = None
+
+    def __init__(self, experiment_repository: Optional[ExperimentRepository] = None,
+                 export_service: Optional[ExportService] = None):
+        self.experiment_repository = experiment_repository or ExperimentRepository()
+        self.export_service = export_service or ExportService()
+        self._main_viewmodel: Optional[MainViewModel] = None
+        self._experiment_list_viewmodel: Optional[ExperimentListViewModel] = None
+
+    @classmethod
+    def instance(cls) -> "AppContext":
+        """全局共享的上下文，首次调用时创建"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def set_instance(cls, context: Optional["AppContext"]):
+        """替换全局上下文（None 表示清除，下次 instance() 时重新创建）"""
+        cls._instance = context
+
+    @property
+    def main_viewmodel(self) -> MainViewModel:
+        if self._main_viewmodel is None:
+            self._main_viewmodel = MainViewModel(self.experiment_repository, self.export_service)
+            self._connect_viewmodels()
+        return self._main_viewmodel
+
+    @property
+    def experiment_list_viewmodel(self) -> ExperimentListViewModel:
+        if self._experiment_list_viewmodel is None:
+            self._experiment_list_viewmodel = ExperimentListViewModel(self.experiment_repository,
+                                                                      self.export_service)
+            self._connect_viewmodels()
+        return self._experiment_list_viewmodel
+
+    def _connect_viewmodels(self):
+        """两个 ViewModel 都已创建时，把主 ViewModel 的加载和增删改同步到实验列表"""
+        if self._main_viewmodel is None or self._experiment_list_viewmodel is None:
+            return
+        list_viewmodel = self._experiment_list_viewmodel
+        self._main_viewmodel.experiment_created.connect(lambda exp: list_viewmodel.add_experiments([exp]))
+        self._main_viewmodel.experiment_deleted.connect(list_viewmodel.remove_experiment)
+        self._main_viewmodel.experiment_updated.connect(list_viewmodel.update_experiment)
+        # 列表按对象定位实验：主 ViewModel 重新扫描后列表改用仓库缓存中的新对象
+        self._main_viewmodel.experiments_loaded.connect(lambda _: list_viewmodel.refresh_experiments(reload=False))
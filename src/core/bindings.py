@@ -1,15 +1,108 @@
-from PyQt5.QtCore import QObject, pyqtSignal
-from typing import Any, Callable, Dict, List
+from contextlib import contextmanager
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class _UpdateBatch:
+    """属性变更通知的批处理状态（界面线程使用）
+
+    批处理期间属性只记录变化前的值，不发通知；提交时每个属性只以最终值通知一次，
+    最终值与批处理开始前相同的属性不通知。提交可以立即执行，也可以推迟到事件循环
+    的下一轮（期间继续合并新的变化）。
+    """
+    
+    def __init__(self):
+        self.depth = 0
+        self.scheduled = False
+        # id(属性) -> (属性, 批处理开始前的值)，按首次变化的顺序
+        self.pending: Dict[int, Tuple["Property", Any]] = {}
+    
+    @property
+    def active(self) -> bool:
+        return self.depth > 0 or self.scheduled
+    
+    def record(self, prop: "Property", old_value: Any):
+        self.pending.setdefault(id(prop), (prop, old_value))
+    
+    def schedule(self):
+        """在事件循环的下一轮提交"""
+        if not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(0, self.flush)
+    
+    def flush(self):
+        self.scheduled = False
+        if self.depth:
+            # 仍在批处理中，由最外层结束时提交
+            return
+        pending, self.pending = self.pending, {}
+        for prop, old_value in pending.values():
+            if prop._value == old_value:
+                continue
+            try:
+                prop._emit_change(old_value, prop._value)
+            except RuntimeError:
+                # 属性对象在等待提交期间已被销毁
+                pass
+
+
+_batch = _UpdateBatch()
+
+
+def begin_updates():
+    """开始批量更新（可嵌套），之后的属性变化暂不通知"""
+    _batch.depth += 1
+
+
+def end_updates(defer: bool = False):
+    """
+    结束批量更新，最外层结束时提交合并后的通知
+    
+    Args:
+        defer: True 时推迟到事件循环的下一轮提交
+    """
+    if _batch.depth == 0:
+        return
+    _batch.depth -= 1
+    if _batch.depth == 0 and _batch.pending:
+        if defer:
+            _batch.schedule()
+        else:
+            _batch.flush()
+
+
+@contextmanager
+def batch_updates(defer: bool = False):
+    """
+    在 with 块内合并属性变化通知，例如:
+    
+        with batch_updates():
+            self.total_experiments.value = n
+            self.filtered_count.value = m
+    
+    每个属性在块结束时只以最终值通知一次。defer=True 时推迟到事件循环的下一轮。
+    """
+    begin_updates()
+    try:
+        yield
+    finally:
+        end_updates(defer)
+
 
 class Property(QObject):
-    """可观察的属性类，支持数据绑定"""
+    """可观察的属性类，支持数据绑定
+    
+    在 batch_updates 块内的变化合并到块结束时通知；deferred=True 的属性每次变化都
+    推迟到事件循环的下一轮，同一轮内的多次赋值只通知最终值。
+    """
     
     value_changed = pyqtSignal(object)
     
-    def __init__(self, initial_value: Any = None):
+    def __init__(self, initial_value: Any = None, deferred: bool = False):
         super().__init__()
         self._value = initial_value
         self._observers: List[Callable] = []
+        self._deferred = deferred
     
     @property
     def value(self) -> Any:
@@ -20,14 +113,29 @@ class Property(QObject):
         if self._value != new_value:
             old_value = self._value
             self._value = new_value
-            self.value_changed.emit(new_value)
-            self._notify_observers(old_value, new_value)
+            if _batch.active or self._deferred:
+                _batch.record(self, old_value)
+                if self._deferred and not _batch.depth:
+                    _batch.schedule()
+                return
+            self._emit_change(old_value, new_value)
     
-    def bind_to(self, callback: Callable[[Any], None]):
-        """绑定值变化回调"""
+    def bind_to(self, callback: Callable[[Any], None], immediate: bool = True):
+        """
+        绑定值变化回调
+        
+        Args:
+            callback: 回调，参数为新值
+            immediate: 是否立即以当前值调用一次
+        """
         self._observers.append(callback)
-        # 立即调用一次以设置初始值
-        callback(self._value)
+        if immediate:
+            # 立即调用一次以设置初始值
+            callback(self._value)
+    
+    def _emit_change(self, old_value: Any, new_value: Any):
+        self.value_changed.emit(new_value)
+        self._notify_observers(old_value, new_value)
     
     def _notify_observers(self, old_value: Any, new_value: Any):
         """通知所有观察者"""
@@ -38,39 +146,107 @@ class Property(QObject):
                 print(f"Observer callback error: {e}")
 
 class ObservableList(QObject):
-    """可观察的列表类"""
+    """可观察的列表类
+
+    单项操作发出 item_added/item_removed，同时发出对应的区间信号；extend/remove_range
+    只发出一次区间信号，replace_all 只发出一次 list_reset。begin_update/end_update
+    之间的所有修改不发信号，结束时合并为一次 list_reset。
+    """
     
     item_added = pyqtSignal(object, int)  # item, index
     item_removed = pyqtSignal(object, int)  # item, index
     item_changed = pyqtSignal(object, int)  # item, index
     list_cleared = pyqtSignal()
+    items_inserted = pyqtSignal(int, list)  # start, items
+    items_removed = pyqtSignal(int, list)  # start, items
+    list_reset = pyqtSignal()
     
     def __init__(self, initial_items: List[Any] = None):
         super().__init__()
         self._items = initial_items or []
+        self._update_depth = 0
+        self._pending_reset = False
+    
+    def _deferred(self) -> bool:
+        """批量更新期间记录有变化并返回True，调用方不再发信号"""
+        if self._update_depth:
+            self._pending_reset = True
+            return True
+        return False
+    
+    def begin_update(self):
+        """开始批量更新（可嵌套）"""
+        self._update_depth += 1
+    
+    def end_update(self):
+        """结束批量更新，最外层结束时若有修改则发出一次 list_reset"""
+        if self._update_depth == 0:
+            return
+        self._update_depth -= 1
+        if self._update_depth == 0 and self._pending_reset:
+            self._pending_reset = False
+            self.list_reset.emit()
     
     def append(self, item: Any):
         """添加项目"""
         self._items.append(item)
-        self.item_added.emit(item, len(self._items) - 1)
+        if self._deferred():
+            return
+        index = len(self._items) - 1
+        self.item_added.emit(item, index)
+        self.items_inserted.emit(index, [item])
+    
+    def extend(self, items: List[Any]):
+        """批量追加，只发出一次 items_inserted"""
+        items = list(items)
+        if not items:
+            return
+        start = len(self._items)
+        self._items.extend(items)
+        if not self._deferred():
+            self.items_inserted.emit(start, items)
     
     def remove(self, item: Any):
         """移除项目"""
         if item in self._items:
-            index = self._items.index(item)
-            self._items.remove(item)
-            self.item_removed.emit(item, index)
+            self.remove_at(self._items.index(item))
     
     def remove_at(self, index: int):
         """根据索引移除项目"""
         if 0 <= index < len(self._items):
             item = self._items.pop(index)
+            if self._deferred():
+                return
             self.item_removed.emit(item, index)
+            self.items_removed.emit(index, [item])
+    
+    def remove_range(self, start: int, stop: int):
+        """移除 [start, stop) 区间，只发出一次 items_removed"""
+        start, stop = max(0, start), min(stop, len(self._items))
+        if start >= stop:
+            return
+        items = self._items[start:stop]
+        del self._items[start:stop]
+        if not self._deferred():
+            self.items_removed.emit(start, items)
+    
+    def set_at(self, index: int, item: Any):
+        """替换指定位置的项目，发出 item_changed"""
+        self._items[index] = item
+        if not self._deferred():
+            self.item_changed.emit(item, index)
+    
+    def replace_all(self, items: List[Any]):
+        """整体替换内容，只发出一次 list_reset"""
+        self._items = list(items)
+        if not self._deferred():
+            self.list_reset.emit()
     
     def clear(self):
         """清空列表"""
         self._items.clear()
-        self.list_cleared.emit()
+        if not self._deferred():
+            self.list_cleared.emit()
     
     def __getitem__(self, index: int):
         return self._items[index]
@@ -62,6 +62,28 @@ DEVICE_MODELS = [
     "其他"
 ]
 
+# 设备几何参数（二维正弦图），用于确定重建网格和系统矩阵
+# n_angles/n_radial: 正弦图角度数和径向bin数，用于校验列表模式文件头；bin_size: 径向bin尺寸(mm)
+# 数值为各厂商公开资料中的近似值
+SCANNER_GEOMETRY = {
+    "Siemens Biograph mCT": {"n_angles": 168, "n_radial": 400, "bin_size": 2.005},
+    "Siemens Biograph Vision": {"n_angles": 200, "n_radial": 520, "bin_size": 1.65},
+    "GE Discovery MI": {"n_angles": 272, "n_radial": 357, "bin_size": 1.96},
+    "GE Discovery IQ": {"n_angles": 256, "n_radial": 381, "bin_size": 1.84},
+    "Philips Vereos": {"n_angles": 320, "n_radial": 322, "bin_size": 2.0},
+    "Philips Gemini TF": {"n_angles": 322, "n_radial": 287, "bin_size": 2.0},
+    "Philips Ingenuity TF": {"n_angles": 322, "n_radial": 287, "bin_size": 2.0},
+    "Canon Celesteion": {"n_angles": 336, "n_radial": 351, "bin_size": 2.0},
+    "United Imaging uEXPLORER": {"n_angles": 420, "n_radial": 549, "bin_size": 1.25},
+    "United Imaging uMI 780": {"n_angles": 336, "n_radial": 411, "bin_size": 1.7}
+}
+
+# 未知设备（"其他"）使用的默认几何，正弦图尺寸以列表模式文件头为准
+DEFAULT_SCANNER_GEOMETRY = {"bin_size": 2.0}
+
+# 系统矩阵磁盘缓存上限（MB）
+SYSTEM_MATRIX_CACHE_BUDGET_MB = 4096
+
 # 容器类型
 CONTAINER_TYPES = [
     "标准注射器",
@@ -0,0 +1,107 @@
+# src/core/query_executor.py
+
+import logging
+from typing import Any, Callable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# 查询函数：接收 checkpoint 回调（查询已过期时抛出 QueryCancelled），返回结果
+Query = Callable[[Callable[[], None]], Any]
+
+
+class QueryCancelled(Exception):
+    """查询已被更新的查询取代"""
+
+
+class _QueryTask(QRunnable):
+    def __init__(self, executor: "QueryExecutor", generation: int, query: Query):
+        super().__init__()
+        self.executor = executor
+        self.generation = generation
+        self.query = query
+
+    def run(self):
+        executor = self.executor
+        if executor.is_stale(self.generation):
+            return
+        version = executor.store.version
+
+        def checkpoint():
+            if executor.is_stale(self.generation):
+                raise QueryCancelled()
+
+        try:
+            result = self.query(checkpoint)
+        except QueryCancelled:
+            return
+        except Exception as e:
+            executor._finished.emit(self.generation, version, None, e)
+            return
+        executor._finished.emit(self.generation, version, result, None)
+
+
+class QueryExecutor(QObject):
+    """在后台线程中执行实验列表的过滤/排序查询
+
+    每次 submit 递增代号，旧代号的查询视为过期：还在排队的直接跳过，正在执行的在下一个
+    checkpoint 处停止，已经完成的结果被丢弃，因此连续输入时只有最后一次查询的结果交给
+    界面。查询在单线程的线程池中串行执行，只读访问 ExperimentListStore；结果送回时
+    若存储的 version 已变化（查询期间界面线程修改了数据），自动按新数据重新执行。
+    """
+
+    results_ready = pyqtSignal(int, object)  # 代号, 查询结果
+    query_failed = pyqtSignal(str)
+    # 工作线程 -> 界面线程（排队连接）
+    _finished = pyqtSignal(int, int, object, object)  # 代号, 存储版本, 结果, 异常
+
+    def __init__(self, store, parent=None):
+        """
+        Args:
+            store: 查询读取的存储（需要 version 属性）
+        """
+        super().__init__(parent)
+        self.store = store
+        self.generation = 0
+        self._query: Optional[Query] = None
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._finished.connect(self._on_finished)
+
+    def is_stale(self, generation: int) -> bool:
+        return generation != self.generation
+
+    def submit(self, query: Query) -> int:
+        """在后台执行查询，之前未完成的查询全部作废，返回本次查询的代号"""
+        self.generation += 1
+        self._query = query
+        self._pool.start(_QueryTask(self, self.generation, query))
+        return self.generation
+
+    def run_now(self, query: Query) -> Any:
+        """在当前线程立即执行查询（数据刚修改、需要同步结果时），同时作废后台查询"""
+        self.cancel()
+        return query(lambda: None)
+
+    def cancel(self):
+        """作废所有未完成的查询"""
+        self.generation += 1
+        self._query = None
+
+    def wait(self, msecs: int = -1) -> bool:
+        """等待线程池中的查询结束（关闭窗口前调用）"""
+        return self._pool.waitForDone(msecs)
+
+    def _on_finished(self, generation: int, version: int, result: Any, error: Optional[Exception]):
+        if self.is_stale(generation) or self._query is None:
+            return
+        if version != self.store.version:
+            # 查询期间数据已变化，结果可能不一致
+            self.submit(self._query)
+            return
+        if error is not None:
+            logger.error(f"列表查询失败: {error}")
+            self.query_failed.emit(str(error))
+            return
+        self.results_ready.emit(generation, result)
@@ -0,0 +1 @@
+# analysis package 
\ No newline at end of file
@@ -0,0 +1,281 @@
+# src/models/analysis/hoffman.py
+
+"""Hoffman 脑模体分析：刚性配准到数字参考模体，再按标签统计灰/白质比值。
+
+数字参考模体由 make_hoffman_reference 按固定规则合成，不依赖外部数据文件。
+配准采用多分辨率金字塔，粗层级体素数少，保证在纯CPU机器上也能交互使用。
+"""
+
+import time
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import ndimage, optimize
+
+logger = logging.getLogger(__name__)
+
+# 参考模体标签
+LABEL_BACKGROUND = 0
+LABEL_WHITE = 1
+LABEL_GREY = 2
+
+# 参考模体默认网格 (nz, ny, nx) 与体素间距 (mm)
+REFERENCE_SHAPE = (40, 128, 128)
+REFERENCE_SPACING = (2.0, 2.0, 2.0)
+
+# Hoffman 模体设计的灰/白质活度比
+DEFAULT_GREY_WHITE_RATIO = 4.0
+
+# 默认金字塔层级：1/4 和 1/2 分辨率已足够精确，全分辨率层级按需追加
+DEFAULT_REGISTRATION_LEVELS = (4, 2)
+
+
+@lru_cache(maxsize=4)
+def make_hoffman_reference(shape: Tuple[int, int, int] = REFERENCE_SHAPE,
+                           spacing: Tuple[float, float, float] = REFERENCE_SPACING
+                           ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    合成数字Hoffman参考模体
+
+    Args:
+        shape: 网格形状 (nz, ny, nx)
+        spacing: 体素间距 (dz, dy, dx)，单位mm
+
+    Returns:
+        (labels, activity)：uint8标签体和float32活度体（灰质4、白质1）
+    """
+    nz, ny, nx = shape
+    dz, dy, dx = spacing
+    z = (np.arange(nz) - (nz - 1) / 2.0)[:, None, None] * dz
+    y = (np.arange(ny) - (ny - 1) / 2.0)[None, :, None] * dy
+    x = (np.arange(nx) - (nx - 1) / 2.0)[None, None, :] * dx
+
+    # 脑轮廓：椭球 + 角向调制，模拟脑回并打破旋转对称
+    theta = np.arctan2(y, x)
+    phi = np.arctan2(z, np.hypot(x, y))
+    folding = 1.0 + 0.05 * np.sin(7.0 * theta) * np.cos(3.0 * phi)
+    radius = np.sqrt((x / 68.0) ** 2 + (y / 84.0) ** 2 + (z / 34.0) ** 2) / folding
+
+    labels = np.zeros(shape, dtype=np.uint8)
+    labels[radius <= 1.0] = LABEL_GREY
+    labels[radius <= 0.86] = LABEL_WHITE
+
+    # 深部灰质核团（左右不对称，便于确定方向）
+    for cx, cy, cz, ax, ay, az in ((-22.0, 6.0, 0.0, 9.0, 14.0, 10.0),
+                                   (20.0, 2.0, 2.0, 8.0, 12.0, 9.0),
+                                   (0.0, -30.0, -6.0, 12.0, 7.0, 6.0)):
+        nucleus = ((x - cx) / ax) ** 2 + ((y - cy) / ay) ** 2 + ((z - cz) / az) ** 2 <= 1.0
+        labels[nucleus] = LABEL_GREY
+
+    # 脑室（无活度）
+    for cx in (-8.0, 8.0):
+        ventricle = ((x - cx) / 5.0) ** 2 + ((y - 12.0) / 20.0) ** 2 + ((z - 4.0) / 8.0) ** 2 <= 1.0
+        labels[ventricle] = LABEL_BACKGROUND
+
+    activity = np.zeros(shape, dtype=np.float32)
+    activity[labels == LABEL_WHITE] = 1.0
+    activity[labels == LABEL_GREY] = DEFAULT_GREY_WHITE_RATIO
+
+    labels.setflags(write=False)
+    activity.setflags(write=False)
+    return labels, activity
+
+
+@lru_cache(maxsize=4)
+def _core_labels(shape: Tuple[int, int, int], spacing: Tuple[float, float, float]) -> np.ndarray:
+    """腐蚀一个体素后的标签，避免部分容积效应污染边界体素"""
+    labels, _ = make_hoffman_reference(shape, spacing)
+    core = np.zeros_like(labels)
+    for label in (LABEL_WHITE, LABEL_GREY):
+        core[ndimage.binary_erosion(labels == label)] = label
+    core.setflags(write=False)
+    return core
+
+
+def rigid_transform(params: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    由6个刚性参数构造旋转矩阵与平移向量（坐标顺序 z, y, x）
+
+    Args:
+        params: (rx, ry, rz, tz, ty, tx)，角度为度，平移为mm
+    """
+    rx, ry, rz = np.deg2rad(params[:3])
+    cx, sx = np.cos(rx), np.sin(rx)
+    cy, sy = np.cos(ry), np.sin(ry)
+    cz, sz = np.cos(rz), np.sin(rz)
+    # 绕x轴旋转作用于 (z, y)，绕y轴作用于 (z, x)，绕z轴作用于 (y, x)
+    rot_x = np.array([[cx, -sx, 0.0], [sx, cx, 0.0], [0.0, 0.0, 1.0]])
+    rot_y = np.array([[cy, 0.0, -sy], [0.0, 1.0, 0.0], [sy, 0.0, cy]])
+    rot_z = np.array([[1.0, 0.0, 0.0], [0.0, cz, -sz], [0.0, sz, cz]])
+    return rot_x @ rot_y @ rot_z, np.asarray(params[3:], dtype=np.float64)
+
+
+def resample_to_reference(moving: np.ndarray, moving_spacing: Sequence[float],
+                          ref_shape: Sequence[int], ref_spacing: Sequence[float],
+                          params: Sequence[float], order: int = 1) -> np.ndarray:
+    """把待配准图像按刚性参数重采样到参考网格（物理坐标以体数据中心为原点）"""
+    rotation, translation = rigid_transform(params)
+    ref_scale = np.asarray(ref_spacing, dtype=np.float64)
+    inv_moving_scale = 1.0 / np.asarray(moving_spacing, dtype=np.float64)
+    ref_center = (np.asarray(ref_shape, dtype=np.float64) - 1.0) / 2.0
+    moving_center = (np.asarray(moving.shape, dtype=np.float64) - 1.0) / 2.0
+
+    matrix = (inv_moving_scale[:, None] * rotation) * ref_scale[None, :]
+    offset = moving_center + inv_moving_scale * translation - matrix @ ref_center
+    return ndimage.affine_transform(moving, matrix, offset=offset, output_shape=tuple(ref_shape),
+                                    order=order, mode="constant", cval=0.0)
+
+
+def downsample(volume: np.ndarray, factor: int) -> np.ndarray:
+    """按块平均降采样（各轴同一因子，尾部不足一块的体素被裁掉）"""
+    if factor <= 1:
+        return volume
+    nz, ny, nx = (max(s // factor, 1) for s in volume.shape)
+    fz, fy, fx = (min(factor, s) for s in volume.shape)
+    cropped = volume[:nz * fz, :ny * fy, :nx * fx]
+    return cropped.reshape(nz, fz, ny, fy, nx, fx).mean(axis=(1, 3, 5), dtype=np.float32)
+
+
+def _center_of_mass_mm(volume: np.ndarray, spacing: Sequence[float]) -> np.ndarray:
+    weights = np.clip(volume, 0, None)
+    total = weights.sum()
+    if total <= 0:
+        return np.zeros(3)
+    com = np.asarray(ndimage.center_of_mass(weights))
+    center = (np.asarray(volume.shape) - 1.0) / 2.0
+    return (com - center) * np.asarray(spacing)
+
+
+def _negative_ncc(moved: np.ndarray, reference: np.ndarray) -> float:
+    a = moved.ravel() - moved.mean()
+    b = reference.ravel() - reference.mean()
+    denom = np.sqrt(np.dot(a, a) * np.dot(b, b))
+    return -float(np.dot(a, b) / denom) if denom > 0 else 0.0
+
+
+def register_to_reference(volume: np.ndarray, spacing: Sequence[float],
+                          levels: Sequence[int] = DEFAULT_REGISTRATION_LEVELS,
+                          ref_shape: Tuple[int, int, int] = REFERENCE_SHAPE,
+                          ref_spacing: Tuple[float, float, float] = REFERENCE_SPACING
+                          ) -> Dict[str, Any]:
+    """
+    多分辨率刚性配准，最大化与参考活度体的归一化互相关
+
+    Args:
+        volume: 待配准图像 (nz, ny, nx)
+        spacing: 图像体素间距 (dz, dy, dx) mm
+        levels: 金字塔降采样因子，从粗到细
+
+    Returns:
+        包含 params (rx, ry, rz, tz, ty, tx)、ncc 和耗时的字典
+    """
+    _, reference = make_hoffman_reference(ref_shape, ref_spacing)
+    volume = np.asarray(volume, dtype=np.float32)
+
+    # 以质心对齐作为初值
+    params = np.zeros(6)
+    params[3:] = _center_of_mass_mm(volume, spacing) - _center_of_mass_mm(reference, ref_spacing)
+
+    start = time.perf_counter()
+    for factor in levels:
+        level_ref = downsample(reference, factor)
+        level_ref_spacing = tuple(s * factor for s in ref_spacing)
+        level_moving = downsample(volume, factor)
+        level_spacing = tuple(s * factor for s in spacing)
+
+        def cost(p):
+            moved = resample_to_reference(level_moving, level_spacing, level_ref.shape,
+                                          level_ref_spacing, p)
+            return _negative_ncc(moved, level_ref)
+
+        result = optimize.minimize(cost, params, method="Powell",
+                                   options={"xtol": 0.05 * factor, "ftol": 1e-4, "maxiter": 4})
+        params = result.x
+        logger.debug(f"配准层级 1/{factor}: NCC={-result.fun:.4f}, 参数={np.round(params, 3)}")
+
+    return {
+        "params": params,
+        "ncc": -float(result.fun) if levels else 0.0,
+        "elapsed": time.perf_counter() - start
+    }
+
+
+def label_statistics(values: np.ndarray, labels: np.ndarray, n_labels: int = 3) -> Dict[str, np.ndarray]:
+    """按标签向量化统计体素数、均值和标准差"""
+    flat_labels = labels.ravel()
+    flat_values = values.ravel().astype(np.float64)
+    counts = np.bincount(flat_labels, minlength=n_labels)
+    sums = np.bincount(flat_labels, weights=flat_values, minlength=n_labels)
+    sq_sums = np.bincount(flat_labels, weights=flat_values * flat_values, minlength=n_labels)
+    safe = np.maximum(counts, 1)
+    means = sums / safe
+    stds = np.sqrt(np.maximum(sq_sums / safe - means ** 2, 0.0))
+    return {"count": counts, "mean": means, "std": stds}
+
+
+def analyze_hoffman(volume: np.ndarray, spacing: Sequence[float],
+                    settings: Dict[str, Any],
+                    registration: Optional[Dict[str, Any]] = None,
+                    categories: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """
+    Hoffman 模体灰/白质对比分析
+
+    Args:
+        volume: 图像 (nz, ny, nx)
+        spacing: 体素间距 (dz, dy, dx) mm
+        settings: hoffman_settings 参数（registration_levels、expected_ratio）
+        registration: 已有的 registration 结果（如来自结果缓存），提供时跳过配准
+        categories: 需要的结果类别，None表示全部；只需要 registration 时不做重采样统计
+    """
+    levels = tuple(int(f) for f in settings.get("registration_levels", DEFAULT_REGISTRATION_LEVELS))
+    expected_ratio = float(settings.get("expected_ratio", DEFAULT_GREY_WHITE_RATIO))
+
+    if registration:
+        params = np.array([registration[k] for k in ("rotation_x", "rotation_y", "rotation_z",
+                                                     "translation_z", "translation_y", "translation_x")])
+        registration = {"params": params, "ncc": registration.get("ncc", 0.0),
+                        "elapsed": registration.get("registration_time", 0.0)}
+    else:
+        registration = register_to_reference(volume, spacing, levels)
+        params = registration["params"]
+
+    registration_result = {
+        "rotation_x": float(params[0]),
+        "rotation_y": float(params[1]),
+        "rotation_z": float(params[2]),
+        "translation_z": float(params[3]),
+        "translation_y": float(params[4]),
+        "translation_x": float(params[5]),
+        "ncc": registration["ncc"],
+        "registration_time": registration["elapsed"]
+    }
+    if categories is not None and not categories & {"contrast", "statistics"}:
+        return {"registration": registration_result}
+
+    moved = resample_to_reference(np.asarray(volume, dtype=np.float32), spacing,
+                                  REFERENCE_SHAPE, REFERENCE_SPACING, params)
+    stats = label_statistics(moved, _core_labels(REFERENCE_SHAPE, REFERENCE_SPACING))
+
+    grey_mean = float(stats["mean"][LABEL_GREY])
+    white_mean = float(stats["mean"][LABEL_WHITE])
+    ratio = grey_mean / white_mean if white_mean > 0 else 0.0
+    recovery = 100.0 * (ratio - 1.0) / (expected_ratio - 1.0) if expected_ratio > 1.0 else 0.0
+
+    return {
+        "registration": registration_result,
+        "contrast": {
+            "grey_mean": grey_mean,
+            "white_mean": white_mean,
+            "grey_white_ratio": ratio,
+            "expected_ratio": expected_ratio,
+            "contrast_recovery": recovery
+        },
+        "statistics": {
+            "grey_voxels": int(stats["count"][LABEL_GREY]),
+            "white_voxels": int(stats["count"][LABEL_WHITE]),
+            "grey_cov": 100.0 * float(stats["std"][LABEL_GREY]) / grey_mean if grey_mean > 0 else 0.0,
+            "white_cov": 100.0 * float(stats["std"][LABEL_WHITE]) / white_mean if white_mean > 0 else 0.0
+        }
+    }
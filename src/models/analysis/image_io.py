@@ -0,0 +1,169 @@
+# src/models/analysis/image_io.py
+
+import os
+import glob
+import logging
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 支持的图像扩展名
+DICOM_EXTENSIONS = (".dcm", ".ima")
+NIFTI_EXTENSIONS = (".nii", ".nii.gz", ".img", ".hdr")
+
+
+def _is_nifti(path: str) -> bool:
+    lower = path.lower()
+    return any(lower.endswith(ext) for ext in NIFTI_EXTENSIONS)
+
+
+def list_dicom_series_files(path: str) -> List[str]:
+    """
+    列出与给定路径属于同一序列的DICOM文件
+
+    Args:
+        path: 单个DICOM文件或包含DICOM文件的目录
+
+    Returns:
+        排序后的文件路径列表
+    """
+    directory = path if os.path.isdir(path) else os.path.dirname(path)
+    files = []
+    for ext in DICOM_EXTENSIONS:
+        files.extend(glob.glob(os.path.join(directory, f"*{ext}")))
+        files.extend(glob.glob(os.path.join(directory, f"*{ext.upper()}")))
+    if not files and os.path.isfile(path):
+        files = [path]
+    return sorted(set(files))
+
+
+def load_dicom_series(path: str) -> Tuple[np.ndarray, Tuple[float, float, float], Dict[str, Any]]:
+    """
+    读取DICOM序列为三维体数据
+
+    Returns:
+        (volume, spacing, metadata)，volume形状为 (nz, ny, nx)，spacing为 (dz, dy, dx) mm
+    """
+    import pydicom
+
+    files = list_dicom_series_files(path)
+    if not files:
+        raise ValueError(f"未找到DICOM文件: {path}")
+
+    # 只保留与参考文件同一序列的切片
+    reference = pydicom.dcmread(path if os.path.isfile(path) else files[0], stop_before_pixels=True)
+    series_uid = getattr(reference, "SeriesInstanceUID", None)
+
+    slices = []
+    for file_path in files:
+        try:
+            ds = pydicom.dcmread(file_path)
+        except Exception as e:
+            logger.warning(f"跳过无法读取的DICOM文件 {file_path}: {e}")
+            continue
+        if series_uid and getattr(ds, "SeriesInstanceUID", None) != series_uid:
+            continue
+        if "PixelData" not in ds:
+            continue
+        slices.append(ds)
+
+    if not slices:
+        raise ValueError(f"序列中没有可用的图像切片: {path}")
+
+    def slice_position(ds):
+        position = getattr(ds, "ImagePositionPatient", None)
+        if position is not None and len(position) == 3:
+            return float(position[2])
+        return float(getattr(ds, "InstanceNumber", 0) or 0)
+
+    slices.sort(key=slice_position)
+
+    first = slices[0]
+    volume = np.empty((len(slices), int(first.Rows), int(first.Columns)), dtype=np.float32)
+    for i, ds in enumerate(slices):
+        slope = float(getattr(ds, "RescaleSlope", 1.0) or 1.0)
+        intercept = float(getattr(ds, "RescaleIntercept", 0.0) or 0.0)
+        volume[i] = ds.pixel_array * slope + intercept
+
+    pixel_spacing = getattr(first, "PixelSpacing", [1.0, 1.0])
+    if len(slices) > 1:
+        dz = abs(slice_position(slices[1]) - slice_position(slices[0])) or 1.0
+    else:
+        dz = float(getattr(first, "SliceThickness", 1.0) or 1.0)
+    spacing = (float(dz), float(pixel_spacing[0]), float(pixel_spacing[1]))
+
+    metadata = {
+        "format": "DICOM",
+        "SeriesInstanceUID": series_uid or "",
+        "PatientName": str(getattr(first, "PatientName", "")),
+        "StudyDate": str(getattr(first, "StudyDate", "")),
+        "Modality": str(getattr(first, "Modality", "")),
+        "files": [getattr(ds, "filename", "") for ds in slices]
+    }
+    return volume, spacing, metadata
+
+
+def load_nifti(path: str) -> Tuple[np.ndarray, Tuple[float, float, float], Dict[str, Any]]:
+    """读取NIfTI/Analyze图像为三维体数据，返回值同 load_dicom_series"""
+    import nibabel as nib
+
+    image = nib.load(path)
+    data = np.asarray(image.dataobj, dtype=np.float32)
+    if data.ndim == 4:
+        data = data[..., 0]
+    if data.ndim == 2:
+        data = data[..., np.newaxis]
+
+    # nibabel 按 (x, y, z) 存储，这里统一为 (z, y, x)
+    volume = np.ascontiguousarray(np.transpose(data, (2, 1, 0)))
+    zooms = image.header.get_zooms()
+    spacing = (float(zooms[2]) if len(zooms) > 2 else 1.0, float(zooms[1]), float(zooms[0]))
+
+    metadata = {
+        "format": "NIfTI",
+        "SeriesInstanceUID": "",
+        "files": [path]
+    }
+    return volume, spacing, metadata
+
+
+def series_source(path: str) -> Tuple[str, List[str]]:
+    """
+    不读取像素数据，返回图像对应的 (SeriesInstanceUID, 文件列表)，用于结果缓存的键
+
+    DICOM只读取一个文件头获取序列UID；Analyze格式同时包含 .hdr/.img 两个文件。
+    """
+    if os.path.isfile(path) and _is_nifti(path):
+        stem, ext = os.path.splitext(path)
+        if ext.lower() in (".img", ".hdr"):
+            pair = [f"{stem}{e}" for e in (".hdr", ".img")]
+            return "", [p for p in pair if os.path.exists(p)]
+        return "", [path]
+
+    import pydicom
+
+    files = list_dicom_series_files(path)
+    if not files:
+        raise ValueError(f"未找到DICOM文件: {path}")
+    reference = pydicom.dcmread(path if os.path.isfile(path) else files[0], stop_before_pixels=True)
+    return str(getattr(reference, "SeriesInstanceUID", "") or ""), files
+
+
+def load_image_volume(path: str) -> Tuple[np.ndarray, Tuple[float, float, float], Dict[str, Any]]:
+    """
+    根据扩展名读取图像体数据
+
+    Args:
+        path: 图像文件路径（DICOM、NIfTI或Analyze）或DICOM目录
+
+    Returns:
+        (volume, spacing, metadata)，volume为float32数组，形状 (nz, ny, nx)
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"图像文件不存在: {path}")
+
+    if os.path.isfile(path) and _is_nifti(path):
+        return load_nifti(path)
+    return load_dicom_series(path)
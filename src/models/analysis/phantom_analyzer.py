@@ -0,0 +1,210 @@
+# src/models/analysis/phantom_analyzer.py
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from .roi import RoiMaskCache, roi_reduce
+from .hoffman import analyze_hoffman
+
+logger = logging.getLogger(__name__)
+
+# NEMA IQ 模体热球直径（mm）及其中心到模体中心的距离
+NEMA_SPHERE_DIAMETERS = [10, 13, 17, 22, 28, 37]
+NEMA_SPHERE_RING_RADIUS = 57.2
+
+
+class PhantomAnalyzer:
+    """模体图像分析器，基于ROI缓存计算均匀性、噪声和恢复系数，Hoffman模体走配准分析"""
+
+    def __init__(self, mask_cache: Optional[RoiMaskCache] = None):
+        self.mask_cache = mask_cache or RoiMaskCache()
+
+    def analyze(self, volume: np.ndarray, params: Dict[str, Any],
+                spacing: Tuple[float, float, float] = (1.0, 1.0, 1.0),
+                categories: Optional[Iterable[str]] = None,
+                cached: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        按分析类型执行模体分析
+
+        Args:
+            volume: 图像数据，形状 (nz, ny, nx) 或 (ny, nx)
+            params: 实验中的 phantom_analysis 参数
+            spacing: 体素间距 (dz, dy, dx)，单位mm
+            categories: 只计算这些结果类别，None表示全部；不需要的统计步骤会跳过
+            cached: 仍然有效的缓存结果，可用于跳过耗时步骤（如Hoffman配准、NEMA热球统计）
+
+        Returns:
+            按类别组织的分析结果字典
+        """
+        if volume.ndim == 2:
+            volume = volume[np.newaxis]
+        cached = cached or {}
+        categories = set(categories) if categories is not None else None
+
+        analysis_type = params.get("analysis_type", "Uniform")
+        if analysis_type == "NEMA-IQ":
+            results = self.analyze_nema_iq(volume, params, spacing, categories, cached)
+        elif analysis_type == "Hoffman":
+            results = analyze_hoffman(volume, spacing, params.get("hoffman_settings", {}),
+                                      registration=cached.get("registration"), categories=categories)
+            if "statistics" in results:
+                results["statistics"]["analysis_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        else:
+            results = self.analyze_uniform(volume, params, spacing, categories)
+
+        if categories is not None:
+            results = {k: v for k, v in results.items() if k in categories}
+        return results
+
+    def _roi_geometry(self, params: Dict[str, Any]):
+        roi = params.get("roi_settings", {})
+        center = (roi.get("center_x", 128), roi.get("center_y", 128))
+        return center, roi.get("radius", 50), roi.get("background_radius", 80)
+
+    def _select_slices(self, slice_means: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+        """按均匀性阈值选择模体内的切片，可选去掉首尾边缘切片"""
+        settings = params.get("uniformity_settings", {})
+        threshold = settings.get("threshold", 0.1)
+        peak = slice_means.max() if slice_means.size else 0.0
+        selected = np.flatnonzero(slice_means >= threshold * peak) if peak > 0 else np.arange(slice_means.size)
+        if not settings.get("include_edges", False) and selected.size > 2:
+            selected = selected[1:-1]
+        return selected
+
+    def analyze_uniform(self, volume: np.ndarray, params: Dict[str, Any],
+                        spacing: Tuple[float, float, float],
+                        categories: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """均匀模体分析：积分/微分均匀性、噪声和信噪比（背景环只有 statistics 需要）"""
+        center, radius, bg_radius = self._roi_geometry(params)
+        plane_spacing = spacing[1:]
+
+        roi_idx = self.mask_cache.disk_indices(volume.shape, center, radius, plane_spacing)
+        roi_stats = roi_reduce(volume, roi_idx)
+        selected = self._select_slices(roi_stats["mean"], params)
+        means = roi_stats["mean"][selected]
+        stds = roi_stats["std"][selected]
+
+        if means.size == 0 or roi_stats["count"] == 0:
+            raise ValueError("ROI内没有有效的图像数据，请检查ROI设置")
+
+        mean_value = float(means.mean())
+        # 合并各切片的方差得到ROI整体标准差
+        std_value = float(np.sqrt(np.mean(stds ** 2 + (means - mean_value) ** 2)))
+
+        results = {}
+        if categories is None or "uniformity" in categories:
+            max_mean, min_mean = float(means.max()), float(means.min())
+            integral_uniformity = 100.0 * (max_mean - min_mean) / (max_mean + min_mean) if max_mean + min_mean else 0.0
+            if means.size > 1:
+                pair_sum = means[1:] + means[:-1]
+                pair_diff = np.abs(np.diff(means))
+                differential_uniformity = float(100.0 * np.max(pair_diff / np.where(pair_sum == 0, 1, pair_sum)))
+            else:
+                differential_uniformity = 0.0
+            results["uniformity"] = {
+                "integral_uniformity": float(integral_uniformity),
+                "differential_uniformity": differential_uniformity,
+                "mean_value": mean_value,
+                "std_deviation": std_value
+            }
+
+        if categories is None or "noise" in categories:
+            noise_level = 100.0 * std_value / mean_value if mean_value else 0.0
+            snr = float(20.0 * np.log10(mean_value / std_value)) if std_value > 0 and mean_value > 0 else 0.0
+            results["noise"] = {
+                "noise_level": float(noise_level),
+                "snr": snr
+            }
+
+        if categories is None or "statistics" in categories:
+            bg_idx = self.mask_cache.annulus_indices(volume.shape, center, radius, bg_radius, plane_spacing)
+            results["statistics"] = {
+                "roi_area": int(roi_idx.size),
+                "background_area": int(bg_idx.size),
+                "slices_analyzed": int(means.size),
+                "analysis_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+        return results
+
+    def sphere_positions(self, params: Dict[str, Any], center, spacing):
+        """返回热球位置 [(x, y, 直径mm), ...]，未配置时使用NEMA标准布局"""
+        positions = params.get("sphere_settings", {}).get("sphere_positions") or []
+        if positions:
+            return [(float(x), float(y), float(d)) for x, y, d in positions]
+
+        dy, dx = spacing
+        angles = np.deg2rad(np.arange(len(NEMA_SPHERE_DIAMETERS)) * 60.0)
+        xs = center[0] + NEMA_SPHERE_RING_RADIUS * np.cos(angles) / dx
+        ys = center[1] + NEMA_SPHERE_RING_RADIUS * np.sin(angles) / dy
+        return [(float(x), float(y), float(d)) for x, y, d in zip(xs, ys, NEMA_SPHERE_DIAMETERS)]
+
+    def analyze_nema_iq(self, volume: np.ndarray, params: Dict[str, Any],
+                        spacing: Tuple[float, float, float],
+                        categories: Optional[Set[str]] = None,
+                        cached: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        NEMA IQ 分析：热球对比恢复系数、背景噪声
+
+        contrast 中记录各热球的对比度和中心层。它仍然有效（ROI和热球位置未变）时，
+        恢复系数、噪声和统计直接由其计算，不再统计各热球ROI。
+        """
+        def wants(category):
+            return categories is None or category in categories
+
+        center, radius, bg_radius = self._roi_geometry(params)
+        plane_spacing = spacing[1:]
+        ratio = float(params.get("sphere_settings", {}).get("hot_sphere_ratio", 4.0))
+
+        bg_idx = self.mask_cache.annulus_indices(volume.shape, center, radius, bg_radius, plane_spacing)
+        spheres = self.sphere_positions(params, center, plane_spacing)
+        labels = [f"sphere_{int(round(d))}mm" for _, _, d in spheres]
+        bg_stats = None
+
+        contrast = (cached or {}).get("contrast")
+        if wants("contrast") or not contrast or "central_slice" not in contrast \
+                or any(label not in contrast for label in labels):
+            bg_stats = roi_reduce(volume, bg_idx)
+            sphere_means = np.empty((len(spheres), volume.shape[0]), dtype=np.float64)
+            for i, (x, y, diameter) in enumerate(spheres):
+                idx = self.mask_cache.disk_indices(volume.shape, (x, y), diameter / 2.0, plane_spacing)
+                sphere_means[i] = roi_reduce(volume, idx)["mean"]
+
+            # 以热球总信号最强的切片作为中心层
+            central = int(np.argmax(sphere_means.sum(axis=0)))
+            background = float(bg_stats["mean"][central])
+            if background <= 0:
+                raise ValueError("背景ROI均值为零，无法计算对比度")
+            ratios = sphere_means[:, central] / background
+            contrast = {"hot_sphere_contrast": float(ratios.max()), "central_slice": central}
+            contrast.update((label, float(value)) for label, value in zip(labels, ratios))
+
+        central = int(contrast["central_slice"])
+        contrast_ratios = np.array([contrast[label] for label in labels], dtype=np.float64)
+
+        results = {}
+        if wants("recovery_coefficients"):
+            recovery = (contrast_ratios - 1.0) / (ratio - 1.0) if ratio > 1.0 else np.zeros_like(contrast_ratios)
+            results["recovery_coefficients"] = {label: float(rc) for label, rc in zip(labels, recovery)}
+        if wants("contrast"):
+            results["contrast"] = contrast
+        if wants("noise"):
+            if bg_stats is None:
+                bg_stats = roi_reduce(volume, bg_idx)
+            background = float(bg_stats["mean"][central])
+            bg_means = bg_stats["mean"][bg_stats["mean"] > 0]
+            results["noise"] = {
+                "background_noise": 100.0 * float(bg_stats["std"][central]) / background if background > 0 else 0.0,
+                "uniformity": 100.0 * float(bg_means.std() / bg_means.mean()) if bg_means.size else 0.0
+            }
+        if wants("statistics"):
+            results["statistics"] = {
+                "total_spheres": len(spheres),
+                "central_slice": central,
+                "hot_sphere_ratio": ratio,
+                "background_area": int(bg_idx.size),
+                "analysis_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+        return results
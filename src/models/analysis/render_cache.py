@@ -0,0 +1,143 @@
+# src/models/analysis/render_cache.py
+
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 支持的显示视图
+SLICE_VIEWS = ("axial", "coronal", "sagittal")
+MIP_VIEWS = ("mip_axial", "mip_coronal", "mip_sagittal")
+VIEW_AXES = {"axial": 0, "coronal": 1, "sagittal": 2}
+
+
+class VolumeRenderCache:
+    """体数据显示缓存，加载后一次性生成降采样切片、三向MIP和直方图
+
+    所有显示数据都量化为 uint8 保存（窗宽窗位在构建时确定），界面刷新只需
+    按视图取出小数组交给 AxesImage.set_data，不再反复处理全分辨率数据。
+    """
+
+    def __init__(self, volume: np.ndarray, spacing: Tuple[float, float, float] = (1.0, 1.0, 1.0),
+                 max_size: int = 256, bins: int = 256,
+                 value_range: Optional[Tuple[float, float]] = None):
+        """
+        Args:
+            volume: 图像体数据 (nz, ny, nx)
+            spacing: 体素间距 (dz, dy, dx) mm
+            max_size: 切片面内最大显示尺寸，超出时按整数因子降采样
+            bins: 直方图分箱数
+            value_range: 量化窗口 (vmin, vmax)，默认取体数据最小/最大值
+        """
+        start = time.perf_counter()
+        if volume.ndim == 2:
+            volume = volume[np.newaxis]
+        self.shape = tuple(int(s) for s in volume.shape)
+        self.spacing = tuple(float(s) for s in spacing)
+
+        nz, ny, nx = self.shape
+        self.factor = max(1, int(np.ceil(max(ny, nx) / float(max_size))))
+
+        if value_range is None:
+            value_range = (float(volume.min()), float(volume.max()))
+        self.vmin, self.vmax = value_range
+        self._scale = 255.0 / (self.vmax - self.vmin) if self.vmax > self.vmin else 0.0
+
+        # 面内块平均降采样后量化，冠状/矢状切片直接从这份数据中切出
+        self.slices = self._quantize(self._downsample_plane(volume))
+        self.mips = {
+            "mip_axial": self._quantize(self._downsample_plane(volume.max(axis=0))),
+            "mip_coronal": self._quantize(volume.max(axis=1)[:, ::self.factor]),
+            "mip_sagittal": self._quantize(volume.max(axis=2)[:, ::self.factor])
+        }
+
+        counts, edges = np.histogram(volume, bins=bins, range=(self.vmin, self.vmax) if self._scale else None)
+        self.histogram = (counts, edges)
+
+        self.build_time = time.perf_counter() - start
+        logger.debug(f"显示缓存构建完成: {self.shape} -> {self.slices.shape}, 耗时 {self.build_time:.3f}s")
+
+    def _downsample_plane(self, data: np.ndarray) -> np.ndarray:
+        """在最后两个轴上按块平均降采样"""
+        f = self.factor
+        if f == 1:
+            return data
+        ny, nx = data.shape[-2] // f, data.shape[-1] // f
+        cropped = data[..., :ny * f, :nx * f]
+        return cropped.reshape(data.shape[:-2] + (ny, f, nx, f)).mean(axis=(-3, -1), dtype=np.float32)
+
+    def _quantize(self, data: np.ndarray) -> np.ndarray:
+        scaled = (np.asarray(data, dtype=np.float32) - self.vmin) * self._scale
+        result = np.clip(scaled, 0, 255).astype(np.uint8)
+        result.setflags(write=False)
+        return result
+
+    def to_value(self, level: float) -> float:
+        """把 uint8 灰度级换算回原始数值（用于色标刻度）"""
+        if not self._scale:
+            return self.vmin
+        return self.vmin + level / self._scale
+
+    def slice_count(self, view: str) -> int:
+        """返回指定视图可浏览的切片数，MIP视图为1"""
+        if view in VIEW_AXES:
+            return self.shape[VIEW_AXES[view]]
+        return 1
+
+    def get(self, view: str, index: int = 0) -> np.ndarray:
+        """
+        取出显示用的 uint8 图像
+
+        Args:
+            view: axial/coronal/sagittal 或 mip_axial/mip_coronal/mip_sagittal
+            index: 切片序号（原始体数据坐标，MIP视图忽略）
+        """
+        if view in self.mips:
+            return self.mips[view]
+        if view not in VIEW_AXES:
+            raise ValueError(f"不支持的视图: {view}")
+
+        index = int(np.clip(index, 0, self.slice_count(view) - 1))
+        if view == "axial":
+            return self.slices[index]
+        if view == "coronal":
+            return self.slices[:, min(index // self.factor, self.slices.shape[1] - 1), :]
+        return self.slices[:, :, min(index // self.factor, self.slices.shape[2] - 1)]
+
+    def extent(self, view: str) -> Tuple[float, float, float, float]:
+        """
+        返回 imshow 的 extent，坐标为原始体素序号
+
+        轴位视图横纵轴为 (x, y)，冠状位为 (x, z)，矢状位为 (y, z)，
+        因此叠加的ROI可以直接使用原始像素坐标。
+        """
+        nz, ny, nx = self.shape
+        if view in ("axial", "mip_axial"):
+            return (-0.5, nx - 0.5, ny - 0.5, -0.5)
+        if view in ("coronal", "mip_coronal"):
+            return (-0.5, nx - 0.5, nz - 0.5, -0.5)
+        return (-0.5, ny - 0.5, nz - 0.5, -0.5)
+
+    def aspect(self, view: str) -> float:
+        """返回显示纵横比（纵轴间距/横轴间距）"""
+        dz, dy, dx = self.spacing
+        if view in ("axial", "mip_axial"):
+            return dy / dx
+        if view in ("coronal", "mip_coronal"):
+            return dz / dx
+        return dz / dy
+
+    def memory_bytes(self) -> int:
+        """缓存占用的字节数"""
+        total = self.slices.nbytes + sum(m.nbytes for m in self.mips.values())
+        return total + self.histogram[0].nbytes + self.histogram[1].nbytes
+
+    def info(self) -> Dict[str, float]:
+        return {
+            "factor": self.factor,
+            "memory_kb": self.memory_bytes() / 1024.0,
+            "build_time": self.build_time
+        }
@@ -0,0 +1,205 @@
+# src/models/analysis/results_cache.py
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 各分析类型中，每类结果依赖的 phantom_analysis 参数路径。
+# 参数变化时只有依赖它的类别失效，其余类别继续使用缓存。
+METRIC_DEPENDENCIES = {
+    "Uniform": {
+        "uniformity": [("roi_settings", "center_x"), ("roi_settings", "center_y"),
+                       ("roi_settings", "radius"), ("uniformity_settings",)],
+        "noise": [("roi_settings", "center_x"), ("roi_settings", "center_y"),
+                  ("roi_settings", "radius"), ("uniformity_settings",)],
+        "statistics": [("roi_settings",), ("uniformity_settings",)]
+    },
+    "NEMA-IQ": {
+        "recovery_coefficients": [("roi_settings",), ("sphere_settings",)],
+        "contrast": [("roi_settings",), ("sphere_settings", "sphere_positions")],
+        "noise": [("roi_settings",), ("sphere_settings", "sphere_positions")],
+        "statistics": [("roi_settings",), ("sphere_settings",)]
+    },
+    "Hoffman": {
+        "registration": [("hoffman_settings", "registration_levels")],
+        "contrast": [("hoffman_settings",)],
+        "statistics": [("hoffman_settings", "registration_levels")]
+    }
+}
+
+# 文件内容哈希的读块大小
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def default_cache_dir() -> str:
+    """结果缓存目录：与实验JSON放在同一个 experiments 目录下"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    # current_dir 是 .../src/models/analysis，向上3级为项目根目录
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+    return os.path.join(project_root, "experiments", ".analysis_cache")
+
+
+def _lookup_path(params: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    value = params
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _digest(value: Any) -> str:
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class AnalysisResultsCache:
+    """磁盘上的分析结果缓存
+
+    缓存键由两部分组成：
+    - 数据源指纹：序列UID + 每个文件的内容哈希。文件哈希按 (路径, 大小, mtime)
+      记忆化，文件未变化时不会重新读取内容。记忆表由多个进程共用，写盘时只把本进程
+      新算出的条目合并进磁盘上的最新版本；
+    - 每个结果类别各自的参数指纹（见 METRIC_DEPENDENCIES）。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._memo_path = os.path.join(self.cache_dir, "file_hashes.json")
+        self._lock = threading.Lock()
+        self._memo = self._read_json(self._memo_path) or {}
+        # 本进程新算出、尚未写盘的文件哈希
+        self._memo_updates: Dict[str, List[Any]] = {}
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取缓存文件失败 {path}: {e}")
+            return None
+
+    @staticmethod
+    def _write_json(path: str, data: Dict[str, Any]):
+        # 先写临时文件再替换，避免中途退出或多进程同时写入留下损坏的缓存
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def file_hash(self, path: str, memo_only: bool = False) -> Optional[str]:
+        """
+        获取文件内容哈希
+
+        Args:
+            path: 文件路径
+            memo_only: 为True时只查记忆表，文件变化或未记录时返回None而不读取内容
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            entry = self._memo.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        if memo_only:
+            return None
+
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+
+        with self._lock:
+            self._memo[path] = self._memo_updates[path] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def source_fingerprint(self, series_uid: str, files: Iterable[str],
+                           memo_only: bool = False) -> Optional[str]:
+        """计算数据源指纹，memo_only 时任一文件需要重新哈希则返回None"""
+        hashes = []
+        for path in sorted(files):
+            digest = self.file_hash(path, memo_only=memo_only)
+            if digest is None:
+                return None
+            hashes.append(digest)
+        self.flush()
+        return _digest({"series_uid": series_uid or "", "files": hashes})
+
+    def flush(self):
+        """把新算出的文件哈希合并进磁盘上的记忆表（其他进程写入的条目保留）"""
+        with self._lock:
+            if not self._memo_updates:
+                return
+            updates = self._memo_updates
+            self._memo_updates = {}
+            memo = self._read_json(self._memo_path) or {}
+            memo.update(updates)
+            try:
+                self._write_json(self._memo_path, memo)
+            except Exception as e:
+                logger.warning(f"保存文件哈希记忆表失败: {e}")
+                return
+            self._memo.update(memo)
+
+    @staticmethod
+    def category_keys(params: Dict[str, Any]) -> Dict[str, str]:
+        """计算当前参数下每个结果类别的参数指纹"""
+        analysis_type = params.get("analysis_type", "Uniform")
+        dependencies = METRIC_DEPENDENCIES.get(analysis_type, {})
+        return {
+            category: _digest([_lookup_path(params, path) for path in paths])
+            for category, paths in dependencies.items()
+        }
+
+    def _entry_path(self, source: str) -> str:
+        return os.path.join(self.cache_dir, f"{source}.json")
+
+    def lookup(self, source: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        查询缓存
+
+        Returns:
+            (cached_results, missing_categories)：命中的类别结果和需要重新计算的类别
+        """
+        analysis_type = params.get("analysis_type", "Uniform")
+        keys = self.category_keys(params)
+        data = self._read_json(self._entry_path(source)) or {}
+        stored = data.get("results", {}).get(analysis_type, {})
+
+        cached, missing = {}, []
+        for category, key in keys.items():
+            entry = stored.get(category)
+            if entry and entry.get("key") == key:
+                cached[category] = entry["values"]
+            else:
+                missing.append(category)
+        return cached, missing
+
+    def store(self, source: str, params: Dict[str, Any], results: Dict[str, Any]):
+        """写入新计算的类别结果，其他类别的缓存保持不变"""
+        analysis_type = params.get("analysis_type", "Uniform")
+        keys = self.category_keys(params)
+        path = self._entry_path(source)
+
+        with self._lock:
+            data = self._read_json(path) or {"results": {}}
+            stored = data.setdefault("results", {}).setdefault(analysis_type, {})
+            for category, values in results.items():
+                if category in keys:
+                    stored[category] = {"key": keys[category], "values": values}
+            data["updated_at"] = datetime.now().isoformat()
+            try:
+                self._write_json(path, data)
+            except Exception as e:
+                logger.warning(f"写入分析结果缓存失败 {path}: {e}")
@@ -0,0 +1,135 @@
+# src/models/analysis/roi.py
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class RoiMaskCache:
+    """ROI掩膜缓存，按几何参数 (shape, center, radius, spacing) 做LRU淘汰
+
+    交互调整ROI时，同一组几何参数的掩膜会被反复用到。缓存保存的是掩膜在
+    展平图像中的线性索引，重新统计时只需做一次 take + 归约。
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize_key(kind: str, shape, center, radius, spacing) -> tuple:
+        """把参数规整为可哈希的缓存键"""
+        shape = tuple(int(s) for s in shape[-2:])
+        center = (float(center[0]), float(center[1]))
+        if isinstance(radius, (tuple, list)):
+            radius = tuple(float(r) for r in radius)
+        else:
+            radius = float(radius)
+        spacing = (float(spacing[0]), float(spacing[1]))
+        return (kind, shape, center, radius, spacing)
+
+    def _lookup(self, key: tuple, builder) -> np.ndarray:
+        with self._lock:
+            indices = self._entries.get(key)
+            if indices is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return indices
+
+        # 在锁外构建，避免阻塞其他线程的命中查询
+        indices = builder()
+        indices.setflags(write=False)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = indices
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return indices
+
+    def disk_indices(self, shape, center, radius, spacing=(1.0, 1.0)) -> np.ndarray:
+        """
+        获取圆形ROI在展平切片中的线性索引
+
+        Args:
+            shape: 切片形状 (ny, nx)，多余的前导维度会被忽略
+            center: ROI中心 (x, y)，单位为像素
+            radius: ROI半径，单位为mm（spacing为1时即像素）
+            spacing: 像素间距 (dy, dx)，单位mm
+
+        Returns:
+            只读的int64索引数组
+        """
+        key = self._normalize_key("disk", shape, center, radius, spacing)
+        return self._lookup(key, lambda: self._build_disk(key[1], key[2], key[3], key[4]))
+
+    def annulus_indices(self, shape, center, inner_radius, outer_radius,
+                        spacing=(1.0, 1.0)) -> np.ndarray:
+        """获取环形ROI（背景区域）在展平切片中的线性索引"""
+        key = self._normalize_key("annulus", shape, center, (inner_radius, outer_radius), spacing)
+
+        def build():
+            outer = self.disk_indices(shape, center, outer_radius, spacing)
+            inner = self.disk_indices(shape, center, inner_radius, spacing)
+            return np.setdiff1d(outer, inner, assume_unique=True)
+
+        return self._lookup(key, build)
+
+    def disk_mask(self, shape, center, radius, spacing=(1.0, 1.0)) -> np.ndarray:
+        """获取圆形ROI的布尔掩膜（用于显示等需要二维掩膜的场合）"""
+        shape = tuple(int(s) for s in shape[-2:])
+        mask = np.zeros(shape[0] * shape[1], dtype=bool)
+        mask[self.disk_indices(shape, center, radius, spacing)] = True
+        return mask.reshape(shape)
+
+    @staticmethod
+    def _build_disk(shape: Tuple[int, int], center: Tuple[float, float],
+                    radius: float, spacing: Tuple[float, float]) -> np.ndarray:
+        ny, nx = shape
+        cx, cy = center
+        dy, dx = spacing
+        y, x = np.ogrid[:ny, :nx]
+        dist_sq = ((x - cx) * dx) ** 2 + ((y - cy) * dy) ** 2
+        return np.flatnonzero(dist_sq <= radius * radius).astype(np.int64)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def roi_reduce(volume: np.ndarray, indices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    对每个切片做ROI归约
+
+    Args:
+        volume: 形状为 (nz, ny, nx) 或 (ny, nx) 的图像
+        indices: 切片内的线性索引（来自 RoiMaskCache）
+
+    Returns:
+        包含每切片 mean/std/min/max 的字典，以及体素数 count
+    """
+    if volume.ndim == 2:
+        volume = volume[np.newaxis]
+    flat = volume.reshape(volume.shape[0], -1)
+    if indices.size == 0:
+        empty = np.zeros(volume.shape[0], dtype=np.float64)
+        return {"mean": empty, "std": empty, "min": empty, "max": empty, "count": 0}
+
+    values = np.take(flat, indices, axis=1)
+    return {
+        "mean": values.mean(axis=1, dtype=np.float64),
+        "std": values.std(axis=1, dtype=np.float64),
+        "min": values.min(axis=1),
+        "max": values.max(axis=1),
+        "count": int(indices.size)
+    }
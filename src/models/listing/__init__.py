@@ -0,0 +1 @@
+# experiment listing package 
\ No newline at end of file
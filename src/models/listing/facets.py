@@ -0,0 +1,247 @@
+# src/models/listing/facets.py
+
+import logging
+from typing import Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 分面字段（store 列名）
+FACET_FIELDS = ("isotope", "center", "device_model", "model_type")
+# 日期无法解析的行的日期键，日期范围筛选时总是排除
+NO_DATE = np.iinfo(np.int64).min
+# 位图数组的最小容量，追加时按倍数扩容
+MIN_CAPACITY = 64
+
+DateRange = Tuple[Optional[str], Optional[str]]
+
+
+def date_keys(dates: Sequence[str], unit: str = "D") -> np.ndarray:
+    """
+    把日期/时间字符串转换为整数（unit 为 "D" 时是天数，"s" 时是秒数），无法解析的为 NO_DATE
+
+    接受 "YYYY-MM-DD" 和 "YYYY-MM-DD HH:MM:SS" 形式。
+    """
+    dates = list(dates)
+    dtype = f"datetime64[{unit}]"
+    try:
+        return np.array(dates, dtype=dtype).astype(np.int64)
+    except ValueError:
+        keys = np.full(len(dates), NO_DATE, dtype=np.int64)
+        for i, text in enumerate(dates):
+            try:
+                keys[i] = np.datetime64(text, unit).astype(np.int64)
+            except ValueError:
+                pass
+        return keys
+
+
+def _date_key(text: Optional[str]) -> Optional[int]:
+    if not text:
+        return None
+    return int(np.datetime64(str(text)[:10], "D").astype(np.int64))
+
+
+class FacetEngine:
+    """实验列表的分面筛选
+
+    每个分面字段的每个取值对应一个布尔数组（位图，下标为存储索引），日期保存为整数天数。
+    多个条件的组合筛选是位图的按位或（同一字段内多选）和按位与（字段之间），各取值的
+    计数是位图与其余条件结果按位与后的 popcount，不再逐个遍历实验。增删改只修改对应
+    的位，不重新扫描全部数据。
+    """
+
+    def __init__(self, fields: Sequence[str] = FACET_FIELDS):
+        self.fields = tuple(fields)
+        self.build({field: [] for field in self.fields}, [])
+
+    def __len__(self):
+        return self.size
+
+    def build(self, columns: Mapping[str, Sequence[str]], dates: Sequence[str]):
+        """
+        从列数据重建全部位图
+
+        Args:
+            columns: {字段: 按存储索引排列的取值}
+            dates: 按存储索引排列的日期字符串
+        """
+        self.size = len(dates)
+        self._capacity = max(MIN_CAPACITY, self.size)
+        self.bitsets: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in self.fields:
+            values = np.array(columns[field], dtype=object)
+            bitsets = {}
+            if self.size:
+                uniques, codes = np.unique(values, return_inverse=True)
+                codes = codes.ravel()
+                for code, value in enumerate(uniques):
+                    bits = np.zeros(self._capacity, dtype=bool)
+                    bits[:self.size] = codes == code
+                    bitsets[value] = bits
+            self.bitsets[field] = bitsets
+        self.days = np.full(self._capacity, NO_DATE, dtype=np.int64)
+        self.days[:self.size] = date_keys(dates)
+        logger.debug(f"分面索引: {self.size} 行，"
+                     + "，".join(f"{field} {len(self.bitsets[field])} 个取值" for field in self.fields))
+
+    def _grow(self, size: int):
+        """保证容量不小于 size，位图和日期数组按倍数扩容"""
+        if size <= self._capacity:
+            return
+        capacity = max(size, self._capacity * 2)
+        for bitsets in self.bitsets.values():
+            for value, bits in bitsets.items():
+                grown = np.zeros(capacity, dtype=bool)
+                grown[:self.size] = bits[:self.size]
+                bitsets[value] = grown
+        days = np.full(capacity, NO_DATE, dtype=np.int64)
+        days[:self.size] = self.days[:self.size]
+        self.days = days
+        self._capacity = capacity
+
+    def _set(self, field: str, value: str, row: int):
+        bits = self.bitsets[field].get(value)
+        if bits is None:
+            bits = self.bitsets[field][value] = np.zeros(self._capacity, dtype=bool)
+        bits[row] = True
+
+    def _clear(self, field: str, value: str, row: int):
+        bits = self.bitsets[field].get(value)
+        if bits is None:
+            return
+        bits[row] = False
+        if not bits[:self.size].any():
+            # 取值不再出现时从分面中去掉
+            del self.bitsets[field][value]
+
+    def append(self, rows: Sequence[Mapping[str, str]]):
+        """
+        在末尾追加行
+
+        Args:
+            rows: 每行的 {字段: 取值}，需包含全部分面字段和 date
+        """
+        if not rows:
+            return
+        start = self.size
+        self._grow(start + len(rows))
+        self.size = start + len(rows)
+        for field in self.fields:
+            for row, values in enumerate(rows, start):
+                self._set(field, values[field], row)
+        self.days[start:self.size] = date_keys([values["date"] for values in rows])
+
+    def update(self, row: int, old: Mapping[str, str], new: Mapping[str, str]):
+        """一行的取值从 old 变为 new，只修改变化字段的位"""
+        for field in self.fields:
+            if old[field] != new[field]:
+                self._clear(field, old[field], row)
+                self._set(field, new[field], row)
+        if old["date"] != new["date"]:
+            self.days[row] = date_keys([new["date"]])[0]
+
+    def remove(self, row: int, old: Mapping[str, str]):
+        """删除一行，之后的行前移一位（与存储索引保持一致）"""
+        self.remove_many([row], [old])
+
+    def remove_many(self, rows: Sequence[int], olds: Sequence[Mapping[str, str]]):
+        """
+        删除多行，其余行一次前移（与存储索引保持一致）
+
+        Args:
+            rows: 删除前的行号（不重复）
+            olds: 各行的 {字段: 取值}，与 rows 一一对应
+        """
+        if not len(rows):
+            return
+        for field in self.fields:
+            for row, old in zip(rows, olds):
+                self._clear(field, old[field], row)
+        keep = np.ones(self.size, dtype=bool)
+        keep[np.asarray(rows, dtype=np.int64)] = False
+        size = int(keep.sum())
+        for bitsets in self.bitsets.values():
+            for bits in bitsets.values():
+                bits[:size] = bits[:self.size][keep]
+                bits[size:self.size] = False
+        self.days[:size] = self.days[:self.size][keep]
+        self.days[size:self.size] = NO_DATE
+        self.size = size
+
+    def values(self, field: str) -> List[str]:
+        """字段当前出现的全部取值（排序）"""
+        return sorted(self.bitsets[field])
+
+    def date_bounds(self) -> Optional[Tuple[str, str]]:
+        """最早和最晚日期 ("YYYY-MM-DD")，没有有效日期时返回 None"""
+        days = self.days[:self.size]
+        days = days[days != NO_DATE]
+        if not len(days):
+            return None
+        return tuple(str(np.datetime64(int(d), "D")) for d in (days.min(), days.max()))
+
+    def _field_mask(self, field: str, selected: Collection[str]) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        bitsets = self.bitsets[field]
+        for value in selected:
+            bits = bitsets.get(value)
+            if bits is not None:
+                mask |= bits[:self.size]
+        return mask
+
+    def _date_mask(self, date_range: DateRange) -> Optional[np.ndarray]:
+        start, end = (_date_key(text) for text in (date_range or (None, None)))
+        if start is None and end is None:
+            return None
+        days = self.days[:self.size]
+        mask = days != NO_DATE
+        if start is not None:
+            mask &= days >= start
+        if end is not None:
+            mask &= days <= end
+        return mask
+
+    def mask(self, selection: Mapping[str, Collection[str]],
+             date_range: DateRange = (None, None), exclude: Optional[str] = None) -> np.ndarray:
+        """
+        组合筛选的布尔数组（下标为存储索引）
+
+        Args:
+            selection: {字段: 选中的取值集合}，集合为空的字段不限制
+            date_range: (起始日期, 结束日期)，"YYYY-MM-DD" 或 None，两端都包含
+            exclude: 计算该字段的分面计数时忽略它自身的条件
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for field, selected in selection.items():
+            if selected and field != exclude and field in self.bitsets:
+                mask &= self._field_mask(field, selected)
+        date_mask = self._date_mask(date_range)
+        if date_mask is not None:
+            mask &= date_mask
+        return mask
+
+    def counts(self, selection: Mapping[str, Collection[str]], date_range: DateRange = (None, None),
+               base: Optional[np.ndarray] = None) -> Dict[str, Dict[str, int]]:
+        """
+        各分面取值在其余条件下的命中数
+
+        某个字段的计数不受该字段自身的选择影响，因此选中一个取值后仍能看到同字段
+        其他取值的数量。
+
+        Args:
+            selection, date_range: 同 mask
+            base: 额外的布尔条件（如搜索命中），None 表示不限制
+
+        Returns:
+            {字段: {取值: 数量}}
+        """
+        result = {}
+        for field in self.fields:
+            mask = self.mask(selection, date_range, exclude=field)
+            if base is not None:
+                mask &= base
+            result[field] = {value: int(np.count_nonzero(bits[:self.size] & mask))
+                             for value, bits in self.bitsets[field].items()}
+        return result
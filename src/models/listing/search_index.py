@@ -0,0 +1,177 @@
+# src/models/listing/search_index.py
+
+import logging
+from typing import List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 行内字段分隔符（与 store.SEARCH_SEPARATOR 一致），n-gram 不跨越分隔符
+SEPARATOR = "\n"
+# 二元组编码：((前一字符 + 1) << 21) | 后一字符，与一元组（字符码位 < 2^21）不重叠
+CODE_SHIFT = 21
+# 增量文档数超过 max(REBUILD_MIN_DELTA, 基础文档数 * REBUILD_FRACTION) 时重建倒排表
+REBUILD_MIN_DELTA = 1024
+REBUILD_FRACTION = 0.1
+
+
+def _codepoints(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+
+def _gram_codes(cp: np.ndarray) -> np.ndarray:
+    """一段码位序列中的一元组和二元组编码（不跨越分隔符）"""
+    valid = cp != ord(SEPARATOR)
+    unigrams = cp[valid]
+    pair = valid[:-1] & valid[1:]
+    bigrams = ((cp[:-1][pair] + 1) << CODE_SHIFT) | cp[1:][pair]
+    return np.concatenate([unigrams, bigrams])
+
+
+class SearchIndex:
+    """实验搜索的 n-gram 倒排索引
+
+    每行搜索文本（已转小写，字段间以换行分隔）按字符切分为一元组和二元组，中文按
+    相邻汉字二元组索引，不依赖分词。倒排表以 CSR 形式存放：词表为排序的编码数组，
+    每个编码对应一段排序的文档号。构建完全向量化。
+
+    查询单个字符查一元组，两个及以上字符时对查询的各二元组求交集（从最短的倒排表
+    开始），超过两个字符时再对候选做子串校验以排除跨位置的误匹配。
+
+    新增和修改的行作为增量文档追加，查询时直接做子串匹配；删除和修改只把旧文档
+    标记为失效。增量积累到一定数量后整体重建。文档号与存储行号通过 doc_row/row_doc
+    互相映射，删除行时前移后续行号。
+    """
+
+    def __init__(self, texts: Sequence[str] = ()):
+        self.build(texts)
+
+    def build(self, texts: Sequence[str]):
+        """按行文本重建索引，文档号即行号"""
+        texts = list(texts)
+        self.texts: List[str] = texts
+        n = len(texts)
+        self.base_docs = n
+        self.alive = np.ones(n, dtype=bool)
+        self.doc_row = np.arange(n, dtype=np.int64)
+        self.row_doc = np.arange(n, dtype=np.int64)
+
+        if n == 0:
+            self.vocab = np.zeros(0, dtype=np.int64)
+            self.indptr = np.zeros(1, dtype=np.int64)
+            self.postings = np.zeros(0, dtype=np.int64)
+            return
+
+        # 所有文本用分隔符连成一串，一次得到全部位置的码位和文档号
+        cp = _codepoints(SEPARATOR.join(texts) + SEPARATOR)
+        lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=n)
+        docs = np.repeat(np.arange(n, dtype=np.int64), lengths)
+        valid = cp != ord(SEPARATOR)
+        pair = valid[:-1] & valid[1:]
+        codes = np.concatenate([cp[valid], ((cp[:-1][pair] + 1) << CODE_SHIFT) | cp[1:][pair]])
+        docs = np.concatenate([docs[valid], docs[:-1][pair]])
+
+        # 文档号已按位置升序，对编码稳定排序即得到 (编码, 文档) 顺序，去重后为 CSR 倒排表
+        order = np.argsort(codes, kind="stable")
+        codes, docs = codes[order], docs[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (docs[1:] != docs[:-1])
+        codes, docs = codes[keep], docs[keep]
+        self.vocab, starts = np.unique(codes, return_index=True)
+        self.indptr = np.append(starts, len(codes)).astype(np.int64)
+        self.postings = docs
+        logger.debug(f"搜索索引: {n} 行，{len(self.vocab)} 个n-gram，{len(docs)} 条倒排")
+
+    def __len__(self):
+        return len(self.row_doc)
+
+    def _posting(self, code: int) -> np.ndarray:
+        k = int(np.searchsorted(self.vocab, code))
+        if k == len(self.vocab) or self.vocab[k] != code:
+            return self.postings[:0]
+        return self.postings[self.indptr[k]:self.indptr[k + 1]]
+
+    def _maybe_rebuild(self):
+        delta = len(self.texts) - self.base_docs
+        dead = len(self.texts) - len(self.row_doc)
+        if max(delta, dead) > max(REBUILD_MIN_DELTA, self.base_docs * REBUILD_FRACTION):
+            self.build([self.texts[d] for d in self.row_doc])
+
+    def append(self, texts: Sequence[str]):
+        """在末尾追加行"""
+        texts = list(texts)
+        if not texts:
+            return
+        first_doc = len(self.texts)
+        first_row = len(self.row_doc)
+        self.texts.extend(texts)
+        new_docs = np.arange(first_doc, first_doc + len(texts), dtype=np.int64)
+        self.alive = np.concatenate([self.alive, np.ones(len(texts), dtype=bool)])
+        self.doc_row = np.concatenate([self.doc_row, first_row + np.arange(len(texts), dtype=np.int64)])
+        self.row_doc = np.concatenate([self.row_doc, new_docs])
+        self._maybe_rebuild()
+
+    def update(self, row: int, text: str):
+        """替换一行的文本：旧文档失效，新文本作为增量文档"""
+        old = self.row_doc[row]
+        if self.texts[old] == text:
+            return
+        self.alive[old] = False
+        self.doc_row[old] = -1
+        self.texts.append(text)
+        self.alive = np.append(self.alive, True)
+        self.doc_row = np.append(self.doc_row, row)
+        self.row_doc[row] = len(self.texts) - 1
+        self._maybe_rebuild()
+
+    def remove(self, row: int):
+        """删除一行，之后的行号减一"""
+        self.remove_many([row])
+
+    def remove_many(self, rows: Sequence[int]):
+        """删除多行（删除前的行号），其余行号一次前移"""
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if not len(rows):
+            return
+        old = self.row_doc[rows]
+        self.alive[old] = False
+        self.doc_row[old] = -1
+        live = self.doc_row >= 0
+        self.doc_row[live] -= np.searchsorted(rows, self.doc_row[live])
+        self.row_doc = np.delete(self.row_doc, rows)
+        self._maybe_rebuild()
+
+    def query(self, term: str) -> np.ndarray:
+        """
+        查找包含 term 的行（term 应已规范化为小写）
+
+        Returns:
+            升序的行号数组
+        """
+        if not term:
+            return np.arange(len(self.row_doc), dtype=np.int64)
+        cp = _codepoints(term)
+        if SEPARATOR in term:
+            docs = self.postings[:0]
+        else:
+            codes = np.unique(_gram_codes(cp)[len(cp):] if len(cp) > 1 else cp)
+            lists = sorted((self._posting(int(code)) for code in codes), key=len)
+            docs = lists[0]
+            for posting in lists[1:]:
+                if not len(docs):
+                    break
+                docs = np.intersect1d(docs, posting, assume_unique=True)
+            docs = docs[self.alive[docs]]
+            if len(cp) > 2 and len(docs):
+                texts = self.texts
+                docs = np.fromiter((d for d in docs if term in texts[d]), dtype=np.int64)
+
+        # 增量文档直接做子串匹配
+        if len(self.texts) > self.base_docs:
+            texts = self.texts
+            delta = np.arange(self.base_docs, len(texts), dtype=np.int64)
+            delta = delta[self.alive[delta]]
+            extra = np.fromiter((d for d in delta if term in texts[d]), dtype=np.int64)
+            docs = np.concatenate([docs, extra])
+        return np.sort(self.doc_row[docs])
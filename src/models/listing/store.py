@@ -0,0 +1,375 @@
+# src/models/listing/store.py
+
+import locale
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .facets import FacetEngine, date_keys
+from .search_index import SearchIndex, SEPARATOR
+
+logger = logging.getLogger(__name__)
+
+# 列表显示用到的字段（与 Experiment 的顶层属性或 parameters 中的键对应）
+LIST_FIELDS = ("name", "center", "date", "model_type", "isotope", "device_model", "remark", "created_at")
+# 参与全文搜索的字段
+SEARCH_FIELDS = ("name", "center", "model_type", "isotope", "device_model", "remark")
+# 拼接搜索文本时的字段分隔符，避免查询跨字段匹配
+SEARCH_SEPARATOR = SEPARATOR
+# 按时间排序的字段及其精度（日期到天，创建时间到秒），无法解析的值排在最前
+TEMPORAL_FIELDS = {"date": "D", "created_at": "s"}
+# 排序方式: ((字段, 是否降序), ...)，第一项为主排序键
+SortSpec = Tuple[Tuple[str, bool], ...]
+
+_collation_key: Optional[Callable[[str], Any]] = None
+
+
+def _make_collation_key() -> Callable[[str], Any]:
+    """
+    选择文本排序规则
+
+    优先用 pypinyin 按拼音排序（可选依赖）；其次在中文 locale 下用 strxfrm（按系统
+    规则的拼音或笔画顺序）；都不可用时按 GB18030 编码排序，常用汉字（GB2312 一级字）
+    在该编码中即按拼音排列。
+    """
+    try:
+        from pypinyin import lazy_pinyin
+        return lambda text: (" ".join(lazy_pinyin(text.casefold())), text)
+    except ImportError:
+        pass
+    collate = locale.setlocale(locale.LC_COLLATE) or ""
+    if collate.lower().startswith("zh"):
+        return lambda text: (locale.strxfrm(text.casefold()), text)
+
+    def gb18030_key(text):
+        try:
+            return text.casefold().encode("gb18030"), text.encode("gb18030")
+        except UnicodeEncodeError:
+            return text.casefold().encode("utf-8"), text.encode("utf-8")
+    return gb18030_key
+
+
+def collation_key(text: str) -> Any:
+    """文本的排序比较键（不区分大小写，中文按拼音），规则在首次调用时确定"""
+    global _collation_key
+    if _collation_key is None:
+        _collation_key = _make_collation_key()
+    return _collation_key(text)
+
+
+def list_values(experiment) -> Dict[str, str]:
+    """提取实验在列表中显示的字段（全部转换为字符串）"""
+    parameters = experiment.parameters or {}
+    created_at = experiment.created_at
+    if isinstance(created_at, datetime):
+        created_at = created_at.strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "name": str(experiment.name or ""),
+        "center": str(experiment.center or ""),
+        "date": str(experiment.date or ""),
+        "model_type": str(experiment.model_type or ""),
+        "isotope": str(parameters.get("isotope", "") or ""),
+        "device_model": str(parameters.get("device_model", "") or ""),
+        "remark": str(parameters.get("remark", "") or ""),
+        "created_at": str(created_at or "")
+    }
+
+
+def drop_rows(rows: np.ndarray, removed: Iterable[int]) -> np.ndarray:
+    """从行号数组中去掉已删除的存储索引，并把其后的索引前移（与 remove 之后的编号一致）"""
+    rows = np.asarray(rows, dtype=np.int64)
+    removed = np.unique(np.asarray(list(removed), dtype=np.int64))
+    if not len(removed) or not len(rows):
+        return rows
+    kept = rows[~np.isin(rows, removed)]
+    return kept - np.searchsorted(removed, kept)
+
+
+class ExperimentListStore:
+    """实验列表的列式内存存储
+
+    每个列表字段保存为一列字符串，按行号（存储索引）访问；界面模型只保存行号数组，
+    只在 Qt 请求可见单元格时取值。排序键按列惰性计算为整数数组（文本按拼音规则，
+    日期按时间），多列排序的结果按排序方式缓存，数据变化时（version 递增）失效。搜索使用随增删改增量维护的 n-gram 倒排索引（SearchIndex），
+    分面筛选使用每个取值一个位图的 FacetEngine，二者都随增删改增量维护。
+    """
+
+    def __init__(self, experiments: Optional[Iterable[Any]] = None):
+        self.columns: Dict[str, List[str]] = {field: [] for field in LIST_FIELDS}
+        self.ids: List[str] = []
+        self.experiments: List[Any] = []
+        # 实验ID -> 存储索引（同ID有多行时为最后一行）
+        self._index: Dict[str, int] = {}
+        # id(实验对象) -> 存储索引；复制的实验文件可能共用实验ID，定位具体实验只按对象查找
+        self._rows: Dict[int, int] = {}
+        self.search_index = SearchIndex()
+        self.facets = FacetEngine()
+        # {字段: (计算时的 version, 排序键)}
+        self._sort_keys: Dict[str, Tuple[int, np.ndarray]] = {}
+        # {排序方式: (计算时的 version, 顺序, 位置)}
+        self._orders: Dict[SortSpec, Tuple[int, np.ndarray, np.ndarray]] = {}
+        self.version = 0
+        if experiments is not None:
+            self.load(experiments)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _changed(self, fields: Optional[Iterable[str]] = None):
+        """
+        数据变化：version 递增，排序缓存失效
+
+        Args:
+            fields: 只有这些列的值变化（行数和行号不变）时，其余列的排序键和不涉及这些列
+                的排序顺序仍然有效，改记为新的 version；None 表示全部失效
+        """
+        version = self.version
+        self.version += 1
+        if fields is None:
+            self._sort_keys.clear()
+            self._orders.clear()
+            return
+        fields = set(fields)
+        self._sort_keys = {field: (self.version, key) for field, (stamp, key) in self._sort_keys.items()
+                           if stamp == version and field not in fields}
+        self._orders = {spec: (self.version, order, rank) for spec, (stamp, order, rank) in self._orders.items()
+                        if stamp == version and not fields.intersection(field for field, _ in spec)}
+
+    def _search_row(self, values: Dict[str, str]) -> str:
+        return SEARCH_SEPARATOR.join(values[field].lower() for field in SEARCH_FIELDS)
+
+    def load(self, experiments: Iterable[Any]):
+        """用实验列表整体替换存储内容"""
+        experiments = list(experiments)
+        rows = [list_values(exp) for exp in experiments]
+        self.columns = {field: [row[field] for row in rows] for field in LIST_FIELDS}
+        self.experiments = experiments
+        self.ids = [exp.id for exp in experiments]
+        self._index = {experiment_id: i for i, experiment_id in enumerate(self.ids)}
+        self._rows = {id(exp): i for i, exp in enumerate(experiments)}
+        self.search_index.build([self._search_row(row) for row in rows])
+        self.facets.build(self.columns, self.columns["date"])
+        self._changed()
+
+    def add(self, experiment) -> int:
+        """追加一个实验，已存在时改为更新，返回存储索引"""
+        if self.locate(experiment) is not None:
+            return self.update(experiment)
+        values = list_values(experiment)
+        for field in LIST_FIELDS:
+            self.columns[field].append(values[field])
+        self.experiments.append(experiment)
+        self.ids.append(experiment.id)
+        self._index[experiment.id] = len(self.ids) - 1
+        self._rows[id(experiment)] = len(self.ids) - 1
+        self.search_index.append([self._search_row(values)])
+        self.facets.append([values])
+        self._changed()
+        return len(self.ids) - 1
+
+    def extend(self, experiments: Iterable[Any]) -> int:
+        """追加多个新实验（调用方保证ID不重复），返回第一个的存储索引"""
+        experiments = list(experiments)
+        start = len(self.ids)
+        rows = [list_values(exp) for exp in experiments]
+        for field in LIST_FIELDS:
+            self.columns[field].extend(row[field] for row in rows)
+        self.experiments.extend(experiments)
+        for i, exp in enumerate(experiments, start):
+            self.ids.append(exp.id)
+            self._index[exp.id] = i
+            self._rows[id(exp)] = i
+        self.search_index.append([self._search_row(row) for row in rows])
+        self.facets.append(rows)
+        self._changed()
+        return start
+
+    def update(self, experiment) -> Optional[int]:
+        """刷新实验所在的一行（按对象定位，见 locate），返回存储索引，不存在时返回 None"""
+        index, _ = self.update_fields(experiment)
+        return index
+
+    def update_fields(self, experiment) -> Tuple[Optional[int], Tuple[str, ...]]:
+        """
+        刷新实验所在的一行（按对象定位，见 locate），只更新值有变化的列
+
+        列表字段都没有变化时（如只修改了注射器数据）version 不变，排序和过滤结果仍然有效。
+
+        Returns:
+            (存储索引, 值有变化的列表字段)，实验不存在时为 (None, ())
+        """
+        index = self.locate(experiment)
+        if index is None:
+            return None, ()
+        values = list_values(experiment)
+        old = self.row_values(index)
+        changed = tuple(field for field in LIST_FIELDS if values[field] != old[field])
+        if not changed:
+            return index, ()
+        for field in changed:
+            self.columns[field][index] = values[field]
+        if any(field in SEARCH_FIELDS for field in changed):
+            self.search_index.update(index, self._search_row(values))
+        self.facets.update(index, old, values)
+        self._changed(changed)
+        return index, changed
+
+    def remove(self, experiment) -> Optional[int]:
+        """删除一个实验（按对象定位，见 locate），返回其原存储索引；之后的行索引减一"""
+        removed = self.remove_many([experiment])
+        return removed[0] if removed else None
+
+    def remove_many(self, experiments: Iterable[Any]) -> List[int]:
+        """
+        删除多个实验（按对象定位，见 locate），不在存储中的忽略
+
+        删除的行一次移除，之后的行只重新编号一次（逐个 remove 时每次都要重排其后全部行）。
+
+        Returns:
+            被删除实验的原存储索引（升序）
+        """
+        indices = sorted({index for index in map(self.locate, experiments) if index is not None})
+        if not indices:
+            return []
+        first = indices[0]
+        removed = set(indices)
+        self.facets.remove_many(indices, [self.row_values(index) for index in indices])
+        self.search_index.remove_many(indices)
+        lost_ids = {self.ids[index] for index in indices}
+        for index in indices:
+            del self._rows[id(self.experiments[index])]
+        for experiment_id in lost_ids:
+            self._index.pop(experiment_id, None)
+        # 只有第一行删除位置之后的行号变化
+        kept = [i for i in range(first, len(self.ids)) if i not in removed]
+        for field in LIST_FIELDS:
+            column = self.columns[field]
+            column[first:] = [column[i] for i in kept]
+        self.experiments[first:] = [self.experiments[i] for i in kept]
+        self.ids[first:] = [self.ids[i] for i in kept]
+        for i in range(first, len(self.ids)):
+            self._index[self.ids[i]] = i
+            self._rows[id(self.experiments[i])] = i
+        # 同ID的其他实验（在前面的行中）接替
+        missing = lost_ids.difference(self._index)
+        for i in range(first - 1, -1, -1):
+            if not missing:
+                break
+            if self.ids[i] in missing:
+                self._index[self.ids[i]] = i
+                missing.discard(self.ids[i])
+        self._changed()
+        return indices
+
+    def locate(self, experiment) -> Optional[int]:
+        """
+        实验所在的存储索引，不存在时返回 None
+
+        只按对象查找：已删除的实验或不在存储中的对象（如重新读取的副本）都返回 None，
+        不按实验ID回退，避免修改或删除共用ID的另一个实验。
+        """
+        index = self._rows.get(id(experiment))
+        if index is not None and self.experiments[index] is experiment:
+            return index
+        return None
+
+    def index_of(self, experiment_id: str) -> Optional[int]:
+        return self._index.get(experiment_id)
+
+    def experiment(self, index: int):
+        return self.experiments[index]
+
+    def value(self, index: int, field: str) -> str:
+        return self.columns[field][index]
+
+    def row_values(self, index: int) -> Dict[str, str]:
+        return {field: self.columns[field][index] for field in LIST_FIELDS}
+
+    def all_rows(self) -> np.ndarray:
+        return np.arange(len(self.ids), dtype=np.int64)
+
+    def search(self, text: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        在搜索字段中做不区分大小写的子串匹配（通过倒排索引只访问候选行）
+
+        Args:
+            text: 查询文本，为空时返回全部行
+            rows: 只在这些行中查找，None 表示全部行
+
+        Returns:
+            匹配的存储索引数组（rows 为 None 时升序，否则保持输入顺序）
+        """
+        term = (text or "").strip().lower()
+        if not term:
+            return self.all_rows() if rows is None else np.asarray(rows, dtype=np.int64)
+        hits = self.search_index.query(term)
+        if rows is None:
+            return hits
+        rows = np.asarray(rows, dtype=np.int64)
+        return rows[np.isin(rows, hits)]
+
+    def sort_key(self, field: str) -> np.ndarray:
+        """列的整数排序键：同值同键，键的大小顺序即显示的排序顺序
+
+        文本列按 collation_key（不区分大小写，中文按拼音）排序后编号，日期和创建时间
+        按解析出的时间编号。缓存项记录计算时的 version，查询线程算出的键在数据已变化
+        时不会被当作新数据的键。
+        """
+        version = self.version
+        cached = self._sort_keys.get(field)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        values = self.columns[field]
+        if not values:
+            key = np.zeros(0, dtype=np.int64)
+        elif field in TEMPORAL_FIELDS:
+            _, key = np.unique(date_keys(values, TEMPORAL_FIELDS[field]), return_inverse=True)
+            key = key.astype(np.int64).ravel()
+        else:
+            # 只对不同的取值做一次规则比较，再按字典映射回各行
+            ranks = {value: rank for rank, value in enumerate(sorted(set(values), key=collation_key))}
+            key = np.fromiter((ranks[value] for value in values), dtype=np.int64, count=len(values))
+        self._sort_keys[field] = (version, key)
+        return key
+
+    def sort_order(self, spec: SortSpec) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        全部行按排序方式的顺序
+
+        多列排序用 np.lexsort 对各列排序键一次完成（降序列取负键），结果按排序方式
+        缓存到数据变化为止，重复排序和过滤后排序都只需查表。
+
+        Args:
+            spec: ((字段, 是否降序), ...)，第一项为主排序键
+
+        Returns:
+            (order, rank): order 为排好序的存储索引，rank[存储索引] 为该行在 order 中的位置
+        """
+        spec = tuple(spec)
+        version = self.version
+        cached = self._orders.get(spec)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        # lexsort 以最后一个键为主键；存储索引作为最末的次序键，相同键的行保持原顺序
+        keys = [-self.sort_key(field) if descending else self.sort_key(field)
+                for field, descending in reversed(spec)]
+        order = np.lexsort(keys).astype(np.int64) if keys else self.all_rows()
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order), dtype=np.int64)
+        self._orders[spec] = (version, order, rank)
+        return order, rank
+
+    def sort_rows(self, rows: np.ndarray, spec: SortSpec) -> np.ndarray:
+        """按排序方式对行号数组做稳定排序（使用缓存的全表顺序）"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) < 2 or not spec:
+            return rows
+        order, rank = self.sort_order(spec)
+        if len(rows) * 8 < len(order):
+            # 行数较少时直接按位置排序
+            return rows[np.argsort(rank[rows], kind="stable")]
+        mask = np.zeros(len(order), dtype=bool)
+        mask[rows] = True
+        return order[mask[order]]
@@ -0,0 +1 @@
+# reconstruction package 
\ No newline at end of file
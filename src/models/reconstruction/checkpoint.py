@@ -0,0 +1,198 @@
+# src/models/reconstruction/checkpoint.py
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "rebuild_manifest.json"
+MANIFEST_VERSION = 1
+
+# 各阶段依赖的参数：某一级参数变化时，该级及之后的阶段需要重做
+FRAMING_KEYS = ("frame_duration", "total_frames")
+RECON_KEYS = ("iterations", "subsets", "image_size", "random_correction",
+              "scatter_correction", "attenuation_correction", "mumap_path")
+POST_KEYS = ("decay_correction", "smoothing_filter", "filter_fwhm")
+
+
+def file_stat(path: str) -> Optional[Dict[str, int]]:
+    """文件的大小和修改时间，用于判断文件是否被替换；文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def params_fingerprint(params: Dict[str, Any], keys: Iterable[str], **extra) -> str:
+    """参数子集的指纹"""
+    values = {key: params.get(key) for key in keys}
+    values.update(extra)
+    text = json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _atomic_write_json(path: str, data: Dict[str, Any]):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class RebuildManifest:
+    """输出目录中的重建检查点清单
+
+    按输入文件记录已完成的工作单元：分帧、逐帧重建、后处理（衰变校正+平滑）、DICOM
+    输出。每个阶段保存其参数指纹，参数变化时只重做受影响的阶段；输入文件的大小或
+    修改时间变化时整个条目重置。每次标记后立即原子写盘，进程随时中断都能从最后
+    完成的单元继续。
+    """
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self.data = {"version": MANIFEST_VERSION, "files": {}}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.data = data
+            except Exception as e:
+                logger.warning(f"检查点清单损坏，重新开始: {self.path}，错误: {e}")
+
+    def save(self):
+        with self._lock:
+            _atomic_write_json(self.path, self.data)
+
+    def sync(self, input_path: str, fingerprints: Dict[str, str]) -> Dict[str, Any]:
+        """
+        校验输入文件和各阶段参数指纹，使失效的阶段重置，返回该文件的条目
+
+        Args:
+            fingerprints: {"framing": ..., "recon": ..., "post": ...}
+        """
+        source = file_stat(input_path)
+        with self._lock:
+            entry = self.data["files"].get(input_path)
+            if entry is None or entry.get("source") != source or entry.get("framing") != fingerprints["framing"]:
+                entry = {"source": source, "framing": fingerprints["framing"], "framed": False}
+            # 前一阶段未完成或本阶段参数变化时，本阶段及之后全部重做
+            if not entry["framed"] or entry.get("recon") != fingerprints["recon"]:
+                entry.update({"recon": fingerprints["recon"], "frames_done": [], "reconstructed": False})
+            if not entry["reconstructed"] or entry.get("post") != fingerprints["post"]:
+                entry.update({"post": fingerprints["post"], "postprocessed": False, "exported": False})
+            self.data["files"][input_path] = entry
+        self.save()
+        return dict(entry)
+
+    def mark(self, input_path: str, **fields):
+        with self._lock:
+            self.data["files"][input_path].update(fields)
+        self.save()
+
+    def mark_frame(self, input_path: str, frame: int):
+        with self._lock:
+            done = self.data["files"][input_path]["frames_done"]
+            if frame not in done:
+                done.append(int(frame))
+        self.save()
+
+    def frames_done(self, input_path: str) -> set:
+        with self._lock:
+            return set(self.data["files"].get(input_path, {}).get("frames_done", []))
+
+    def get(self, input_path: str, field: str, default=None):
+        with self._lock:
+            return self.data["files"].get(input_path, {}).get(field, default)
+
+
+class FrameCheckpoint:
+    """单帧OSEM迭代状态：每完成一次完整迭代保存当前图像，帧完成后删除"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, frame: int) -> str:
+        return os.path.join(self.directory, f"frame_{frame:05d}.npz")
+
+    def load(self, frame: int) -> Optional[Tuple[int, np.ndarray]]:
+        """返回 (已完成迭代次数, 图像)，没有或损坏时返回 None"""
+        path = self._path(frame)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return int(data["iteration"]), np.array(data["image"], dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"帧检查点损坏，从头重建该帧: {path}，错误: {e}")
+            return None
+
+    def save(self, frame: int, iteration: int, image: np.ndarray):
+        path = self._path(frame)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, iteration=iteration, image=np.asarray(image, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+    def clear(self, frame: int):
+        try:
+            os.remove(self._path(frame))
+        except FileNotFoundError:
+            pass
+
+
+def reconstruct_resumable(recon, sinogram: np.ndarray, iterations: int, frame: int,
+                          checkpoint: Optional[FrameCheckpoint] = None,
+                          cancel: Optional[Callable[[], bool]] = None, **terms) -> np.ndarray:
+    """
+    从帧检查点继续OSEM迭代，每完成一次迭代（最后一次除外）保存状态
+
+    Args:
+        recon: OSEMReconstructor
+        sinogram: 该帧正弦图
+        iterations: 总迭代次数
+        frame: 帧序号
+        checkpoint: 帧检查点，None 时不保存
+        cancel: 取消回调
+        terms: additive / multiplicative 校正项
+    """
+    start_iteration, initial = 0, None
+    if checkpoint is not None:
+        state = checkpoint.load(frame)
+        if state is not None and state[0] < iterations:
+            start_iteration, initial = state
+    remaining = iterations - start_iteration
+
+    callback = None
+    if checkpoint is not None:
+        def callback(iteration, image):
+            done = start_iteration + iteration + 1
+            if done < iterations and not (cancel is not None and cancel()):
+                checkpoint.save(frame, done, image)
+
+    return recon.reconstruct(sinogram, remaining, initial=initial, callback=callback,
+                             cancel=cancel, **terms)
+
+
+def progress_summary(manifest: RebuildManifest, inputs: Iterable[str], frames_per_file: int,
+                     status: str) -> Dict[str, Any]:
+    """写入实验 sequence_rebuild["progress"] 的进度摘要"""
+    inputs = list(inputs)
+    completed = sum(len(manifest.frames_done(path)) for path in inputs)
+    return {
+        "status": status,
+        "completed_frames": completed,
+        "total_frames": frames_per_file * len(inputs),
+        "files_completed": sum(1 for path in inputs if manifest.get(path, "exported")),
+        "total_files": len(inputs),
+        "manifest": manifest.path,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
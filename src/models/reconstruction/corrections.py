@@ -0,0 +1,230 @@
+# src/models/reconstruction/corrections.py
+
+import os
+import time
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+from scipy import ndimage
+
+from .projector import SystemMatrix
+
+logger = logging.getLogger(__name__)
+
+# 随机符合估计的平滑窗口（角度 x 径向，bin）
+RANDOMS_SMOOTH_SIZE = (5, 5)
+# 散射核的半高宽（mm），近似单次散射在正弦图上的宽分布
+SCATTER_KERNEL_FWHM_MM = 120.0
+# 散射占净计数的上限比例，防止尾部拟合在低计数帧上发散
+SCATTER_MAX_FRACTION = 0.5
+# 无 μ-map 时，平滑后低于该比例最大值的径向bin视为尾部（物体外）
+TAIL_THRESHOLD = 0.05
+# 衰减校正处理图像堆栈的分块帧数
+DECAY_CHUNK_FRAMES = 16
+
+
+def decay_factors(frame_starts: np.ndarray, frame_durations: np.ndarray,
+                  half_life_s: float) -> np.ndarray:
+    """
+    各帧校正到扫描起点的衰变因子（一次数组运算）
+
+    以帧中点时间 t_mid 表示：f = exp(λ t_mid) · (λΔt/2) / sinh(λΔt/2)，
+    后一项补偿帧内的衰变，与对帧内积分求平均的结果一致。
+    """
+    starts = np.asarray(frame_starts, dtype=np.float64)
+    durations = np.asarray(frame_durations, dtype=np.float64)
+    if not half_life_s or half_life_s <= 0:
+        return np.ones_like(starts)
+    lam = np.log(2.0) / half_life_s
+    mid = starts + durations / 2.0
+    half = lam * durations / 2.0
+    # Δt 为0时帧内补偿为1
+    in_frame = np.divide(half, np.sinh(half), out=np.ones_like(half), where=half > 0)
+    return np.exp(lam * mid) * in_frame
+
+
+def estimate_randoms(delayeds: np.ndarray) -> np.ndarray:
+    """延迟窗随机符合估计：对 (帧, 角度, 径向) 堆栈批量平滑以降低噪声，总计数不变"""
+    size = (1,) + tuple(RANDOMS_SMOOTH_SIZE)
+    return ndimage.uniform_filter(np.asarray(delayeds, dtype=np.float32), size=size, mode="nearest")
+
+
+def attenuation_acf(system: SystemMatrix, mumap: np.ndarray) -> np.ndarray:
+    """
+    由 μ-map 前向投影计算衰减校正因子 ACF = exp(∫μ dl)
+
+    Args:
+        system: 系统矩阵（权重单位为mm，见 build_parallel_projector）
+        mumap: 线性衰减系数图 (image_size, image_size)，单位 1/mm
+
+    Returns:
+        ACF 正弦图 (n_angles, n_radial)
+    """
+    mumap = np.asarray(mumap, dtype=np.float32)
+    if mumap.shape != (system.image_size, system.image_size):
+        raise ValueError(f"μ-map 尺寸 {mumap.shape} 与重建网格 {system.image_size} 不一致")
+    # 投影器每个像素对每个角度的权重和为像素边长，换算成线积分需乘 像素/bin
+    line_integrals = system.forward(mumap) * (system.pixel_size / system.bin_size)
+    return np.exp(line_integrals).astype(np.float32)
+
+
+def estimate_scatter(prompts: np.ndarray, randoms: Optional[np.ndarray],
+                     bin_size: float, tail_mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    尾部拟合的散射估计（单次散射的宽核近似）
+
+    净计数 (prompts - randoms) 沿径向做宽高斯卷积得到散射分布形状，再按每帧
+    物体外尾部区域的净计数最小二乘拟合幅度。全部为 (帧, 角度, 径向) 的批量运算。
+
+    Args:
+        prompts: 即时符合堆栈
+        randoms: 随机符合估计，None 表示不扣除
+        bin_size: 径向bin尺寸（mm）
+        tail_mask: 尾部区域 (角度, 径向) 布尔数组，None 时按计数阈值确定
+    """
+    net = np.asarray(prompts, dtype=np.float32)
+    if randoms is not None:
+        net = net - randoms
+    net = np.maximum(net, 0.0)
+
+    sigma = SCATTER_KERNEL_FWHM_MM / 2.3548 / bin_size
+    shape = ndimage.gaussian_filter1d(net, sigma, axis=-1, mode="constant")
+
+    if tail_mask is None:
+        profile = ndimage.uniform_filter(net.sum(axis=0), size=RANDOMS_SMOOTH_SIZE)
+        tail_mask = profile < TAIL_THRESHOLD * max(float(profile.max()), 1e-12)
+    tail = tail_mask[None, :, :]
+
+    # 每帧幅度: Σ_tail net·shape / Σ_tail shape²
+    numerator = np.sum(net * shape * tail, axis=(1, 2))
+    denominator = np.sum(shape * shape * tail, axis=(1, 2))
+    scale = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+    # 高斯卷积保持总量，因此 scale 即散射占净计数的比例
+    scale = np.clip(scale, 0.0, SCATTER_MAX_FRACTION)
+    return shape * scale[:, None, None]
+
+
+class CorrectionPipeline:
+    """分帧正弦图的校正流水线：衰变、随机符合、散射、衰减
+
+    每个阶段可单独开关，各阶段用整帧堆栈的数组运算完成，耗时记录在 timings 中。
+    随机符合和散射作为 OSEM 的加性项，衰减作为乘性项（保留泊松统计，不直接相减），
+    衰变因子在重建后按帧乘到图像上（写到新文件，便于断点续算）。
+    """
+
+    STAGES = ("decay", "randoms", "scatter", "attenuation")
+
+    def __init__(self, params: Dict[str, Any], half_life_min: Optional[float] = None,
+                 mumap: Optional[np.ndarray] = None):
+        """
+        Args:
+            params: sequence_rebuild 参数（读取 *_correction 开关）
+            half_life_min: 核素半衰期（分钟，见 HALF_LIFE_TABLE），None 时跳过衰变校正
+            mumap: μ-map（1/mm），None 时跳过衰减校正
+        """
+        self.enabled = {
+            "decay": bool(params.get("decay_correction", True)) and bool(half_life_min),
+            "randoms": bool(params.get("random_correction", True)),
+            "scatter": bool(params.get("scatter_correction", False)),
+            "attenuation": bool(params.get("attenuation_correction", False)) and mumap is not None
+        }
+        self.half_life_s = float(half_life_min) * 60.0 if half_life_min else 0.0
+        self.mumap = mumap
+        self.timings: Dict[str, float] = {}
+
+    @staticmethod
+    def load_mumap(path: str) -> Optional[np.ndarray]:
+        """读取 .npy 格式的 μ-map，路径为空或文件不存在时返回 None"""
+        if not path or not os.path.isfile(path):
+            return None
+        return np.load(path).astype(np.float32)
+
+    def _timed(self, stage: str, start: float):
+        self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    def prepare(self, paths: Dict[str, str], system: SystemMatrix, output_dir: str) -> Dict[str, Any]:
+        """
+        计算重建需要的加性/乘性校正项并写入 .npy
+
+        Args:
+            paths: frame_file 的输出（prompts/delayeds 路径）
+            system: 重建使用的系统矩阵
+            output_dir: 输出目录
+
+        Returns:
+            {"additive": 路径或None, "multiplicative": 路径或None}
+        """
+        stem = os.path.basename(paths["prompts"])[:-len("_prompts.npy")]
+        result = {"additive": None, "multiplicative": None}
+
+        acf = None
+        if self.enabled["attenuation"]:
+            start = time.perf_counter()
+            acf = attenuation_acf(system, self.mumap)
+            # OSEM 乘性项为衰减因子 1/ACF，对所有帧相同，保存为单个正弦图
+            multiplicative_path = os.path.join(output_dir, f"{stem}_attenuation.npy")
+            np.save(multiplicative_path, (1.0 / acf).astype(np.float32))
+            result["multiplicative"] = multiplicative_path
+            self._timed("attenuation", start)
+
+        if not (self.enabled["randoms"] or self.enabled["scatter"]):
+            return result
+
+        prompts = np.load(paths["prompts"], mmap_mode="r")
+        additive = np.zeros(prompts.shape, dtype=np.float32)
+        randoms = None
+        if self.enabled["randoms"]:
+            start = time.perf_counter()
+            randoms = estimate_randoms(np.load(paths["delayeds"], mmap_mode="r"))
+            additive += randoms
+            self._timed("randoms", start)
+
+        if self.enabled["scatter"]:
+            start = time.perf_counter()
+            # 有 μ-map 时以穿过物体的射线之外（ACF≈1）作为尾部
+            tail_mask = acf < 1.0 + 1e-3 if acf is not None else None
+            additive += estimate_scatter(prompts, randoms, system.bin_size, tail_mask)
+            self._timed("scatter", start)
+
+        additive_path = os.path.join(output_dir, f"{stem}_additive.npy")
+        np.save(additive_path, additive)
+        result["additive"] = additive_path
+        return result
+
+    def apply_decay(self, source_path: str, target_path: str, frames: Dict[str, Any]):
+        """
+        把重建堆栈按帧乘以衰变因子写到新文件（未启用时原样复制），分块处理内存映射堆栈
+
+        不原地修改，重复执行（如中断后续算）结果不变。
+
+        Args:
+            source_path: OSEM 重建结果
+            target_path: 输出路径
+            frames: *_frames.json 的内容（帧起点和时长）
+        """
+        start = time.perf_counter()
+        factors = None
+        if self.enabled["decay"]:
+            factors = decay_factors(frames["frame_starts"], frames["frame_durations"],
+                                    self.half_life_s).astype(np.float32)
+        source = np.load(source_path, mmap_mode="r")
+        target = np.lib.format.open_memmap(target_path, mode="w+", dtype=np.float32, shape=source.shape)
+        for lo in range(0, source.shape[0], DECAY_CHUNK_FRAMES):
+            hi = min(lo + DECAY_CHUNK_FRAMES, source.shape[0])
+            target[lo:hi] = source[lo:hi] if factors is None else source[lo:hi] * factors[lo:hi, None, None]
+        target.flush()
+        del source, target
+        if factors is not None:
+            self._timed("decay", start)
+
+    def summary(self) -> str:
+        """各阶段启用状态和耗时的日志文本"""
+        names = {"decay": "衰变", "randoms": "随机符合", "scatter": "散射", "attenuation": "衰减"}
+        parts = []
+        for stage in self.STAGES:
+            if self.enabled[stage]:
+                parts.append(f"{names[stage]} {self.timings.get(stage, 0.0) * 1000:.1f}ms")
+            else:
+                parts.append(f"{names[stage]} 未启用")
+        return "校正: " + "，".join(parts)
@@ -0,0 +1,263 @@
+# src/models/reconstruction/dicom_writer.py
+
+import os
+import json
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# PET Image Storage
+PET_IMAGE_STORAGE = "1.2.840.10008.5.1.4.1.1.128"
+EXPLICIT_VR_LITTLE_ENDIAN = "1.2.840.10008.1.2.1"
+INT16_MAX = 32767
+# 后台写入队列的最大排队序列数，超过时 submit 阻塞，避免积压占用磁盘带宽和内存
+MAX_PENDING_SERIES = 2
+
+
+def quantize_stack(images: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    把浮点图像堆栈一次性量化为 int16
+
+    每层一个 RescaleSlope（层内最大绝对值映射到 32767），整个堆栈在一次数组运算中完成。
+
+    Returns:
+        (int16 堆栈（C连续）, 每层斜率)
+    """
+    images = np.asarray(images, dtype=np.float32)
+    peaks = np.abs(images).reshape(images.shape[0], -1).max(axis=1)
+    slopes = np.where(peaks > 0, peaks / INT16_MAX, 1.0).astype(np.float64)
+    scaled = np.rint(images / slopes[:, None, None].astype(np.float32))
+    return np.ascontiguousarray(np.clip(scaled, -INT16_MAX, INT16_MAX).astype(np.int16)), slopes
+
+
+def _ds_value(value: float) -> str:
+    """DS 类型最多16个字符"""
+    text = f"{value:.10g}"
+    return text if len(text) <= 16 else f"{value:.6e}"
+
+
+def build_template(info: Dict[str, Any], rows: int, columns: int, series_uid: str,
+                   scan_start: datetime):
+    """
+    构建一个序列共用的模板数据集，逐层只修改实例相关的标签
+
+    Args:
+        info: 序列信息（patient_name、patient_id、study_description、series_description、
+              pixel_size、isotope、half_life_min、decay_corrected、number_of_frames）
+        rows, columns: 图像尺寸
+        series_uid: 序列UID，实例UID由它加序号派生
+        scan_start: 扫描开始时间
+    """
+    import pydicom
+    from pydicom.dataset import Dataset, FileDataset, FileMetaDataset
+    from pydicom.uid import generate_uid
+
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = PET_IMAGE_STORAGE
+    meta.MediaStorageSOPInstanceUID = f"{series_uid}.1"
+    meta.TransferSyntaxUID = EXPLICIT_VR_LITTLE_ENDIAN
+    meta.ImplementationClassUID = pydicom.uid.PYDICOM_IMPLEMENTATION_UID
+
+    ds = FileDataset("", {}, file_meta=meta, preamble=b"\0" * 128)
+    if int(pydicom.__version__.split(".")[0]) < 3:
+        # pydicom 2.x 需要显式指定编码方式
+        ds.is_little_endian = True
+        ds.is_implicit_VR = False
+
+    date = scan_start.strftime("%Y%m%d")
+    time_text = scan_start.strftime("%H%M%S.%f")
+    # 实验名称和描述可能含中文
+    ds.SpecificCharacterSet = "ISO_IR 192"
+    ds.SOPClassUID = PET_IMAGE_STORAGE
+    ds.Modality = "PT"
+    ds.StudyInstanceUID = info.get("study_uid") or generate_uid(prefix=None)
+    ds.SeriesInstanceUID = series_uid
+    ds.FrameOfReferenceUID = f"{series_uid}.0"
+    ds.StudyDate = ds.SeriesDate = date
+    ds.StudyTime = ds.SeriesTime = time_text
+    ds.PatientName = info.get("patient_name", "")
+    ds.PatientID = info.get("patient_id", "")
+    ds.StudyDescription = info.get("study_description", "")
+    ds.SeriesDescription = info.get("series_description", "")
+    ds.SeriesNumber = int(info.get("series_number", 1))
+    ds.Manufacturer = info.get("manufacturer", "")
+    ds.ManufacturerModelName = info.get("device_model", "")
+
+    # 动态序列：每帧一层
+    ds.SeriesType = ["DYNAMIC", "IMAGE"]
+    ds.Units = "CNTS"
+    ds.CountsSource = "EMISSION"
+    ds.DecayCorrection = "START" if info.get("decay_corrected") else "NONE"
+    ds.NumberOfSlices = 1
+    ds.NumberOfTimeSlices = int(info.get("number_of_frames", 1))
+    if info.get("half_life_min"):
+        radiopharmaceutical = Dataset()
+        radiopharmaceutical.RadionuclideHalfLife = _ds_value(float(info["half_life_min"]) * 60.0)
+        radiopharmaceutical.RadiopharmaceuticalStartDateTime = scan_start.strftime("%Y%m%d%H%M%S.%f")
+        radiopharmaceutical.Radiopharmaceutical = info.get("isotope", "")
+        ds.RadiopharmaceuticalInformationSequence = [radiopharmaceutical]
+
+    pixel_size = float(info.get("pixel_size", 1.0))
+    ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+    ds.ImagePositionPatient = [_ds_value(-(columns - 1) / 2.0 * pixel_size),
+                               _ds_value(-(rows - 1) / 2.0 * pixel_size), 0]
+    ds.PixelSpacing = [_ds_value(pixel_size), _ds_value(pixel_size)]
+    ds.SliceThickness = _ds_value(float(info.get("slice_thickness", pixel_size)))
+    ds.SliceLocation = 0
+
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.Rows = rows
+    ds.Columns = columns
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.PixelRepresentation = 1
+    ds.RescaleIntercept = 0
+    ds.RescaleSlope = 1
+    return ds
+
+
+def write_series(images: np.ndarray, frames: Dict[str, Any], output_dir: str,
+                 info: Dict[str, Any], cancel: Optional[Callable[[], bool]] = None) -> List[str]:
+    """
+    把重建堆栈 (帧, 行, 列) 写成逐帧单层的 PET DICOM 序列
+
+    所有帧共用一个模板数据集；像素数据由一次量化得到的连续 int16 数组按帧切片编码。
+
+    Args:
+        images: 重建图像堆栈（可以是内存映射数组）
+        frames: *_frames.json 的内容（scan_start、frame_starts、frame_durations）
+        output_dir: 序列目录
+        info: 序列信息，见 build_template
+        cancel: 返回True时停止写入
+
+    Returns:
+        写入的文件路径列表
+    """
+    import pydicom
+    from pydicom.uid import generate_uid
+
+    os.makedirs(output_dir, exist_ok=True)
+    n_frames, rows, columns = images.shape
+    scan_start = datetime.fromtimestamp(frames["scan_start"]) if frames.get("scan_start") else datetime.now()
+    starts = np.asarray(frames["frame_starts"], dtype=np.float64)
+    durations = np.asarray(frames["frame_durations"], dtype=np.float64)
+
+    # 短格式 "2.25.<整数>" 的UID，后接实例序号仍不超过64字符
+    series_uid = generate_uid(prefix=None)
+    info = dict(info, number_of_frames=n_frames)
+    ds = build_template(info, rows, columns, series_uid, scan_start)
+    pixels, slopes = quantize_stack(images)
+
+    paths = []
+    for frame in range(n_frames):
+        if cancel is not None and cancel():
+            break
+        acquired = scan_start + timedelta(seconds=float(starts[frame]))
+        sop_uid = f"{series_uid}.{frame + 1}"
+        ds.file_meta.MediaStorageSOPInstanceUID = sop_uid
+        ds.SOPInstanceUID = sop_uid
+        ds.InstanceNumber = frame + 1
+        ds.ImageIndex = frame + 1
+        ds.AcquisitionDate = acquired.strftime("%Y%m%d")
+        ds.AcquisitionTime = acquired.strftime("%H%M%S.%f")
+        # FrameReferenceTime 为序列起点到帧中点的毫秒数
+        ds.FrameReferenceTime = _ds_value((starts[frame] + durations[frame] / 2.0) * 1000.0)
+        ds.ActualFrameDuration = int(round(durations[frame] * 1000.0))
+        ds.RescaleSlope = _ds_value(float(slopes[frame]))
+        ds.PixelData = pixels[frame].tobytes()
+
+        path = os.path.join(output_dir, f"IM_{frame + 1:06d}.dcm")
+        pydicom.dcmwrite(path, ds)
+        paths.append(path)
+    return paths
+
+
+class DicomSeriesWriter:
+    """后台线程写出 DICOM 序列
+
+    重建线程调用 submit 后立即返回继续下一个文件，写盘在单独的线程中排队完成；
+    close 等待队列写完并抛出写入过程中出现的第一个错误。
+    """
+
+    def __init__(self, log: Optional[Callable[[str, str], None]] = None,
+                 max_pending: int = MAX_PENDING_SERIES,
+                 on_written: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            log: 日志回调 (message, level)
+            max_pending: 最多排队的序列数
+            on_written: 一个序列完整写出后调用 on_written(序列目录)（在写入线程中执行）
+        """
+        self._log = log
+        self._on_written = on_written
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._thread: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+        self._errors: List[Exception] = []
+        self.written: Dict[str, List[str]] = {}
+
+    def _report(self, message: str, level: str = "INFO"):
+        logger.info(message)
+        if self._log is not None:
+            self._log(message, level)
+
+    def submit(self, images_path: str, frames_path: str, output_dir: str, info: Dict[str, Any]):
+        """排队写出一个重建堆栈（*_recon.npy + *_frames.json）"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="DicomSeriesWriter", daemon=True)
+            self._thread.start()
+        self._queue.put((images_path, frames_path, output_dir, info))
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if not self._cancel.is_set():
+                    self._write(*job)
+            except Exception as e:
+                logger.exception("写出DICOM序列失败")
+                self._errors.append(e)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, images_path: str, frames_path: str, output_dir: str, info: Dict[str, Any]):
+        with open(frames_path, "r", encoding="utf-8") as f:
+            frames = json.load(f)
+        images = np.load(images_path, mmap_mode="r")
+        paths = write_series(images, frames, output_dir, info, cancel=self._cancel.is_set)
+        n_frames = images.shape[0]
+        del images
+        if len(paths) < n_frames:
+            # 写入中途被取消，不算完成
+            return
+        self.written[output_dir] = paths
+        self._report(f"DICOM序列已写出: {output_dir}（{len(paths)} 幅图像）")
+        if self._on_written is not None:
+            self._on_written(output_dir)
+
+    def close(self, cancel: bool = False):
+        """
+        结束写入线程
+
+        Args:
+            cancel: True 时丢弃尚未写出的序列，正在写的序列在下一幅图像处停止
+        """
+        if self._thread is None:
+            return
+        if cancel:
+            self._cancel.set()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._errors and not cancel:
+            raise self._errors[0]
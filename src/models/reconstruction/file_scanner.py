@@ -0,0 +1,140 @@
+# src/models/reconstruction/file_scanner.py
+
+import os
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .listmode import LISTMODE_MAGIC
+
+logger = logging.getLogger(__name__)
+
+# 文件类型
+KIND_LISTMODE = "列表模式"
+KIND_SINOGRAM = "正弦图"
+KIND_DICOM = "DICOM"
+KIND_OTHER = "其他"
+
+NUMPY_MAGIC = b"\x93NUMPY"
+DICOM_PREAMBLE = 128
+DICOM_MAGIC = b"DICM"
+# 判断类型需要读取的文件头字节数
+SNIFF_BYTES = DICOM_PREAMBLE + len(DICOM_MAGIC)
+# 每批回调的条目数
+DEFAULT_BATCH_SIZE = 500
+
+# 扫描结果条目: (文件名, 类型, 大小字节, 修改时间秒)
+ScanEntry = Tuple[str, str, int, float]
+
+
+def classify_header(head: bytes) -> str:
+    """按文件头判断类型：列表模式魔数、NumPy 数组（分帧正弦图）、DICOM（128字节前导后的 DICM）"""
+    if head.startswith(LISTMODE_MAGIC):
+        return KIND_LISTMODE
+    if head.startswith(NUMPY_MAGIC):
+        return KIND_SINOGRAM
+    if head[DICOM_PREAMBLE:DICOM_PREAMBLE + len(DICOM_MAGIC)] == DICOM_MAGIC:
+        return KIND_DICOM
+    return KIND_OTHER
+
+
+class DirectoryScanner:
+    """输入目录扫描器
+
+    一次 os.scandir 遍历同时取得大小、修改时间并读取文件头分类。目录列表按目录的
+    修改时间缓存（增删、改名文件时目录 mtime 会变化）；单个文件的分类按
+    (大小, mtime) 缓存，目录变化后重扫时未变化的文件不再读取文件头。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listings: Dict[str, Tuple[int, List[ScanEntry]]] = {}
+        self._kinds: Dict[str, Tuple[int, int, str]] = {}
+
+    def cached(self, path: str) -> Optional[List[ScanEntry]]:
+        """目录未变化时返回缓存的列表，否则返回 None"""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            listing = self._listings.get(os.path.abspath(path))
+        if listing is not None and listing[0] == mtime_ns:
+            return listing[1]
+        return None
+
+    def _classify(self, path: str, size: int, mtime_ns: int) -> str:
+        with self._lock:
+            known = self._kinds.get(path)
+        if known is not None and known[0] == size and known[1] == mtime_ns:
+            return known[2]
+        try:
+            with open(path, "rb") as f:
+                kind = classify_header(f.read(SNIFF_BYTES))
+        except OSError:
+            kind = KIND_OTHER
+        with self._lock:
+            self._kinds[path] = (size, mtime_ns, kind)
+        return kind
+
+    def scan(self, path: str, on_batch: Optional[Callable[[List[ScanEntry]], None]] = None,
+             cancel: Optional[Callable[[], bool]] = None, force: bool = False,
+             batch_size: int = DEFAULT_BATCH_SIZE) -> Optional[List[ScanEntry]]:
+        """
+        扫描目录
+
+        Args:
+            path: 目录路径
+            on_batch: 每扫描 batch_size 个文件回调一次（命中缓存时整体回调一次）
+            cancel: 返回True时停止扫描，返回 None
+            force: 忽略目录缓存重新扫描
+            batch_size: 每批条目数
+
+        Returns:
+            全部条目，被取消时为 None
+        """
+        path = os.path.abspath(path)
+        if not force:
+            listing = self.cached(path)
+            if listing is not None:
+                if on_batch is not None and listing:
+                    on_batch(list(listing))
+                return listing
+
+        # 先取目录 mtime，扫描期间若有变化，下次会重新扫描
+        mtime_ns = os.stat(path).st_mtime_ns
+        entries: List[ScanEntry] = []
+        batch: List[ScanEntry] = []
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                if cancel is not None and cancel():
+                    return None
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                kind = self._classify(entry.path, stat.st_size, stat.st_mtime_ns)
+                item = (entry.name, kind, stat.st_size, stat.st_mtime)
+                entries.append(item)
+                batch.append(item)
+                if on_batch is not None and len(batch) >= batch_size:
+                    on_batch(batch)
+                    batch = []
+        if on_batch is not None and batch:
+            on_batch(batch)
+
+        with self._lock:
+            self._listings[path] = (mtime_ns, entries)
+            # 清理已不存在于该目录的文件分类缓存
+            names = {os.path.join(path, e[0]) for e in entries}
+            stale = [p for p in self._kinds if os.path.dirname(p) == path and p not in names]
+            for p in stale:
+                del self._kinds[p]
+        logger.debug(f"扫描目录 {path}: {len(entries)} 个文件")
+        return entries
+
+
+# 进程内共享的扫描器，重复打开同一实验时复用缓存
+default_scanner = DirectoryScanner()
@@ -0,0 +1,220 @@
+# src/models/reconstruction/filters.py
+
+import logging
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import ndimage
+from scipy import fft as sp_fft
+
+logger = logging.getLogger(__name__)
+
+# 滤波器名称，与序列重建界面的 smoothing_filter 选项一致
+FILTER_TYPES = ("Gaussian", "Butterworth", "Hamming", "Hann", "Median", "None")
+
+# 高斯核截断半径（σ 的倍数）
+GAUSSIAN_TRUNCATE = 3.0
+# 一维核长度达到该值时用FFT，更短时用直接卷积（由 benchmarks/bench_filters.py 测得）
+FFT_CROSSOVER_TAPS = 13
+# 与同FWHM高斯半幅频率一致的系数：高斯在 f ≈ 0.44/FWHM 处响应降为一半
+HALF_AMPLITUDE_FWHM = 0.44
+BUTTERWORTH_ORDER = 4
+# 频域窗空间响应的绝对值低于峰值的该比例后视为可忽略，由此确定FFT滤波的边缘延拓长度
+WINDOW_RESPONSE_TOLERANCE = 1e-3
+# 分块处理时每块沿z方向的层数
+DEFAULT_CHUNK_SLICES = 32
+
+SQRT_8LN2 = 2.3548200450309493
+
+
+def gaussian_kernel(sigma: float) -> np.ndarray:
+    """归一化的一维高斯核（截断到 GAUSSIAN_TRUNCATE·σ）"""
+    radius = max(1, int(np.ceil(GAUSSIAN_TRUNCATE * sigma)))
+    x = np.arange(-radius, radius + 1, dtype=np.float64)
+    kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def frequency_window(kind: str, freqs: np.ndarray, cutoff: float) -> np.ndarray:
+    """
+    一维频域窗
+
+    Args:
+        kind: Butterworth / Hamming / Hann
+        freqs: 频率（cycles/mm），非负
+        cutoff: 截止频率（cycles/mm）；Butterworth 为半功率点，Hann/Hamming 为过零点
+    """
+    ratio = freqs / cutoff
+    if kind == "Butterworth":
+        return 1.0 / np.sqrt(1.0 + ratio ** (2 * BUTTERWORTH_ORDER))
+    alpha = 0.5 if kind == "Hann" else 0.54
+    window = alpha + (1.0 - alpha) * np.cos(np.pi * ratio)
+    return np.where(ratio <= 1.0, window, 0.0)
+
+
+def window_cutoff(kind: str, fwhm: float) -> float:
+    """由FWHM换算频域窗的截止频率，使各窗的半幅频率与同FWHM的高斯一致"""
+    half_amplitude = HALF_AMPLITUDE_FWHM / fwhm
+    if kind == "Butterworth":
+        # |H(fc·r)| = 1/2 时 r = 3^(1/2n)
+        return half_amplitude / 3.0 ** (1.0 / (2 * BUTTERWORTH_ORDER))
+    # Hann/Hamming 在 f = fc/2 附近降到一半
+    return 2.0 * half_amplitude
+
+
+def _pad_axis(block: np.ndarray, axis: int, radius: int) -> np.ndarray:
+    pad = [(0, 0)] * block.ndim
+    pad[axis] = (radius, radius)
+    return np.pad(block, pad, mode="edge")
+
+
+def _fft_filter_axis(block: np.ndarray, axis: int, transfer_for_length, radius: int) -> np.ndarray:
+    """沿一个轴做FFT滤波：两端按边缘值延拓 radius，补零到快速FFT长度，单精度计算"""
+    n = block.shape[axis]
+    padded = _pad_axis(block, axis, radius)
+    length = sp_fft.next_fast_len(padded.shape[axis], real=True)
+    spectrum = sp_fft.rfft(padded, n=length, axis=axis)
+    shape = [1] * block.ndim
+    shape[axis] = -1
+    spectrum *= transfer_for_length(length).astype(np.complex64).reshape(shape)
+    result = sp_fft.irfft(spectrum, n=length, axis=axis)
+    index = [slice(None)] * block.ndim
+    index[axis] = slice(radius, radius + n)
+    return result[tuple(index)].astype(np.float32, copy=False)
+
+
+def gaussian_axis(block: np.ndarray, axis: int, sigma: float, method: str = "auto") -> np.ndarray:
+    """
+    沿一个轴做高斯卷积
+
+    Args:
+        method: "direct"（separable 直接卷积）、"fft" 或 "auto"（按核长度选择）
+    """
+    kernel = gaussian_kernel(sigma)
+    if method == "auto":
+        method = "direct" if kernel.size < FFT_CROSSOVER_TAPS else "fft"
+    if method == "direct":
+        return ndimage.correlate1d(block, kernel, axis=axis, mode="nearest")
+
+    radius = kernel.size // 2
+
+    def transfer(length):
+        # 与直接卷积使用同一截断核，两条路径结果一致
+        padded = np.zeros(length, dtype=np.float64)
+        padded[:radius + 1] = kernel[radius:]
+        padded[-radius:] = kernel[:radius]
+        return sp_fft.rfft(padded)
+
+    return _fft_filter_axis(block, axis, transfer, radius)
+
+
+@lru_cache(maxsize=64)
+def window_radius(kind: str, cutoff: float, spacing: float) -> int:
+    """频域窗空间响应的有效半径（体素），只取决于窗本身，与数据长度无关"""
+    # 采样长度远大于响应宽度，离散响应接近窗的冲激响应
+    n = max(1024, 1 << int(np.ceil(np.log2(256.0 / (cutoff * spacing)))))
+    response = np.abs(sp_fft.irfft(frequency_window(kind, sp_fft.rfftfreq(n, d=spacing), cutoff), n=n))
+    response = response[:n // 2]
+    return int(np.nonzero(response > WINDOW_RESPONSE_TOLERANCE * response[0])[0].max()) + 1
+
+
+def window_axis(block: np.ndarray, axis: int, kind: str, cutoff: float, spacing: float) -> np.ndarray:
+    """沿一个轴应用频域窗（Butterworth/Hamming/Hann），两端按空间响应的有效半径延拓"""
+    def transfer(length):
+        return frequency_window(kind, sp_fft.rfftfreq(length, d=spacing), cutoff)
+
+    return _fft_filter_axis(block, axis, transfer, window_radius(kind, cutoff, spacing))
+
+
+def _halo(kind: str, fwhm: float, spacing: float) -> int:
+    """z 方向分块时需要的相邻层数（仅高斯和中值滤波，核长度有限）"""
+    if kind == "Gaussian":
+        return gaussian_kernel(fwhm / SQRT_8LN2 / spacing).size // 2
+    return _median_size(fwhm, spacing) // 2
+
+
+def _median_size(fwhm: float, spacing: float) -> int:
+    size = max(3, int(round(fwhm / spacing)))
+    return size if size % 2 else size + 1
+
+
+def filter_block(block: np.ndarray, spacing: Sequence[float], kind: str, fwhm: float,
+                 axes: Sequence[int], method: str = "auto") -> np.ndarray:
+    """对一块数据沿指定轴做可分离滤波（中值滤波除外）"""
+    result = np.asarray(block, dtype=np.float32)
+    if kind == "Median":
+        size = [1] * result.ndim
+        for axis in axes:
+            size[axis] = _median_size(fwhm, spacing[axis])
+        return ndimage.median_filter(result, size=tuple(size), mode="nearest")
+
+    for axis in axes:
+        if kind == "Gaussian":
+            result = gaussian_axis(result, axis, fwhm / SQRT_8LN2 / spacing[axis], method)
+        else:
+            result = window_axis(result, axis, kind, window_cutoff(kind, fwhm), spacing[axis])
+    return result
+
+
+def filter_volume(volume: np.ndarray, spacing: Sequence[float], kind: str = "Gaussian",
+                  fwhm: float = 4.0, axes: Tuple[int, ...] = (0, 1, 2),
+                  out: Optional[np.ndarray] = None, chunk_slices: int = DEFAULT_CHUNK_SLICES,
+                  method: str = "auto") -> np.ndarray:
+    """
+    按z分块平滑体数据，峰值内存只与块大小有关
+
+    高斯和中值滤波按z分块并带上相邻层，结果与整体滤波一致。频域窗的空间响应没有
+    有限长度（Hamming 的响应按 1/x 衰减），z方向不能带相邻层分块：先按z分块做层内
+    滤波，再按y分块做z方向滤波，每块都包含完整的z轴。
+
+    Args:
+        volume: 体数据 (z, y, x)，可以是内存映射数组
+        spacing: 体素间距 (dz, dy, dx)，单位mm
+        kind: 滤波器类型，见 FILTER_TYPES
+        fwhm: 滤波宽度（mm）
+        axes: 参与滤波的轴；动态序列逐帧平滑时用 (1, 2)
+        out: 输出数组，可以就是 volume（原地处理）
+        chunk_slices: 每块层数
+        method: 高斯滤波的实现，"auto"/"direct"/"fft"
+
+    Returns:
+        滤波结果（即 out）
+    """
+    if kind not in FILTER_TYPES:
+        raise ValueError(f"未知的滤波器类型: {kind}")
+    if out is None:
+        out = np.empty(volume.shape, dtype=np.float32)
+    if kind == "None" or fwhm <= 0:
+        if out is not volume:
+            out[...] = volume
+        return out
+
+    depth = volume.shape[0]
+    window = kind not in ("Gaussian", "Median")
+    block_axes = tuple(axis for axis in axes if axis != 0) if window else tuple(axes)
+    halo = _halo(kind, fwhm, spacing[0]) if 0 in block_axes else 0
+    chunk_slices = max(1, int(chunk_slices))
+    if out is volume:
+        # 保证保存的相邻层都来自当前块
+        chunk_slices = max(chunk_slices, halo)
+    # 原地处理时，下一块需要的下方相邻层会被本块覆盖，先保存原始值
+    saved_lower = None
+    for lo in range(0, depth, chunk_slices):
+        hi = min(lo + chunk_slices, depth)
+        lo_h, hi_h = max(0, lo - halo), min(depth, hi + halo)
+        block = np.array(volume[lo_h:hi_h], dtype=np.float32)
+        if saved_lower is not None:
+            block[:lo - lo_h] = saved_lower
+        if out is volume and halo:
+            saved_lower = np.array(volume[max(0, hi - halo):hi], dtype=np.float32)
+        filtered = filter_block(block, spacing, kind, fwhm, block_axes, method)
+        out[lo:hi] = filtered[lo - lo_h:lo - lo_h + (hi - lo)]
+
+    if window and 0 in axes:
+        # 每块的体素数与z分块相当
+        rows = max(1, chunk_slices * volume.shape[1] // depth)
+        for lo in range(0, volume.shape[1], rows):
+            block = np.array(out[:, lo:lo + rows], dtype=np.float32)
+            out[:, lo:lo + rows] = filter_block(block, spacing, kind, fwhm, (0,), method)
+    return out
@@ -0,0 +1,187 @@
+# src/models/reconstruction/matrix_cache.py
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .projector import SystemMatrix, csr_view
+
+logger = logging.getLogger(__name__)
+
+# 缓存格式版本，投影器实现变化时递增以使旧缓存失效
+MATRIX_CACHE_VERSION = 1
+CSR_ARRAYS = ("data", "indices", "indptr")
+
+
+def default_matrix_cache_dir() -> str:
+    """系统矩阵缓存目录：项目根目录下的 cache/system_matrix"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    # current_dir 是 .../src/models/reconstruction，向上3级为项目根目录
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+    return os.path.join(project_root, "cache", "system_matrix")
+
+
+class SystemMatrixCache:
+    """系统矩阵磁盘缓存
+
+    每个 (图像网格, 正弦图几何, 子集数) 组合一个目录（几何相同的设备共用条目），CSR 的
+    data/indices/indptr 各存为一个 .npy 文件，加载时用 mmap_mode="r" 映射，
+    不复制到进程内存。目录中的 meta.json 记录几何参数，创建后不再改写；
+    最近使用时间记为 meta.json 的修改时间，总占用超过磁盘预算时按最近最少使用淘汰。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, budget_mb: float = 4096):
+        self.cache_dir = cache_dir or default_matrix_cache_dir()
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(image_size: int, pixel_size: float, n_angles: int,
+                 n_radial: int, bin_size: float, subsets: int) -> Dict[str, Any]:
+        return {
+            "version": MATRIX_CACHE_VERSION,
+            "image_size": int(image_size),
+            "pixel_size": round(float(pixel_size), 6),
+            "n_angles": int(n_angles),
+            "n_radial": int(n_radial),
+            "bin_size": round(float(bin_size), 6),
+            "subsets": int(subsets)
+        }
+
+    def _entry_dir(self, key: Dict[str, Any]) -> str:
+        text = json.dumps(key, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+        return os.path.join(self.cache_dir, digest)
+
+    def get(self, image_size: int, pixel_size: float, n_angles: int,
+            n_radial: int, bin_size: float, subsets: int) -> SystemMatrix:
+        """获取系统矩阵：命中时内存映射加载，否则构建并写入缓存"""
+        key = self.make_key(image_size, pixel_size, n_angles, n_radial, bin_size, subsets)
+        entry_dir = self._entry_dir(key)
+
+        system = self._load(entry_dir, key)
+        if system is not None:
+            return system
+
+        system = SystemMatrix(image_size, n_angles, n_radial, subsets=subsets,
+                              pixel_size=pixel_size, bin_size=bin_size)
+        try:
+            self._store(entry_dir, key, system)
+            self.evict()
+            # 换成内存映射版本，构建时的临时数组可以释放
+            mapped = self._load(entry_dir, key)
+            if mapped is not None:
+                mapped.build_time = system.build_time
+                return mapped
+        except Exception as e:
+            logger.warning(f"写入系统矩阵缓存失败: {e}")
+        return system
+
+    def _load(self, entry_dir: str, key: Dict[str, Any]) -> Optional[SystemMatrix]:
+        meta_path = os.path.join(entry_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            # 条目整体改名生成，读取失败多为并发淘汰，不删除（其他进程可能正在映射）
+            logger.warning(f"读取系统矩阵缓存失败: {entry_dir}，错误: {e}")
+            return None
+        if meta.get("key") != key:
+            return None
+        try:
+            arrays = {name: np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode="r")
+                      for name in CSR_ARRAYS}
+        except Exception as e:
+            logger.warning(f"系统矩阵缓存损坏，重新构建: {entry_dir}，错误: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        start = time.perf_counter()
+        matrix = csr_view(arrays["data"], arrays["indices"], arrays["indptr"], tuple(meta["shape"]))
+        system = SystemMatrix(key["image_size"], key["n_angles"], key["n_radial"],
+                              subsets=key["subsets"], pixel_size=key["pixel_size"],
+                              bin_size=key["bin_size"], matrix=matrix)
+        system.build_time = time.perf_counter() - start
+        self._touch(meta_path)
+        logger.debug(f"命中系统矩阵缓存: {entry_dir}")
+        return system
+
+    def _store(self, entry_dir: str, key: Dict[str, Any], system: SystemMatrix):
+        # 写入临时目录后整体改名，避免并发或中断留下不完整的条目
+        tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        matrix = system.matrix
+        size = 0
+        for name in CSR_ARRAYS:
+            path = os.path.join(tmp_dir, f"{name}.npy")
+            np.save(path, getattr(matrix, name))
+            size += os.path.getsize(path)
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"key": key, "shape": list(matrix.shape), "nnz": int(matrix.nnz),
+                       "size": size, "build_time": system.build_time}, f, ensure_ascii=False, indent=2)
+
+        with self._lock:
+            if os.path.exists(entry_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                os.replace(tmp_dir, entry_dir)
+        logger.info(f"系统矩阵已缓存: {entry_dir} ({size / 1e6:.1f} MB)")
+
+    def _touch(self, meta_path: str):
+        """记录使用时间：只更新 meta.json 的修改时间，不改写内容"""
+        try:
+            os.utime(meta_path)
+        except OSError as e:
+            logger.debug(f"更新缓存使用时间失败: {e}")
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """列出缓存条目（含目录、大小和最近使用时间）"""
+        result = []
+        for entry in os.scandir(self.cache_dir):
+            meta_path = os.path.join(entry.path, "meta.json")
+            if not entry.is_dir() or entry.name.endswith(".tmp") or not os.path.exists(meta_path):
+                continue
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                meta["last_used"] = os.path.getmtime(meta_path)
+            except Exception:
+                continue
+            meta["path"] = entry.path
+            result.append(meta)
+        return result
+
+    def total_size(self) -> int:
+        return sum(int(e.get("size", 0)) for e in self.entries())
+
+    def evict(self):
+        """按最近使用时间淘汰，直到总占用不超过预算（至少保留最近的一个）"""
+        with self._lock:
+            entries = sorted(self.entries(), key=lambda e: e.get("last_used", 0))
+            total = sum(int(e.get("size", 0)) for e in entries)
+            while total > self.budget_bytes and len(entries) > 1:
+                oldest = entries.pop(0)
+                # Windows 下仍被映射的文件无法删除，跳过等待下次淘汰
+                try:
+                    shutil.rmtree(oldest["path"])
+                except OSError as e:
+                    logger.debug(f"淘汰缓存失败 {oldest['path']}: {e}")
+                    continue
+                total -= int(oldest.get("size", 0))
+                logger.info(f"淘汰系统矩阵缓存: {oldest['path']}")
+
+    def clear(self):
+        """清空缓存目录"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(self.cache_dir, exist_ok=True)
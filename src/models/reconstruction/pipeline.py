@@ -0,0 +1,433 @@
+# src/models/reconstruction/pipeline.py
+
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .listmode import ListModeFile, is_listmode_file
+from .projector import SystemMatrix
+from .osem import OSEMReconstructor
+from .matrix_cache import SystemMatrixCache
+from .scheduler import FrameScheduler, frame_terms
+from .corrections import CorrectionPipeline
+from .filters import filter_volume
+from .dicom_writer import DicomSeriesWriter
+from .checkpoint import (
+    RebuildManifest, FrameCheckpoint, FRAMING_KEYS, RECON_KEYS, POST_KEYS,
+    file_stat, params_fingerprint, progress_summary, reconstruct_resumable
+)
+from ...core.constants import HALF_LIFE_TABLE, SCANNER_GEOMETRY, DEFAULT_SCANNER_GEOMETRY, SYSTEM_MATRIX_CACHE_BUDGET_MB
+
+logger = logging.getLogger(__name__)
+
+# 进度写回实验参数的最小间隔（秒），阶段完成和结束时总会写回
+PROGRESS_SAVE_INTERVAL = 5.0
+# 最后一个事件早于采集结束约一个事件间隔，比较采集时长时允许的平均事件间隔数
+DURATION_TOLERANCE_EVENTS = 10
+
+
+class RebuildCancelled(Exception):
+    """重建被用户取消"""
+
+
+class RebuildPipeline:
+    """序列重建流水线：列表模式分帧 -> 校正项 -> 逐帧OSEM重建 -> 衰变校正 -> 平滑滤波 -> DICOM
+
+    界面层通过 progress/log 回调获取进度，通过 cancel_event 请求停止；
+    本类不依赖 Qt，可在工作线程或命令行中直接使用。已完成的工作单元记录在输出目录的
+    检查点清单中（见 RebuildManifest），中断后再次运行从最后完成的单元继续。
+    """
+
+    def __init__(self, params: Dict[str, Any],
+                 progress: Optional[Callable[[int], None]] = None,
+                 log: Optional[Callable[[str, str], None]] = None,
+                 cancel_event: Optional[threading.Event] = None,
+                 device_model: str = "",
+                 matrix_cache: Optional[SystemMatrixCache] = None,
+                 frame_done: Optional[Callable[[str, int, int], None]] = None,
+                 isotope: str = "",
+                 series_info: Optional[Dict[str, Any]] = None,
+                 on_checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Args:
+            params: 实验中的 sequence_rebuild 参数
+            progress: 进度回调，参数为 0-100 的整数
+            log: 日志回调 (message, level)
+            cancel_event: 置位后在下一个检查点停止
+            device_model: 设备型号，用于查找几何参数（见 SCANNER_GEOMETRY）
+            matrix_cache: 系统矩阵缓存，默认使用项目缓存目录
+            frame_done: 每重建完一帧调用 frame_done(输入文件, 已完成帧数, 总帧数)
+            isotope: 实验核素，用于衰变校正（见 HALF_LIFE_TABLE）
+            series_info: 写入DICOM的患者/检查描述（patient_name、patient_id、study_description）
+            on_checkpoint: 进度摘要回调，用于写回实验的 sequence_rebuild["progress"]
+        """
+        self.params = params
+        self.device_model = device_model or ""
+        self.geometry = SCANNER_GEOMETRY.get(self.device_model, DEFAULT_SCANNER_GEOMETRY)
+        self.matrix_cache = matrix_cache or SystemMatrixCache(budget_mb=SYSTEM_MATRIX_CACHE_BUDGET_MB)
+        self._progress = progress
+        self._log = log
+        self._frame_done = frame_done
+        self.isotope = isotope or ""
+        self.series_info = series_info or {}
+        self._on_checkpoint = on_checkpoint
+        self.manifest: Optional[RebuildManifest] = None
+        self._inputs: List[str] = []
+        self._last_progress_save = 0.0
+        self.cancel_event = cancel_event or threading.Event()
+        self._steps_done = 0
+        self._total_steps = 1
+        self._systems = {}
+
+    def report(self, message: str, level: str = "INFO"):
+        logger.info(message)
+        if self._log is not None:
+            self._log(message, level)
+
+    def set_progress(self, value: float):
+        if self._progress is not None:
+            self._progress(int(max(0, min(100, value))))
+
+    def _advance(self):
+        self._steps_done += 1
+        self.set_progress(100.0 * self._steps_done / self._total_steps)
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise RebuildCancelled("重建已取消")
+
+    @staticmethod
+    def find_inputs(input_dir: str) -> List[str]:
+        """列出输入目录中的列表模式文件（按文件头魔数判断，不依赖扩展名）"""
+        if not input_dir or not os.path.isdir(input_dir):
+            return []
+        return [entry.path for entry in sorted(os.scandir(input_dir), key=lambda e: e.name)
+                if entry.is_file() and is_listmode_file(entry.path)]
+
+    def output_paths(self, path: str, output_dir: str) -> Dict[str, str]:
+        """输入文件对应的各输出路径"""
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return {
+            "prompts": os.path.join(output_dir, f"{stem}_prompts.npy"),
+            "delayeds": os.path.join(output_dir, f"{stem}_delayeds.npy"),
+            "frames": os.path.join(output_dir, f"{stem}_frames.json"),
+            "osem": os.path.join(output_dir, f"{stem}_osem.npy"),
+            "images": os.path.join(output_dir, f"{stem}_recon.npy"),
+            "checkpoints": os.path.join(output_dir, f"{stem}_checkpoints"),
+            "dicom": os.path.join(output_dir, f"{stem}_dicom")
+        }
+
+    def stage_fingerprints(self) -> Dict[str, str]:
+        """各阶段参数指纹，参数变化时检查点中对应阶段失效"""
+        recon = {"device_model": self.device_model}
+        if self.params.get("attenuation_correction"):
+            # μ-map 按文件大小和修改时间计入，同一路径下替换文件后重新重建
+            recon["mumap"] = file_stat(self.params.get("mumap_path", ""))
+        return {
+            "framing": params_fingerprint(self.params, FRAMING_KEYS),
+            "recon": params_fingerprint(self.params, RECON_KEYS, **recon),
+            "post": params_fingerprint(self.params, POST_KEYS, isotope=self.isotope)
+        }
+
+    def save_progress(self, status: str = "running", force: bool = False):
+        """把进度摘要交给 on_checkpoint（限频）"""
+        if self._on_checkpoint is None or self.manifest is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_progress_save < PROGRESS_SAVE_INTERVAL:
+            return
+        self._last_progress_save = now
+        total_frames = int(self.params.get("total_frames", 36))
+        self._on_checkpoint(progress_summary(self.manifest, self._inputs, total_frames, status))
+
+    def run(self) -> Dict[str, Any]:
+        """
+        执行重建（从检查点继续）
+
+        Returns:
+            汇总信息：处理的文件、每个文件的输出路径、总帧数和耗时
+        """
+        input_dir = self.params.get("input_dir", "")
+        output_dir = self.params.get("output_dir", "")
+        frame_duration = float(self.params.get("frame_duration", 10))
+        total_frames = int(self.params.get("total_frames", 36))
+
+        inputs = self.find_inputs(input_dir)
+        if not inputs:
+            raise ValueError(f"输入目录中没有列表模式文件: {input_dir}")
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.manifest = RebuildManifest(output_dir)
+        self._inputs = inputs
+        fingerprints = self.stage_fingerprints()
+        entries = {path: self.manifest.sync(path, fingerprints) for path in inputs}
+
+        # 每个文件的每一帧计两步：分帧和重建；已完成的单元直接计入
+        self._total_steps = max(1, 2 * len(inputs) * total_frames)
+        self._steps_done = sum(total_frames * bool(e["framed"]) + len(e["frames_done"])
+                               for e in entries.values())
+        if self._steps_done:
+            resumed = sum(len(e["frames_done"]) for e in entries.values())
+            self.report(f"从检查点继续: 已完成 {resumed}/{total_frames * len(inputs)} 帧重建")
+            self.set_progress(100.0 * self._steps_done / self._total_steps)
+
+        start = time.perf_counter()
+        outputs = {}
+        # 上一个文件的DICOM在后台写盘时，当前线程继续处理下一个文件
+        series_inputs = {}
+        writer = DicomSeriesWriter(log=self.report,
+                                   on_written=lambda series_dir: self._series_written(series_inputs[series_dir]))
+        try:
+            for path in inputs:
+                self.check_cancelled()
+                paths = self.output_paths(path, output_dir)
+                if self.manifest.get(path, "framed"):
+                    self.report(f"跳过已分帧的文件: {os.path.basename(path)}")
+                else:
+                    self.report(f"开始分帧: {os.path.basename(path)}")
+                    self.frame_file(path, paths, frame_duration, total_frames)
+                    self.manifest.mark(path, framed=True)
+                    self.save_progress(force=True)
+
+                corrections = self.make_corrections()
+                if not self.manifest.get(path, "reconstructed"):
+                    self.reconstruct_file(path, paths, output_dir, corrections)
+                if not self.manifest.get(path, "postprocessed"):
+                    self.postprocess_file(paths, corrections)
+                    self.manifest.mark(path, postprocessed=True)
+                # 缺少 pydicom 时记为 "skipped"，之后续算仍会补写DICOM序列
+                if self.manifest.get(path, "exported") is not True:
+                    series_inputs[paths["dicom"]] = path
+                    if not self.export_dicom(writer, paths):
+                        self.manifest.mark(path, exported="skipped")
+                outputs[path] = paths
+            writer.close()
+        except RebuildCancelled:
+            writer.close(cancel=True)
+            self.save_progress("interrupted", force=True)
+            raise
+        except BaseException:
+            writer.close(cancel=True)
+            self.save_progress("failed", force=True)
+            raise
+
+        elapsed = time.perf_counter() - start
+        self.set_progress(100)
+        self.save_progress("completed", force=True)
+        return {
+            "inputs": inputs,
+            "outputs": outputs,
+            "total_frames": total_frames * len(inputs),
+            "elapsed": elapsed
+        }
+
+    def _series_written(self, path: str):
+        self.manifest.mark(path, exported=True)
+        self.save_progress(force=True)
+
+    def frame_file(self, path: str, paths: Dict[str, str], frame_duration: float,
+                   total_frames: int):
+        """对单个列表模式文件分帧，正弦图堆栈直接写入 .npy（内存映射）"""
+        listmode = ListModeFile(path)
+        header = listmode.header
+        # 正弦图尺寸取自文件头，与设备几何不一致时按设备 bin 尺寸算出的像素尺寸不可信
+        if self.device_model in SCANNER_GEOMETRY:
+            expected = (self.geometry["n_angles"], self.geometry["n_radial"])
+            if (header.n_angles, header.n_radial) != expected:
+                self.report(f"{os.path.basename(path)} 的正弦图 {header.n_angles}x{header.n_radial} 与设备 "
+                            f"{self.device_model} 的 {expected[0]}x{expected[1]} 不一致，"
+                            f"请确认设备型号", "WARNING")
+        interval = listmode.duration / len(listmode) if len(listmode) else 0.0
+        tolerance = max(header.tick_seconds, DURATION_TOLERANCE_EVENTS * interval)
+        if listmode.duration + tolerance < frame_duration * total_frames:
+            self.report(f"采集时长 {listmode.duration:.1f}s 短于分帧总时长 "
+                        f"{frame_duration * total_frames:.0f}s，末尾帧将为空", "WARNING")
+
+        shape = (total_frames, header.n_angles, header.n_radial)
+        prompts = np.lib.format.open_memmap(paths["prompts"], mode="w+", dtype=np.float32, shape=shape)
+        delayeds = np.lib.format.open_memmap(paths["delayeds"], mode="w+", dtype=np.float32, shape=shape)
+
+        time_edges, event_edges = listmode.frame_edges(frame_duration, total_frames)
+        for frame, p, d in listmode.iter_frames(frame_duration, total_frames,
+                                                cancel=self.cancel_event.is_set):
+            prompts[frame] = p
+            delayeds[frame] = d
+            self.report(f"第 {frame + 1}/{total_frames} 帧: 即时符合 {int(p.sum())}，延迟符合 {int(d.sum())}")
+            self._advance()
+        prompts.flush()
+        delayeds.flush()
+        del prompts, delayeds
+        self.check_cancelled()
+
+        with open(paths["frames"], "w", encoding="utf-8") as f:
+            json.dump({
+                "source": path,
+                "scan_start": header.scan_start,
+                "n_angles": header.n_angles,
+                "n_radial": header.n_radial,
+                "frame_starts": time_edges[:-1].tolist(),
+                "frame_durations": np.diff(time_edges).tolist(),
+                "event_counts": np.diff(event_edges).tolist()
+            }, f, ensure_ascii=False, indent=2)
+
+    def pixel_size(self, image_size: int, n_radial: int) -> float:
+        """重建像素尺寸：图像网格覆盖整个径向视野"""
+        return n_radial * float(self.geometry["bin_size"]) / image_size
+
+    def get_system(self, image_size: int, n_angles: int, n_radial: int, subsets: int) -> SystemMatrix:
+        """获取系统矩阵：同一次运行内复用，跨运行从磁盘缓存内存映射加载"""
+        bin_size = float(self.geometry["bin_size"])
+        pixel_size = self.pixel_size(image_size, n_radial)
+        key = (image_size, n_angles, n_radial, subsets)
+        system = self._systems.get(key)
+        if system is None:
+            self.report(f"准备系统矩阵: 图像 {image_size}x{image_size}，{n_angles} 角度 x {n_radial} 径向，"
+                        f"{subsets} 子集（{self.device_model or '默认几何'}）")
+            system = self.matrix_cache.get(image_size, pixel_size, n_angles, n_radial, bin_size, subsets)
+            self.report(f"系统矩阵就绪，非零元 {system.matrix.nnz}，耗时 {system.build_time:.2f}s")
+            self._systems[key] = system
+        return system
+
+    def make_corrections(self) -> CorrectionPipeline:
+        """按参数开关构建校正流水线；缺少核素或 μ-map 时对应阶段自动跳过"""
+        half_life = HALF_LIFE_TABLE.get(self.isotope)
+        if self.params.get("decay_correction", True) and half_life is None:
+            self.report(f"未知核素 {self.isotope or '(未设置)'}，跳过衰变校正", "WARNING")
+        mumap = None
+        if self.params.get("attenuation_correction", False):
+            mumap = CorrectionPipeline.load_mumap(self.params.get("mumap_path", ""))
+            if mumap is None:
+                self.report("未找到 μ-map 文件，跳过衰减校正", "WARNING")
+        return CorrectionPipeline(self.params, half_life_min=half_life, mumap=mumap)
+
+    def recon_workers(self, total_frames: int) -> int:
+        """帧并行的工作进程数：参数 workers 优先，默认为CPU核数减一，不超过帧数"""
+        workers = int(self.params.get("workers") or max(1, (os.cpu_count() or 2) - 1))
+        return max(1, min(workers, total_frames))
+
+    def reconstruct_file(self, source: str, paths: Dict[str, str], output_dir: str,
+                         corrections: CorrectionPipeline):
+        """校正并OSEM重建分帧后的正弦图，结果写入 *_osem.npy
+
+        已完成的帧（见检查点清单）跳过，进行中的帧从迭代检查点继续。多帧且允许多个
+        工作进程时交给 FrameScheduler 帧并行重建，否则在当前线程逐帧重建。
+        """
+        iterations = int(self.params.get("iterations", 4))
+        subsets = int(self.params.get("subsets", 16))
+
+        prompts = np.load(paths["prompts"], mmap_mode="r")
+        total_frames, n_angles, n_radial = prompts.shape
+        image_size = int(self.params.get("image_size") or n_radial)
+        shape = (total_frames, image_size, image_size)
+
+        done = self.manifest.frames_done(source)
+        if done and not os.path.exists(paths["osem"]):
+            # 清单与输出不一致（结果文件被删除），整体重做
+            self.manifest.mark(source, frames_done=[])
+            self._steps_done -= len(done)
+            done = set()
+        if not done:
+            shutil.rmtree(paths["checkpoints"], ignore_errors=True)
+            images = np.lib.format.open_memmap(paths["osem"], mode="w+", dtype=np.float32, shape=shape)
+            del images
+        pending = [frame for frame in range(total_frames) if frame not in done]
+        if done:
+            self.report(f"{os.path.basename(source)}: 跳过已完成的 {len(done)} 帧，剩余 {len(pending)} 帧")
+
+        system = self.get_system(image_size, n_angles, n_radial, subsets)
+        terms = corrections.prepare(paths, system, output_dir) if pending else {}
+        checkpoint_dir = paths["checkpoints"]
+        workers = self.recon_workers(len(pending))
+        completed = [len(done)]
+
+        def on_frame(frame: int, elapsed: float):
+            completed[0] += 1
+            self.manifest.mark_frame(source, frame)
+            self.report(f"第 {frame + 1}/{total_frames} 帧重建完成 "
+                        f"({iterations} 次迭代 x {system.subsets} 子集，{elapsed:.2f}s)")
+            self._advance()
+            self.save_progress()
+            if self._frame_done is not None:
+                self._frame_done(source, completed[0], total_frames)
+
+        if workers > 1:
+            self.report(f"帧并行重建: {len(pending)} 帧，{workers} 个工作进程")
+            scheduler = FrameScheduler(system, workers=workers, cancel_event=self.cancel_event)
+            task = {"prompts": paths["prompts"], "output": paths["osem"], "iterations": iterations,
+                    "additive": terms.get("additive"), "multiplicative": terms.get("multiplicative"),
+                    "checkpoint_dir": checkpoint_dir}
+            scheduler.run(task, pending, on_frame=on_frame)
+        elif pending:
+            recon = OSEMReconstructor(system)
+            checkpoint = FrameCheckpoint(checkpoint_dir)
+            for frame in pending:
+                self.check_cancelled()
+                start = time.perf_counter()
+                image = reconstruct_resumable(recon, np.asarray(prompts[frame]), iterations, frame,
+                                              checkpoint=checkpoint, cancel=self.cancel_event.is_set,
+                                              **frame_terms(terms, frame))
+                self.check_cancelled()
+                images = np.load(paths["osem"], mmap_mode="r+")
+                images[frame] = image
+                images.flush()
+                del images
+                checkpoint.clear(frame)
+                on_frame(frame, time.perf_counter() - start)
+        self.check_cancelled()
+
+        self.manifest.mark(source, reconstructed=True)
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        self.save_progress(force=True)
+
+    def postprocess_file(self, paths: Dict[str, str], corrections: CorrectionPipeline):
+        """衰变校正并平滑：由 *_osem.npy 生成 *_recon.npy，可重复执行"""
+        with open(paths["frames"], "r", encoding="utf-8") as f:
+            frames = json.load(f)
+        corrections.apply_decay(paths["osem"], paths["images"], frames)
+        self.report(corrections.summary())
+        image_size = np.load(paths["images"], mmap_mode="r").shape[-1]
+        self.smooth_images(paths["images"], self.pixel_size(image_size, frames["n_radial"]))
+
+    def smooth_images(self, images_path: str, pixel_size: float):
+        """按 smoothing_filter 逐帧平滑重建图像（只在帧内做二维滤波，不跨帧）"""
+        kind = self.params.get("smoothing_filter", "Gaussian") or "None"
+        fwhm = float(self.params.get("filter_fwhm", 4.0))
+        if kind == "None" or fwhm <= 0:
+            return
+        start = time.perf_counter()
+        images = np.load(images_path, mmap_mode="r+")
+        filter_volume(images, (1.0, pixel_size, pixel_size), kind, fwhm, axes=(1, 2), out=images)
+        images.flush()
+        del images
+        self.report(f"平滑滤波 {kind} (FWHM {fwhm:.1f}mm) 耗时 {time.perf_counter() - start:.2f}s")
+
+    def export_dicom(self, writer: DicomSeriesWriter, paths: Dict[str, str]) -> bool:
+        """把重建堆栈排队写成 DICOM 序列（<stem>_dicom 目录），未安装 pydicom 时跳过并返回 False"""
+        try:
+            import pydicom  # noqa: F401
+        except ImportError:
+            self.report("未安装 pydicom，跳过 DICOM 输出", "WARNING")
+            return False
+
+        with open(paths["frames"], "r", encoding="utf-8") as f:
+            frames = json.load(f)
+        image_size = np.load(paths["images"], mmap_mode="r").shape[-1]
+        stem = os.path.basename(paths["images"])[:-len("_recon.npy")]
+        info = dict(self.series_info)
+        info.update({
+            "series_description": info.get("series_description") or f"{stem} 动态重建",
+            "device_model": self.device_model,
+            "pixel_size": self.pixel_size(image_size, frames["n_radial"]),
+            "isotope": self.isotope,
+            "half_life_min": HALF_LIFE_TABLE.get(self.isotope),
+            "decay_corrected": bool(self.params.get("decay_correction", True))
+                               and self.isotope in HALF_LIFE_TABLE
+        })
+        writer.submit(paths["images"], paths["frames"], paths["dicom"], info)
+        return True
@@ -0,0 +1,163 @@
+# src/models/reconstruction/projector.py
+
+import time
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+
+def subset_angle_order(n_angles: int, subsets: int) -> List[np.ndarray]:
+    """按交错方式把角度分到各子集：子集 k 包含角度 k, k+S, k+2S, ..."""
+    subsets = max(1, min(int(subsets), n_angles))
+    return [np.arange(k, n_angles, subsets) for k in range(subsets)]
+
+
+def build_parallel_projector(image_size: int, n_angles: int, n_radial: int,
+                             pixel_size: float = 1.0, bin_size: Optional[float] = None,
+                             angle_order: Optional[np.ndarray] = None) -> sparse.csr_matrix:
+    """
+    构建二维平行束系统矩阵（像素驱动 + 径向线性插值）
+
+    每个像素中心投影到探测器坐标 s = x cosθ + y sinθ，按距离线性分配到相邻两个
+    径向bin，权重为像素边长（近似穿过像素的路径长度）。只保留视野圆内的像素。
+
+    Args:
+        image_size: 图像边长（像素）
+        n_angles: 角度数，覆盖 [0, π)
+        n_radial: 径向bin数
+        pixel_size: 像素尺寸（mm）
+        bin_size: 径向bin尺寸（mm），默认与像素相同
+        angle_order: 行的角度排列顺序，默认 0..n_angles-1
+
+    Returns:
+        形状 (n_angles * n_radial, image_size ** 2) 的 float32 CSR 矩阵，
+        第 i 组 n_radial 行对应 angle_order[i]
+    """
+    bin_size = bin_size or pixel_size
+    if angle_order is None:
+        angle_order = np.arange(n_angles)
+
+    coords = (np.arange(image_size) - (image_size - 1) / 2.0) * pixel_size
+    yy, xx = np.meshgrid(coords, coords, indexing="ij")
+    fov_radius = min(image_size * pixel_size, n_radial * bin_size) / 2.0
+    inside = np.flatnonzero((xx ** 2 + yy ** 2).ravel() <= fov_radius ** 2)
+    x = xx.ravel()[inside]
+    y = yy.ravel()[inside]
+
+    thetas = np.pi * np.asarray(angle_order, dtype=np.float64) / n_angles
+    n_pixels = image_size * image_size
+    cols = np.concatenate([inside, inside]).astype(np.int32)
+
+    # 逐角度构建 n_radial 行的小块再拼接，峰值内存只与单个角度有关
+    blocks = []
+    for theta in thetas:
+        # 径向bin坐标（连续值，bin中心为整数）
+        s = (x * np.cos(theta) + y * np.sin(theta)) / bin_size + (n_radial - 1) / 2.0
+        lower = np.floor(s)
+        frac = (s - lower).astype(np.float32)
+        lower = lower.astype(np.int32)
+        rows = np.concatenate([lower, lower + 1])
+        weights = np.concatenate([(1.0 - frac) * pixel_size, frac * pixel_size]).astype(np.float32)
+        # 越出探测器范围的部分丢弃
+        valid = (rows >= 0) & (rows < n_radial) & (weights > 0)
+        blocks.append(sparse.csr_matrix((weights[valid], (rows[valid], cols[valid])),
+                                        shape=(n_radial, n_pixels), dtype=np.float32))
+
+    matrix = sparse.vstack(blocks, format="csr", dtype=np.float32)
+    matrix.sum_duplicates()
+    return matrix
+
+
+def csr_view(data: np.ndarray, indices: np.ndarray, indptr: np.ndarray,
+              shape: Tuple[int, int]) -> sparse.csr_matrix:
+    """用已有数组直接构造CSR矩阵而不复制
+
+    scipy 在构造函数中会把“大数组上的小切片”复制成独立数组（_prune_array），
+    这里先建空矩阵再替换内部数组，保证子集矩阵与完整矩阵（或内存映射文件）共享数据。
+    """
+    matrix = sparse.csr_matrix(shape, dtype=data.dtype)
+    matrix.data = data
+    matrix.indices = indices
+    matrix.indptr = indptr
+    return matrix
+
+
+class SystemMatrix:
+    """按子集排列行的系统矩阵
+
+    行顺序为子集0的所有角度、子集1的所有角度……，因此每个子集对应 CSR 中连续的
+    行区间，取子集矩阵时直接共享 data/indices 数组，不产生拷贝。
+    """
+
+    def __init__(self, image_size: int, n_angles: int, n_radial: int, subsets: int = 1,
+                 pixel_size: float = 1.0, bin_size: Optional[float] = None,
+                 matrix: Optional[sparse.csr_matrix] = None):
+        self.image_size = int(image_size)
+        self.n_angles = int(n_angles)
+        self.n_radial = int(n_radial)
+        self.pixel_size = float(pixel_size)
+        self.bin_size = float(bin_size or pixel_size)
+        self.subset_angles = subset_angle_order(self.n_angles, subsets)
+        self.angle_order = np.concatenate(self.subset_angles)
+
+        start = time.perf_counter()
+        if matrix is None:
+            matrix = build_parallel_projector(self.image_size, self.n_angles, self.n_radial,
+                                              self.pixel_size, self.bin_size, self.angle_order)
+        self.matrix = matrix
+        self.build_time = time.perf_counter() - start
+
+        bounds = np.cumsum([0] + [len(a) for a in self.subset_angles]) * self.n_radial
+        self.subset_bounds = list(zip(bounds[:-1], bounds[1:]))
+        self._subset_cache = {}
+        logger.debug(f"系统矩阵: {self.matrix.shape}, nnz={self.matrix.nnz}, "
+                     f"构建耗时 {self.build_time:.2f}s")
+
+    @property
+    def subsets(self) -> int:
+        return len(self.subset_angles)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.matrix.shape
+
+    def nbytes(self) -> int:
+        m = self.matrix
+        return m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+
+    def subset(self, k: int) -> sparse.csr_matrix:
+        """子集 k 的系统矩阵（与完整矩阵共享数据）"""
+        cached = self._subset_cache.get(k)
+        if cached is not None:
+            return cached
+        lo, hi = self.subset_bounds[k]
+        m = self.matrix
+        p0, p1 = m.indptr[lo], m.indptr[hi]
+        sub = csr_view(m.data[p0:p1], m.indices[p0:p1],
+                        (m.indptr[lo:hi + 1] - p0).astype(m.indptr.dtype), (hi - lo, m.shape[1]))
+        self._subset_cache[k] = sub
+        return sub
+
+    def to_matrix_order(self, sinogram: np.ndarray) -> np.ndarray:
+        """把 (n_angles, n_radial) 正弦图重排为矩阵行顺序的一维数组"""
+        return np.ascontiguousarray(sinogram[self.angle_order], dtype=np.float32).ravel()
+
+    def to_sinogram(self, projection: np.ndarray) -> np.ndarray:
+        """把矩阵行顺序的投影还原为 (n_angles, n_radial) 正弦图"""
+        sinogram = np.empty((self.n_angles, self.n_radial), dtype=np.float32)
+        sinogram[self.angle_order] = projection.reshape(-1, self.n_radial)
+        return sinogram
+
+    def forward(self, image: np.ndarray) -> np.ndarray:
+        """正投影，返回 (n_angles, n_radial) 正弦图"""
+        projection = self.matrix @ np.asarray(image, dtype=np.float32).ravel()
+        return self.to_sinogram(projection)
+
+    def back(self, sinogram: np.ndarray) -> np.ndarray:
+        """反投影，返回 (image_size, image_size) 图像"""
+        image = self.matrix.T @ self.to_matrix_order(sinogram)
+        return image.reshape(self.image_size, self.image_size)
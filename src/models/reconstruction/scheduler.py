@@ -0,0 +1,211 @@
+# src/models/reconstruction/scheduler.py
+
+import os
+import time
+import logging
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .projector import SystemMatrix, csr_view
+from .osem import OSEMReconstructor
+from .checkpoint import FrameCheckpoint, reconstruct_resumable
+
+logger = logging.getLogger(__name__)
+
+# 主线程轮询取消标志的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.1
+
+
+class SharedCSR:
+    """把CSR矩阵的三个数组放入共享内存，工作进程按名称映射，只读共享"""
+
+    def __init__(self, blocks: Dict[str, shared_memory.SharedMemory], descriptor: Dict[str, Any]):
+        self._blocks = blocks
+        self.descriptor = descriptor
+
+    @classmethod
+    def create(cls, matrix) -> "SharedCSR":
+        blocks, arrays = {}, {}
+        for name in ("data", "indices", "indptr"):
+            source = np.asarray(getattr(matrix, name))
+            block = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+            target = np.ndarray(source.shape, dtype=source.dtype, buffer=block.buf)
+            target[...] = source
+            blocks[name] = block
+            arrays[name] = {"shm": block.name, "dtype": source.dtype.str, "shape": source.shape}
+        return cls(blocks, {"arrays": arrays, "shape": tuple(matrix.shape)})
+
+    @staticmethod
+    def attach(descriptor: Dict[str, Any]):
+        """在工作进程中映射共享数组，返回 (csr矩阵, 共享内存句柄列表)"""
+        handles, arrays = [], {}
+        for name, info in descriptor["arrays"].items():
+            # 子进程只读取，不参与生命周期管理
+            block = shared_memory.SharedMemory(name=info["shm"], track=False) \
+                if _supports_untracked() else shared_memory.SharedMemory(name=info["shm"])
+            array = np.ndarray(tuple(info["shape"]), dtype=np.dtype(info["dtype"]), buffer=block.buf)
+            array.setflags(write=False)
+            handles.append(block)
+            arrays[name] = array
+        matrix = csr_view(arrays["data"], arrays["indices"], arrays["indptr"], tuple(descriptor["shape"]))
+        return matrix, handles
+
+    def close(self):
+        """释放并删除共享内存（仅由创建者调用）"""
+        for block in self._blocks.values():
+            try:
+                block.close()
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = {}
+
+
+def _supports_untracked() -> bool:
+    # Python 3.13 起 SharedMemory 支持 track 参数
+    import inspect
+    return "track" in inspect.signature(shared_memory.SharedMemory.__init__).parameters
+
+
+def frame_terms(task: Dict[str, Any], frame: int) -> Dict[str, np.ndarray]:
+    """读取一帧的加性/乘性校正项；二维数组表示所有帧共用"""
+    terms = {}
+    for name in ("additive", "multiplicative"):
+        if task.get(name):
+            term = np.load(task[name], mmap_mode="r")
+            terms[name] = np.asarray(term[frame] if term.ndim == 3 else term)
+    return terms
+
+
+# ---- 工作进程状态（由 initializer 设置） ----
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(descriptor, geometry, sensitivities, cancel_event):
+    matrix, handles = SharedCSR.attach(descriptor)
+    system = SystemMatrix(geometry["image_size"], geometry["n_angles"], geometry["n_radial"],
+                          subsets=geometry["subsets"], pixel_size=geometry["pixel_size"],
+                          bin_size=geometry["bin_size"], matrix=matrix)
+    _worker_state.update({
+        "system": system,
+        "recon": OSEMReconstructor(system, sensitivities=sensitivities),
+        "handles": handles,
+        "cancel": cancel_event
+    })
+
+
+def _reconstruct_frame(frame: int, task: Dict[str, Any]):
+    """
+    工作进程中重建一帧：从 .npy 内存映射读取输入，结果直接写入输出 .npy 的对应帧
+
+    Returns:
+        (frame, elapsed, completed)
+    """
+    cancel = _worker_state["cancel"]
+    if cancel.is_set():
+        return frame, 0.0, False
+
+    start = time.perf_counter()
+    sinogram = np.asarray(np.load(task["prompts"], mmap_mode="r")[frame])
+    kwargs = frame_terms(task, frame)
+
+    checkpoint = FrameCheckpoint(task["checkpoint_dir"]) if task.get("checkpoint_dir") else None
+    image = reconstruct_resumable(_worker_state["recon"], sinogram, task["iterations"], frame,
+                                  checkpoint=checkpoint, cancel=cancel.is_set, **kwargs)
+    if cancel.is_set():
+        return frame, time.perf_counter() - start, False
+
+    output = np.load(task["output"], mmap_mode="r+")
+    output[frame] = image
+    output.flush()
+    del output
+    if checkpoint is not None:
+        checkpoint.clear(frame)
+    return frame, time.perf_counter() - start, True
+
+
+class FrameScheduler:
+    """动态序列的帧并行重建
+
+    系统矩阵只复制一次到共享内存，各工作进程映射同一份数据；帧的输入输出都是
+    .npy 文件，进程间只传递帧序号和路径。取消时置位进程间事件：进行中的帧在下一个
+    子集边界退出，排队中的帧直接取消。
+    """
+
+    def __init__(self, system: SystemMatrix, workers: Optional[int] = None,
+                 cancel_event: Optional[threading.Event] = None,
+                 sensitivities: Optional[List[np.ndarray]] = None):
+        self.system = system
+        self.workers = max(1, workers or (os.cpu_count() or 2) - 1)
+        self.cancel_event = cancel_event or threading.Event()
+        self.sensitivities = sensitivities
+
+    def run(self, task: Dict[str, Any], frames: Sequence[int],
+            on_frame: Optional[Callable[[int, float], None]] = None) -> Dict[str, Any]:
+        """
+        并行重建指定的帧
+
+        Args:
+            task: 任务描述，包含 prompts/output 路径、iterations，可选 additive/multiplicative 路径
+                （形状 (帧, 角度, 径向) 或所有帧共用的 (角度, 径向)）和 checkpoint_dir（迭代检查点目录）
+            frames: 需要重建的帧序号（断点续算时为尚未完成的帧）
+            on_frame: 每完成一帧调用 on_frame(frame, elapsed)（在调用线程中执行）
+
+        Returns:
+            {"completed": 已完成帧数, "cancelled": 是否被取消, "frame_times": {帧: 耗时}}
+        """
+        frames = list(frames)
+        if not frames:
+            return {"completed": 0, "cancelled": False, "frame_times": {}}
+        # spawn 避免在含 Qt 线程的进程中 fork
+        ctx = mp.get_context("spawn")
+        worker_cancel = ctx.Event()
+        shared = SharedCSR.create(self.system.matrix)
+        sensitivities = self.sensitivities
+        if sensitivities is None:
+            sensitivities = OSEMReconstructor(self.system).sensitivities
+        geometry = {
+            "image_size": self.system.image_size,
+            "n_angles": self.system.n_angles,
+            "n_radial": self.system.n_radial,
+            "subsets": self.system.subsets,
+            "pixel_size": self.system.pixel_size,
+            "bin_size": self.system.bin_size
+        }
+
+        frame_times = {}
+        completed = 0
+        cancelled = False
+        executor = ProcessPoolExecutor(max_workers=min(self.workers, len(frames)), mp_context=ctx,
+                                       initializer=_init_worker,
+                                       initargs=(shared.descriptor, geometry, sensitivities, worker_cancel))
+        try:
+            pending = {executor.submit(_reconstruct_frame, frame, task) for frame in frames}
+            while pending:
+                if self.cancel_event.is_set():
+                    cancelled = True
+                    worker_cancel.set()
+                    break
+                done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    frame, elapsed, ok = future.result()
+                    if not ok:
+                        continue
+                    completed += 1
+                    frame_times[frame] = elapsed
+                    if on_frame is not None:
+                        on_frame(frame, elapsed)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            shared.close()
+
+        return {
+            "completed": completed,
+            "cancelled": cancelled or self.cancel_event.is_set(),
+            "frame_times": frame_times
+        }
@@ -5,7 +5,7 @@ import glob
 import json
 import logging
 import re
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .base_repository import BaseRepository
 from ..entities.experiment import Experiment
 
@@ -28,6 +28,11 @@ class ExperimentRepository(BaseRepository[Experiment]):
             logger.info(f"创建实验数据目录: {self.data_dir}")
         else:
             logger.info(f"使用实验数据目录: {self.data_dir}")
+        
+        # 已加载实验的内存缓存，首次访问时扫描目录，之后随保存/删除更新。
+        # 以对象为键（复制出的实验文件可能带相同的ID），另按ID索引供 get_by_id 查找
+        self._cache: Optional[Dict[int, Experiment]] = None
+        self._by_id: Dict[str, Experiment] = {}
 
     def _sanitize(self, text: str) -> str:
         """
@@ -43,6 +48,7 @@ class ExperimentRepository(BaseRepository[Experiment]):
         """
         扫描 data_dir 目录下所有 .json 文件，将其解析为 Experiment 对象并返回列表。
         同时，将该文件路径保存在 exp._file_path 中，便于后续直接删除/覆盖。
+        扫描结果替换内存缓存。
         """
         experiments = []
         pattern = os.path.join(self.data_dir, "*.json")
@@ -73,15 +79,37 @@ class ExperimentRepository(BaseRepository[Experiment]):
             logger.info(f"成功加载实验: {file_path}，name={exp.name}")
 
         logger.info(f"共加载 {len(experiments)} 个实验")
+        self._cache = {}
+        self._by_id = {}
+        for exp in experiments:
+            self._cache_add(exp)
         return experiments
 
+    def _cache_add(self, experiment: Experiment):
+        self._cache[id(experiment)] = experiment
+        self._by_id.setdefault(experiment.id, experiment)
+
+    def _cache_remove(self, experiment: Experiment):
+        self._cache.pop(id(experiment), None)
+        if self._by_id.get(experiment.id) is experiment:
+            del self._by_id[experiment.id]
+            # 同ID的其他实验（少见）接替索引
+            for other in self._cache.values():
+                if other.id == experiment.id:
+                    self._by_id[other.id] = other
+                    break
+
+    def get_cached(self) -> List[Experiment]:
+        """缓存中的全部实验，尚未加载时扫描一次目录"""
+        if self._cache is None:
+            return self.get_all()
+        return list(self._cache.values())
+
     def get_by_id(self, id: str) -> Optional[Experiment]:
-        """根据ID获取实验"""
-        experiments = self.get_all()
-        for exp in experiments:
-            if exp.id == id:
-                return exp
-        return None
+        """根据ID获取实验（从缓存查找，不重新扫描目录）"""
+        if self._cache is None:
+            self.get_all()
+        return self._by_id.get(id)
 
     def save(self, experiment: Experiment) -> None:
         """
@@ -128,6 +156,8 @@ class ExperimentRepository(BaseRepository[Experiment]):
         except Exception as e:
             logger.error(f"保存失败: {full_path}，错误: {e}")
             raise
+        if self._cache is not None:
+            self._cache_add(experiment)
 
     def delete(self, experiment: Experiment) -> None:
         """
@@ -144,6 +174,8 @@ class ExperimentRepository(BaseRepository[Experiment]):
                 raise
         else:
             logger.warning(f"无法删除: 找不到 experiment._file_path={path}")
+        if self._cache is not None:
+            self._cache_remove(experiment)
 
     def delete_by_id(self, id: str) -> None:
         """根据ID删除实验"""
@@ -151,9 +183,14 @@ class ExperimentRepository(BaseRepository[Experiment]):
         if experiment:
             self.delete(experiment)
 
-    def get_all_experiments(self) -> List[Experiment]:
-        """获取所有实验 - 提供与MainViewModel兼容的方法名"""
-        return self.get_all()
+    def get_all_experiments(self, reload: bool = True) -> List[Experiment]:
+        """
+        获取所有实验 - 提供与MainViewModel兼容的方法名
+        
+        Args:
+            reload: True 时重新扫描目录，False 时已加载过则直接返回缓存
+        """
+        return self.get_all() if reload else self.get_cached()
     
     def save_experiment(self, experiment: Experiment) -> None:
         """保存实验 - 提供与MainViewModel兼容的方法名"""
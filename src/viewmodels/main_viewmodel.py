@@ -2,7 +2,7 @@
 
 from PyQt5.QtCore import QObject, pyqtSignal
 from typing import Optional, List, Dict, Any, Callable
-from ..core.bindings import Property
+from ..core.bindings import Property, batch_updates
 from ..models.repositories.experiment_repository import ExperimentRepository
 from ..models.services.export_service import ExportService
 from ..models.entities.experiment import Experiment
@@ -19,13 +19,17 @@ class MainViewModel(QObject):
     error_occurred = pyqtSignal(str)
     status_changed = pyqtSignal(str, int)  # 消息, 超时时间
     experiments_loaded = pyqtSignal(list)
+    experiment_created = pyqtSignal(object)  # 新建的实验
+    experiment_deleted = pyqtSignal(object)  # 删除的实验
+    experiment_updated = pyqtSignal(object)  # 已保存的修改后的实验
     
-    def __init__(self):
+    def __init__(self, experiment_repository: Optional[ExperimentRepository] = None,
+                 export_service: Optional[ExportService] = None):
         super().__init__()
         
-        # 创建依赖服务
-        self.experiment_repository = ExperimentRepository()
-        self.export_service = ExportService()
+        # 依赖服务（通常由 AppContext 注入共享实例）
+        self.experiment_repository = experiment_repository or ExperimentRepository()
+        self.export_service = export_service or ExportService()
         
         # 可绑定属性
         self.is_busy = Property(False)
@@ -41,8 +45,8 @@ class MainViewModel(QObject):
         self._command_index = -1
         self._experiments = []
         
-        # 加载实验数据
-        self.load_experiments()
+        # 加载实验数据（仓库已加载过时直接使用其缓存）
+        self.load_experiments(reload=False)
     
     def bind_property(self, property_name: str, callback: Callable):
         """绑定属性更改回调"""
@@ -114,19 +118,20 @@ class MainViewModel(QObject):
         if self.selected_experiment.value:
             self.status_changed.emit(f"编辑实验: {self.selected_experiment.value.name}", 2000)
     
-    def delete_experiment(self, experiment_id: str):
-        """删除实验"""
+    def delete_experiment(self, experiment: Experiment):
+        """删除实验（按对象删除，复制的实验文件可能共用ID）"""
         try:
             # 从仓库中删除
-            self.experiment_repository.delete_experiment(experiment_id)
+            self.experiment_repository.delete(experiment)
             
             # 从内存中删除
-            self._experiments = [exp for exp in self._experiments if exp.experiment_id != experiment_id]
-            self.experiment_count.value = len(self._experiments)
-            
-            # 标记为未保存
-            self.has_unsaved_changes.value = True
+            self._experiments = [exp for exp in self._experiments if exp is not experiment]
+            # 计数和未保存标记合并通知
+            with batch_updates():
+                self.experiment_count.value = len(self._experiments)
+                self.has_unsaved_changes.value = True
             
+            self.experiment_deleted.emit(experiment)
             self.status_changed.emit("删除实验成功", 2000)
             return True
         except Exception as e:
@@ -174,12 +179,13 @@ class MainViewModel(QObject):
             
             # 更新内部状态
             self._experiments.append(experiment)
-            self.experiment_count.value = len(self._experiments)
-            
-            # 标记为未保存
-            self.has_unsaved_changes.value = True
+            # 计数和未保存标记合并通知
+            with batch_updates():
+                self.experiment_count.value = len(self._experiments)
+                self.has_unsaved_changes.value = True
             
             # 通知UI
+            self.experiment_created.emit(experiment)
             self.status_changed.emit(f"已创建实验: {experiment.name}", 2000)
             
             return experiment
@@ -188,15 +194,26 @@ class MainViewModel(QObject):
             logging.error(f"创建实验失败: {e}")
             return None
     
+    def save_experiment(self, experiment: Experiment) -> bool:
+        """保存一个修改后的实验（实验窗口自动保存时调用），列表只刷新该实验"""
+        try:
+            self.experiment_repository.save_experiment(experiment)
+            self.experiment_updated.emit(experiment)
+            return True
+        except Exception as e:
+            self.error_occurred.emit(f"保存实验失败: {str(e)}")
+            logging.error(f"保存实验失败: {e}")
+            return False
+    
     def get_experiments(self) -> List[Experiment]:
-        """获取所有实验列表"""
-        return self._experiments.copy()
+        """获取所有实验列表（仓库缓存，随创建/保存/删除更新）"""
+        return self.experiment_repository.get_cached()
     
     def save_all_data(self):
         """保存所有数据"""
         try:
             # 保存所有实验
-            for experiment in self._experiments:
+            for experiment in self.experiment_repository.get_cached():
                 self.experiment_repository.save_experiment(experiment)
             
             self.has_unsaved_changes.value = False
@@ -260,27 +277,34 @@ class MainViewModel(QObject):
         self.status_changed.emit("关于应用", 2000)
     
     # 数据加载
-    def load_experiments(self):
-        """加载实验数据"""
-        try:
-            self.is_busy.value = True
+    def load_experiments(self, reload: bool = True):
+        """
+        加载实验数据
+        
+        Args:
+            reload: True 时重新扫描实验目录，False 时使用仓库缓存
+        """
+        # 忙碌状态和计数合并通知
+        with batch_updates():
+            try:
+                self.is_busy.value = True
             
-            # 从仓库加载所有实验
-            self._experiments = self.experiment_repository.get_all_experiments()
-            self.experiment_count.value = len(self._experiments)
+                # 从仓库加载所有实验
+                self._experiments = self.experiment_repository.get_all_experiments(reload=reload)
+                self.experiment_count.value = len(self._experiments)
             
-            # 发送信号
-            self.experiments_loaded.emit(self._experiments)
+                # 发送信号
+                self.experiments_loaded.emit(self._experiments)
             
-            logging.info(f"加载了 {len(self._experiments)} 个实验")
+                logging.info(f"加载了 {len(self._experiments)} 个实验")
             
-        except Exception as e:
-            self.error_occurred.emit(f"加载实验失败: {str(e)}")
-            logging.error(f"加载实验失败: {e}")
-            self._experiments = []
+            except Exception as e:
+                self.error_occurred.emit(f"加载实验失败: {str(e)}")
+                logging.error(f"加载实验失败: {e}")
+                self._experiments = []
             
-        finally:
-            self.is_busy.value = False
+            finally:
+                self.is_busy.value = False
     
     # 清理
     def cleanup(self):
@@ -1,7 +1,11 @@
+import numpy as np
 from PyQt5.QtCore import QObject, pyqtSignal
 from typing import List, Optional, Dict
-from ...core.bindings import Property, ObservableList
+from ...core.bindings import Property, ObservableList, batch_updates
+from ...core.query_executor import QueryExecutor
 from ...models.entities.experiment import Experiment
+from ...models.listing.facets import FACET_FIELDS
+from ...models.listing.store import ExperimentListStore, SEARCH_FIELDS, drop_rows
 from ...models.repositories.experiment_repository import ExperimentRepository
 from ...models.services.export_service import ExportService
 
@@ -12,6 +16,8 @@ class ExperimentListViewModel(QObject):
     # 信号
     experiment_selected = pyqtSignal(object)
     filter_changed = pyqtSignal()
+    facets_changed = pyqtSignal()  # 分面取值或计数变化
+    experiment_changed = pyqtSignal(int, bool, object)  # 存储索引, 是否符合过滤条件, 值有变化的列表字段
     status_message = pyqtSignal(str, int)  # 消息, 超时(ms)
     error_occurred = pyqtSignal(str)
     
@@ -22,9 +28,19 @@ class ExperimentListViewModel(QObject):
         
         # 数据属性
         self.experiments = ObservableList()
+        # 列表字段的列式存储和当前过滤结果（存储索引），供表格模型使用
+        self.store = ExperimentListStore()
+        self.filtered_rows = self.store.all_rows()
         self.selected_experiment = Property(None)
         self.search_text = Property("")
-        self.filter_nuclide = Property("全部")
+        # 分面筛选：{字段: 选中取值的元组}（同一字段内为“或”，字段之间为“与”），日期范围两端包含
+        self.facet_filters = Property({})
+        self.date_range = Property((None, None))
+        # 当前条件下各分面取值的命中数 {字段: {取值: 数量}}
+        self.facet_counts: Dict[str, Dict[str, int]] = {}
+        # 条件变化时的过滤和分面计数在后台线程执行
+        self.query_executor = QueryExecutor(self.store, self)
+        self.query_executor.results_ready.connect(self._on_filter_results)
         
         # 状态属性
         self.is_loading = Property(False)
@@ -34,100 +50,210 @@ class ExperimentListViewModel(QObject):
         # 绑定搜索和筛选
         self._bind_filtering()
         
-        # 初始化加载
-        self.refresh_experiments()
+        # 初始化加载（仓库已加载过时直接使用其缓存）
+        self.refresh_experiments(reload=False)
     
     def _bind_filtering(self):
         """绑定搜索和筛选功能"""
-        # 属性变化时应用过滤
-        self.search_text.bind_to(lambda _: self._apply_filter())
-        self.filter_nuclide.bind_to(lambda _: self._apply_filter())
+        # 属性变化时在后台重新过滤（初始加载由 refresh_experiments 完成）
+        self.search_text.bind_to(lambda _: self._schedule_filter(), immediate=False)
+        self.facet_filters.bind_to(lambda _: self._schedule_filter(), immediate=False)
+        self.date_range.bind_to(lambda _: self._schedule_filter(), immediate=False)
+    
+    def set_facet(self, field: str, values):
+        """设置一个分面字段的选中取值，空表示不限制"""
+        filters = dict(self.facet_filters.value)
+        values = tuple(values or ())
+        if values:
+            filters[field] = values
+        else:
+            filters.pop(field, None)
+        self.facet_filters.value = filters
+    
+    def _filter_query(self):
+        """
+        按当前搜索和分面条件生成过滤查询（条件在此时取值，查询可在后台线程执行）
+        
+        查询结果为 (过滤后的存储索引, 分面计数)
+        """
+        store = self.store
+        text = self.search_text.value or ""
+        selection = dict(self.facet_filters.value)
+        date_range = self.date_range.value
+        has_facets = any(selection.values()) or any(date_range)
+        
+        def query(checkpoint):
+            rows = hits = store.search(text)
+            checkpoint()
+            # 分面过滤（位图按位与）
+            if has_facets and len(rows):
+                mask = store.facets.mask(selection, date_range)
+                rows = rows[mask[rows]]
+                checkpoint()
+            base = None
+            if text.strip():
+                base = np.zeros(len(store), dtype=bool)
+                base[hits] = True
+            return rows, store.facets.counts(selection, date_range, base)
+        return query
+    
+    def matching_rows(self, rows: np.ndarray) -> np.ndarray:
+        """按当前搜索和分面条件筛选给定的存储索引"""
+        # 应用搜索过滤
+        rows = self.store.search(self.search_text.value or "", rows)
+        
+        # 应用分面过滤（位图按位与）
+        if (any(self.facet_filters.value.values()) or any(self.date_range.value)) and len(rows):
+            mask = self.store.facets.mask(self.facet_filters.value, self.date_range.value)
+            rows = rows[mask[rows]]
+        return rows
+    
+    def _update_facet_counts(self):
+        """按当前搜索和分面条件重新计算各分面取值的命中数"""
+        base = None
+        if (self.search_text.value or "").strip():
+            base = np.zeros(len(self.store), dtype=bool)
+            base[self.store.search(self.search_text.value)] = True
+        self.facet_counts = self.store.facets.counts(self.facet_filters.value, self.date_range.value, base)
+        self.facets_changed.emit()
+    
+    def _schedule_filter(self):
+        """过滤条件变化：在后台执行过滤，未完成的旧查询作废"""
+        self.query_executor.submit(self._filter_query())
+    
+    def _on_filter_results(self, generation: int, result):
+        rows, counts = result
+        self._set_filter_results(rows, counts)
+    
+    def _set_filter_results(self, rows: np.ndarray, counts: Dict[str, Dict[str, int]]):
+        self.filtered_rows = rows
+        
+        # 更新计数
+        self.filtered_count.value = len(rows)
+        
+        # 触发过滤变化事件
+        self.filter_changed.emit()
+        self.facet_counts = counts
+        self.facets_changed.emit()
+    
+    def facet_values(self, field: str) -> List[str]:
+        """分面字段当前出现的全部取值"""
+        return self.store.facets.values(field)
     
     def _apply_filter(self):
-        """应用过滤条件"""
+        """立即应用过滤条件（同步执行，作废后台查询）"""
         try:
-            all_experiments = list(self.experiments)
-            filtered = all_experiments
-            
-            # 应用搜索过滤
-            if self.search_text.value and self.search_text.value.strip():
-                search_term = self.search_text.value.strip().lower()
-                filtered = [exp for exp in filtered 
-                          if self._experiment_matches_search(exp, search_term)]
-            
-            # 应用核素过滤
-            if self.filter_nuclide.value and self.filter_nuclide.value != "全部":
-                filtered = [exp for exp in filtered 
-                          if exp.parameters.get("isotope") == self.filter_nuclide.value]
-            
-            # 更新计数
-            self.filtered_count.value = len(filtered)
+            rows, counts = self.query_executor.run_now(self._filter_query())
+            self._set_filter_results(rows, counts)
             
-            # 触发过滤变化事件
-            self.filter_changed.emit()
-            
-            return filtered
+            return [self.store.experiment(int(i)) for i in rows]
         except Exception as e:
             self.error_occurred.emit(f"应用过滤失败: {str(e)}")
-            return all_experiments
-    
-    def _experiment_matches_search(self, experiment: Experiment, search_term: str) -> bool:
-        """检查实验是否匹配搜索条件"""
-        if not search_term:
-            return True
-        
-        # 搜索实验名称、中心名称、核素等字段
-        searchable_fields = [
-            experiment.name.lower(),
-            experiment.center.lower(),
-            experiment.model_type.lower(),
-            str(experiment.parameters.get("isotope", "")).lower(),
-            str(experiment.parameters.get("device_model", "")).lower(),
-            str(experiment.parameters.get("remark", "")).lower()
-        ]
-        
-        return any(search_term in field for field in searchable_fields if field)
-    
-    def refresh_experiments(self):
-        """刷新实验列表"""
-        self.is_loading.value = True
-        try:
-            all_experiments = self.experiment_repository.get_all_experiments()
-            
-            # 更新列表
-            self.experiments.clear()
-            for exp in all_experiments:
-                self.experiments.append(exp)
+            return list(self.experiments)
+    
+    def refresh_experiments(self, reload: bool = True):
+        """
+        刷新实验列表
+        
+        Args:
+            reload: True 时重新扫描实验目录，False 时使用仓库缓存
+        """
+        # 加载状态和计数的变化合并为一次通知（同步加载时 is_loading 不会闪烁）
+        with batch_updates():
+            self.is_loading.value = True
+            try:
+                all_experiments = self.experiment_repository.get_all_experiments(reload=reload)
+                # 存储和列表保持相同顺序：列表索引即存储索引
+                self.store.load(all_experiments)
+                self.query_executor.cancel()
+                self.filtered_rows = self.matching_rows(self.store.all_rows())
             
-            # 更新计数
-            self.total_experiments.value = len(all_experiments)
-            self.filtered_count.value = len(all_experiments)
+                # 整体替换列表，只发出一次 list_reset
+                self.experiments.replace_all(all_experiments)
             
-            # 应用过滤
-            if self.search_text.value or self.filter_nuclide.value != "全部":
-                self._apply_filter()
+                # 更新计数
+                self.total_experiments.value = len(all_experiments)
+                self.filtered_count.value = len(self.filtered_rows)
+                self._update_facet_counts()
                 
-            # 发送状态消息
-            self.status_message.emit(f"已加载 {len(all_experiments)} 个实验", 2000)
+                # 发送状态消息
+                self.status_message.emit(f"已加载 {len(all_experiments)} 个实验", 2000)
             
-        except Exception as e:
-            self.error_occurred.emit(f"刷新实验列表失败: {str(e)}")
-        finally:
-            self.is_loading.value = False
+            except Exception as e:
+                self.error_occurred.emit(f"刷新实验列表失败: {str(e)}")
+            finally:
+                self.is_loading.value = False
+    
+    def add_experiments(self, experiments: List[Experiment]):
+        """
+        把实验加入列表（已在列表中的按ID更新），新实验只发出一次 items_inserted
+        
+        Args:
+            experiments: 已保存到仓库的实验
+        """
+        new = []
+        for exp in experiments:
+            if self.store.update(exp) is None:
+                new.append(exp)
+        if not new:
+            self._apply_filter()
+            return
+        start = self.store.extend(new)
+        rows = np.arange(start, start + len(new), dtype=np.int64)
+        self.filtered_rows = np.concatenate([self.filtered_rows, self.matching_rows(rows)])
+        self.experiments.extend(new)
+        
+        with batch_updates():
+            self.total_experiments.value = len(self.experiments)
+            self.filtered_count.value = len(self.filtered_rows)
+        self._update_facet_counts()
+    
+    def update_experiment(self, experiment: Experiment):
+        """
+        刷新列表中一个修改后的实验（不访问仓库，不重新过滤整个列表）
+        
+        只有过滤条件涉及的字段变化时才重新判断该行是否符合条件，分面计数只在影响计数
+        的字段变化时重新计算。
+        
+        Args:
+            experiment: 已保存到仓库的实验
+        """
+        index = self.store.locate(experiment)
+        if index is None:
+            return
+        _, changed = self.store.update_fields(experiment)
+        
+        position = int(np.searchsorted(self.filtered_rows, index))
+        visible = position < len(self.filtered_rows) and self.filtered_rows[position] == index
+        filter_fields = self._filter_fields()
+        if filter_fields.intersection(changed):
+            matches = len(self.matching_rows(np.array([index], dtype=np.int64))) > 0
+            if matches != visible:
+                # 过滤结果保持存储索引升序
+                if matches:
+                    self.filtered_rows = np.insert(self.filtered_rows, position, index)
+                else:
+                    self.filtered_rows = np.delete(self.filtered_rows, position)
+                visible = matches
+                self.filtered_count.value = len(self.filtered_rows)
+        if filter_fields.union(FACET_FIELDS).intersection(changed):
+            self._update_facet_counts()
+        self.experiment_changed.emit(index, bool(visible), changed)
+    
+    def _filter_fields(self) -> set:
+        """当前过滤条件涉及的列表字段"""
+        fields = set()
+        if (self.search_text.value or "").strip():
+            fields.update(SEARCH_FIELDS)
+        fields.update(field for field, values in self.facet_filters.value.items() if values)
+        if any(self.date_range.value):
+            fields.add("date")
+        return fields
     
     def get_filtered_experiments(self) -> List[Experiment]:
         """获取过滤后的实验列表"""
         return self._apply_filter()
     
-    def get_available_nuclides(self) -> List[str]:
-        """获取所有实验中使用的核素列表"""
-        nuclides = set()
-        for experiment in self.experiments:
-            isotope = experiment.parameters.get("isotope")
-            if isotope:
-                nuclides.add(isotope)
-        return ["全部"] + sorted(list(nuclides))
-    
     # 数据操作方法
     def _add_experiment(self):
         """添加新实验"""
@@ -146,25 +272,30 @@ class ExperimentListViewModel(QObject):
     def _confirm_delete_experiment(self, experiment: Experiment):
         """确认删除实验"""
         try:
-            self.experiment_repository.delete_experiment(experiment.id)
-            # 从列表中移除
-            for i, exp in enumerate(self.experiments):
-                if exp.id == experiment.id:
-                    self.experiments.remove(exp)
-                    break
-            
-            # 更新计数
-            self.total_experiments.value = len(self.experiments)
-            self._apply_filter()
-            
-            # 重置选中项
-            if self.selected_experiment.value and self.selected_experiment.value.id == experiment.id:
-                self.selected_experiment.value = None
-            
+            self.experiment_repository.delete(experiment)
+            self.remove_experiment(experiment)
             self.status_message.emit(f"已删除实验: {experiment.name}", 2000)
         except Exception as e:
             self.error_occurred.emit(f"删除实验失败: {str(e)}")
     
+    def remove_experiment(self, experiment: Experiment):
+        """从列表中移除一个已删除的实验（不访问仓库）"""
+        # 先更新存储和过滤结果，列表移除事件发出时行号已有效
+        index = self.store.remove(experiment)
+        if index is None:
+            return
+        self.filtered_rows = drop_rows(self.filtered_rows, [index])
+        # 列表索引与存储索引一致
+        self.experiments.remove_at(index)
+        
+        # 更新计数和选中项，合并通知
+        with batch_updates():
+            self.total_experiments.value = len(self.experiments)
+            self.filtered_count.value = len(self.filtered_rows)
+            if self.selected_experiment.value is experiment:
+                self.selected_experiment.value = None
+        self._update_facet_counts()
+    
     def _duplicate_experiment(self):
         """复制选中的实验"""
         if self.selected_experiment.value:
@@ -0,0 +1,234 @@
+# src/views/common/widgets/experiment_detail_panel.py
+
+import html
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QTabWidget, QTextEdit, QVBoxLayout, QWidget
+
+logger = logging.getLogger(__name__)
+
+# 选中行停留该时长（毫秒）后才渲染较重的分页，方向键连续切换时只渲染最后一个实验
+DETAIL_DEBOUNCE_MS = 200
+# 渲染结果缓存的条目数（每个实验的每个分页一条）
+DETAIL_CACHE_SIZE = 64
+# 活度时间序列表格的列（与活度标签页的 table_data 中 col_0..col_5 对应）
+ACTIVITY_TABLE_HEADERS = ("时间 (min)", "相对时刻", "计算活度", "单位", "备注", "状态")
+EMPTY_TEXT = "请选择一个实验查看详情"
+LOADING_TEXT = "正在加载..."
+
+
+def _text(value, default="") -> str:
+    if value is None or value == "":
+        value = default
+    return html.escape(str(value))
+
+
+def _table(headers, rows) -> str:
+    head = "".join(f"<th>{_text(header)}</th>" for header in headers)
+    body = "".join("<tr>" + "".join(f"<td>{_text(value)}</td>" for value in row) + "</tr>" for row in rows)
+    return f'<table border="1" cellspacing="0" cellpadding="3"><tr>{head}</tr>{body}</table>'
+
+
+def _settings(title: str, settings: dict) -> str:
+    """把一层或两层嵌套的设置字典渲染为参数表"""
+    rows = []
+    for key, value in settings.items():
+        if isinstance(value, dict):
+            rows.extend((f"{key}.{sub_key}", sub_value) for sub_key, sub_value in value.items())
+        else:
+            rows.append((key, value))
+    return f"<h4>{_text(title)}</h4>" + _table(("参数", "数值"), rows)
+
+
+def render_summary(experiment) -> str:
+    """概要：只读取实验的顶层字段和少量参数"""
+    parameters = experiment.parameters or {}
+    syringes = parameters.get("syringes") or []
+    return f"""<h3>{_text(experiment.name)}</h3>
+    <p><b>中心:</b> {_text(experiment.center)}</p>
+    <p><b>日期:</b> {_text(experiment.date)}</p>
+    <p><b>体模类型:</b> {_text(experiment.model_type)}</p>
+    <p><b>核素:</b> {_text(parameters.get('isotope'), 'N/A')}</p>
+    <p><b>设备型号:</b> {_text(parameters.get('device_model'), 'N/A')}</p>
+    <p><b>容器体积:</b> {_text(parameters.get('volume', 0))} L</p>
+    <p><b>目标活度:</b> {_text(parameters.get('target_activity', 0))} {_text(parameters.get('activity_unit'), 'MBq')}</p>
+    <p><b>注射器:</b> {len(syringes)} 支</p>
+    <p><b>创建时间:</b> {_text(experiment.created_at)}</p>
+    <p><b>备注:</b> {_text(parameters.get('remark'), '无')}</p>
+    """
+
+
+def render_activity(experiment) -> str:
+    """活度：各注射器的测量记录和活度时间序列表格"""
+    parameters = experiment.parameters or {}
+    unit = parameters.get("activity_unit", "mCi")
+    parts = []
+    for syringe in parameters.get("syringes") or []:
+        activities = syringe.get("activities") or {}
+        rows = [(label, record.get("value", ""), record.get("time", ""))
+                for label, record in activities.items() if isinstance(record, dict)]
+        parts.append(f"<h4>{_text(syringe.get('name'), '注射器')}</h4>"
+                     + _table(("测量项", f"活度 ({unit})", "测量时间"), rows)
+                     + f"<p><b>实际注射活度:</b> {_text(syringe.get('actual_activity', 0))} {_text(unit)}</p>")
+    if "actual_activity" in parameters:
+        parts.append(f"<p><b>总实际活度:</b> {_text(parameters.get('actual_activity'))} {_text(unit)}"
+                     f"（{_text(parameters.get('actual_activity_time'), '未记录时间')}）</p>")
+
+    preset = parameters.get("activity_preset_data") or {}
+    table_data = preset.get("table_data") or []
+    if table_data:
+        rows = [tuple(row.get(f"col_{i}", "") for i in range(len(ACTIVITY_TABLE_HEADERS))) for row in table_data]
+        parts.append(f"<h4>活度时间序列（{_text(preset.get('phantom_type'))}，扫描活度 "
+                     f"{_text(preset.get('scan_activity'))} {_text(preset.get('unit'))}）</h4>"
+                     + _table(ACTIVITY_TABLE_HEADERS, rows))
+    return "".join(parts) or "<p>暂无活度数据</p>"
+
+
+def render_analysis(experiment) -> str:
+    """分析：体模分析和序列重建的设置"""
+    parameters = experiment.parameters or {}
+    parts = []
+    if parameters.get("scan_time"):
+        parts.append(f"<p><b>扫描时间:</b> {_text(parameters.get('scan_time'))}</p>")
+    if parameters.get("phantom_analysis"):
+        parts.append(_settings("体模分析", parameters["phantom_analysis"]))
+    if parameters.get("sequence_rebuild"):
+        parts.append(_settings("序列重建", parameters["sequence_rebuild"]))
+    return "".join(parts) or "<p>暂无分析数据</p>"
+
+
+# 分页: (键, 标题, 渲染函数)，第一页同步渲染，其余分页在显示时去抖渲染
+SECTIONS: Tuple[Tuple[str, str, Callable], ...] = (
+    ("summary", "概要", render_summary),
+    ("activity", "活度", render_activity),
+    ("analysis", "分析", render_analysis),
+)
+
+
+class RenderCache:
+    """渲染结果的LRU缓存，键为 (实验对象, 分页)
+
+    条目保存实验对象本身，只有同一个对象才命中（复制的实验文件可能共用ID）；实验
+    修改后按实验ID使条目失效。
+    """
+
+    def __init__(self, max_entries: int = DETAIL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[object, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, experiment, section: str) -> Optional[str]:
+        key = (id(experiment), section)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] is not experiment:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, experiment, section: str, text: str):
+        key = (id(experiment), section)
+        self._entries[key] = (experiment, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, experiment_id: Optional[str] = None):
+        """使某个实验（None 表示全部）的条目失效"""
+        if experiment_id is None:
+            self._entries.clear()
+            return
+        for key in [key for key, (experiment, _) in self._entries.items() if experiment.id == experiment_id]:
+            del self._entries[key]
+
+
+class ExperimentDetailPanel(QWidget):
+    """实验详情面板
+
+    详情按分页显示。概要只读取顶层字段，选中实验时同步渲染；注射器、活度表格和
+    分析设置等较重的分页只在该页可见时渲染，并在选中停留 DETAIL_DEBOUNCE_MS 后才
+    执行，方向键快速浏览列表时不会逐行渲染。渲染结果进入 LRU 缓存，再次选中同一
+    实验时直接显示。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.experiment = None
+        self.cache = RenderCache()
+        # {分页: 该页当前显示的实验}，没有条目的分页需要重新渲染
+        self._shown: Dict[str, object] = {}
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.pages = QTabWidget()
+        self.views: Dict[str, QTextEdit] = {}
+        for key, title, _ in SECTIONS:
+            view = QTextEdit()
+            view.setReadOnly(True)
+            self.views[key] = view
+            self.pages.addTab(view, title)
+        layout.addWidget(self.pages)
+        self.pages.currentChanged.connect(lambda _: self._render_current())
+
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self._render_current)
+        self.show_experiment(None)
+
+    def show_experiment(self, experiment):
+        """
+        显示实验详情（None 表示清空）
+
+        概要立即显示；当前为其他分页且没有缓存时去抖渲染，其间该页显示“正在加载”，
+        同一实验重新显示（如修改后）时保留原内容直到重新渲染完成。
+        """
+        same = experiment is not None and self.experiment is not None and experiment.id == self.experiment.id
+        self.experiment = experiment
+        self.render_timer.stop()
+        self._shown.clear()
+        if experiment is None:
+            for view in self.views.values():
+                view.setText(EMPTY_TEXT)
+            return
+        self._render(SECTIONS[0][0])
+        current = self._current_section()
+        if current != SECTIONS[0][0]:
+            if self.cache.get(experiment, current) is not None:
+                self._render(current)
+                return
+            if not same:
+                self.views[current].setText(LOADING_TEXT)
+            self.render_timer.start(DETAIL_DEBOUNCE_MS)
+
+    def invalidate(self, experiment_id: Optional[str] = None):
+        """实验已修改（None 表示全部）：丢弃缓存的渲染结果，之后显示时重新渲染"""
+        self.cache.invalidate(experiment_id)
+
+    def _current_section(self) -> str:
+        return SECTIONS[self.pages.currentIndex()][0]
+
+    def _render_current(self):
+        if self.experiment is not None:
+            self._render(self._current_section())
+
+    def _render(self, section: str):
+        """渲染一个分页（已显示当前实验时跳过）"""
+        experiment = self.experiment
+        if self._shown.get(section) is experiment:
+            return
+        text = self.cache.get(experiment, section)
+        if text is None:
+            renderer = next(renderer for key, _, renderer in SECTIONS if key == section)
+            try:
+                text = renderer(experiment)
+                self.cache.put(experiment, section, text)
+            except Exception as e:
+                logger.error(f"渲染实验详情失败: {e}")
+                text = f"<p>无法显示: {_text(e)}</p>"
+        self.views[section].setHtml(text)
+        self._shown[section] = experiment
@@ -0,0 +1,234 @@
+# src/views/common/widgets/experiment_table_model.py
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from ....models.listing.store import ExperimentListStore, SortSpec
+
+# data() 返回实验对象的角色（Qt.UserRole 返回实验ID）
+EXPERIMENT_ROLE = Qt.UserRole + 1
+# 排序状态下一次插入超过该行数时改为整体重置，而不是逐行定位插入
+INSERT_RESET_THRESHOLD = 64
+# 多列排序最多保留的列数（最近点击的列为主排序键，之前的列依次作为次排序键）
+MAX_SORT_COLUMNS = 3
+
+
+class ExperimentTableModel(QAbstractTableModel):
+    """实验列表的虚拟化表格模型
+
+    只保存当前显示的存储索引数组 rows，单元格内容在 Qt 请求时从 ExperimentListStore
+    的列中读取，不为每个单元格创建对象。排序使用存储预先计算的整数排序键和按排序方式
+    缓存的顺序：点击表头时该列成为主排序键，之前排序的列保留为次排序键。过滤结果
+    通过 set_rows 交给模型，并保持当前的排序方式。
+
+    实验ID经存储映射为存储索引，再经惰性建立的位置数组映射为显示行号，单个实验
+    修改时只对该行发出 dataChanged，排序列的值变化时才移动这一行。
+    """
+
+    def __init__(self, store: ExperimentListStore, columns: Sequence[Tuple[str, str]], parent=None):
+        """
+        Args:
+            store: 列式存储
+            columns: [(字段, 表头)]，字段见 LIST_FIELDS
+        """
+        super().__init__(parent)
+        self.store = store
+        self.fields = [field for field, _ in columns]
+        self.headers = [header for _, header in columns]
+        self._positions: Optional[np.ndarray] = None
+        self.rows = store.all_rows()
+        # ((字段, 是否降序), ...)，为空表示不排序
+        self.sort_columns: SortSpec = ()
+
+    @property
+    def rows(self) -> np.ndarray:
+        """当前显示的存储索引（按显示顺序）"""
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows: np.ndarray):
+        self._rows = rows
+        self._positions = None
+
+    def row_of_index(self, store_index: int) -> Optional[int]:
+        """存储索引对应的显示行号，未显示时返回 None"""
+        if self._positions is None or len(self._positions) != len(self.store):
+            # 存储索引 -> 显示行号（-1 表示未显示），显示的行变化后重新建立
+            positions = np.full(len(self.store), -1, dtype=np.int64)
+            positions[self._rows] = np.arange(len(self._rows), dtype=np.int64)
+            self._positions = positions
+        if not 0 <= store_index < len(self._positions):
+            return None
+        row = int(self._positions[store_index])
+        return row if row >= 0 else None
+
+    def row_of(self, experiment_id: str) -> Optional[int]:
+        """实验ID对应的显示行号，不存在或未显示时返回 None"""
+        store_index = self.store.index_of(experiment_id)
+        return None if store_index is None else self.row_of_index(store_index)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.fields)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.rows):
+            return None
+        store_index = int(self.rows[index.row()])
+        if store_index >= len(self.store):
+            return None
+        if role == Qt.DisplayRole or role == Qt.ToolTipRole:
+            return self.store.value(store_index, self.fields[index.column()])
+        if role == Qt.UserRole:
+            return self.store.ids[store_index]
+        if role == EXPERIMENT_ROLE:
+            return self.store.experiment(store_index)
+        return None
+
+    def _sorted(self, rows: np.ndarray) -> np.ndarray:
+        return self.store.sort_rows(rows, self.sort_columns)
+
+    def sort_spec(self) -> SortSpec:
+        """当前排序方式 ((字段, 是否降序), ...)，第一项为主排序键，为空表示不排序"""
+        return self.sort_columns
+
+    def set_rows(self, rows: np.ndarray, sorted_by: Optional[SortSpec] = None):
+        """
+        显示给定的存储索引（如过滤结果），按当前排序方式排列
+
+        Args:
+            rows: 存储索引数组
+            sorted_by: rows 已按该排序方式排好（如后台查询的结果），与当前方式一致时不再排序
+        """
+        self.beginResetModel()
+        if sorted_by is not None and sorted_by == self.sort_spec():
+            self.rows = np.asarray(rows, dtype=np.int64)
+        else:
+            self.rows = self._sorted(rows)
+        self.endResetModel()
+
+    def set_store(self, store: ExperimentListStore):
+        """切换到另一个存储并显示其全部实验"""
+        self.store = store
+        self.reset()
+
+    def reset(self):
+        """显示存储中的全部实验"""
+        self.set_rows(self.store.all_rows())
+
+    def insert_store_rows(self, new_rows: np.ndarray):
+        """
+        显示新加入存储的行（已按过滤条件筛选），只发出区间插入信号
+
+        未排序时追加到末尾；排序时按排序键定位插入，保持当前顺序。
+        """
+        new_rows = np.asarray(new_rows, dtype=np.int64)
+        if not len(new_rows):
+            return
+        if not self.sort_columns:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_rows) - 1)
+            self.rows = np.concatenate([self.rows, new_rows])
+            self.endInsertRows()
+            return
+        if len(new_rows) > INSERT_RESET_THRESHOLD:
+            self.set_rows(np.concatenate([self.rows, new_rows]))
+            return
+        _, rank = self.store.sort_order(self.sort_columns)
+        for row in self._sorted(new_rows):
+            position = int(np.searchsorted(rank[self.rows], rank[row]))
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.rows = np.insert(self.rows, position, row)
+            self.endInsertRows()
+
+    def update_store_row(self, store_index: int, visible: bool = True, changed: Sequence[str] = ()):
+        """
+        存储中的一行已更新后调用，只通知这一行
+
+        Args:
+            store_index: 更新的存储索引
+            visible: 更新后是否仍符合过滤条件，不符合时从表格中移除，新符合时插入
+            changed: 值有变化的列表字段，包含排序列时按新的排序位置移动该行
+        """
+        row = self.row_of_index(store_index)
+        if row is None:
+            if visible:
+                self.insert_store_rows(np.array([store_index], dtype=np.int64))
+            return
+        if not visible:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self.rows = np.delete(self.rows, row)
+            self.endRemoveRows()
+            return
+        if self.sort_columns and any(field in changed for field, _ in self.sort_columns):
+            _, rank = self.store.sort_order(self.sort_columns)
+            others = np.delete(self.rows, row)
+            target = int(np.searchsorted(rank[others], rank[store_index]))
+            if target != row:
+                # beginMoveRows 的目标位置按移动前的行号计，向下移动时要加一
+                self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), target + 1 if target > row else target)
+                self.rows = np.insert(others, target, store_index)
+                self.endMoveRows()
+                row = target
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.fields) - 1))
+
+    def remove_store_rows(self, removed: np.ndarray):
+        """
+        存储删除行之后调用：移除对应的显示行（按连续区间发出删除信号）并重新编号
+
+        Args:
+            removed: 被删除的存储索引（删除前的编号）
+        """
+        removed = np.unique(np.asarray(removed, dtype=np.int64))
+        mask = np.isin(self.rows, removed)
+        positions = np.flatnonzero(mask)
+        # 先把保留的行换成删除后的编号（待删除的行暂时指向0），保证删除过程中取值有效
+        self.rows = np.where(mask, 0, self.rows - np.searchsorted(removed, self.rows))
+        # 从后往前按连续区间删除，前面的行号不受影响
+        runs = np.split(positions, np.flatnonzero(np.diff(positions) != 1) + 1) if len(positions) else []
+        for run in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), int(run[0]), int(run[-1]))
+            self.rows = np.delete(self.rows, run)
+            self.endRemoveRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """按列排序（该列成为主排序键，之前的排序列作为次排序键），保持选中行和当前行不变"""
+        if not 0 <= column < len(self.fields):
+            return
+        field = self.fields[column]
+        previous = tuple(item for item in self.sort_columns if item[0] != field)
+        self.sort_columns = ((field, order == Qt.DescendingOrder),) + previous[:MAX_SORT_COLUMNS - 1]
+        self.layoutAboutToBeChanged.emit()
+        old_rows = self.rows
+        self.rows = self._sorted(old_rows)
+        # 旧行号 -> 新行号
+        position = np.empty(len(self.store), dtype=np.int64)
+        position[self.rows] = np.arange(len(self.rows))
+        persistent = self.persistentIndexList()
+        moved = [self.index(int(position[old_rows[index.row()]]), index.column()) for index in persistent]
+        self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+
+    def experiment_at(self, row: int):
+        """视图行对应的实验对象"""
+        return self.store.experiment(int(self.rows[row]))
+
+    def experiment_id_at(self, row: int) -> str:
+        return self.store.ids[int(self.rows[row])]
+
+    def experiments_for_rows(self, rows: Sequence[int]) -> List:
+        """多个视图行对应的实验（去重，按行号排序）"""
+        return [self.experiment_at(row) for row in sorted(set(rows))]
+
+    def visible_experiments(self) -> List:
+        """当前显示的全部实验（按显示顺序）"""
+        return [self.store.experiment(int(i)) for i in self.rows]
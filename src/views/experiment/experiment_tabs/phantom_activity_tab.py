@@ -41,8 +41,8 @@ class PhantomActivityTab(QWidget):
     def _save_experiment(self):
         """Save experiment data."""
         try:
-            if hasattr(self.parent_widget, 'main_window') and hasattr(self.parent_widget.main_window, 'data_manager'):
-                self.parent_widget.main_window.data_manager.save_experiment(self.experiment)
+            if hasattr(self.parent_widget, 'main_window') and hasattr(self.parent_widget.main_window, 'viewmodel'):
+                self.parent_widget.main_window.viewmodel.save_experiment(self.experiment)
         except Exception as e:
             logger.error(f"保存实验失败: {e}")
 
@@ -18,9 +18,15 @@ from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+from matplotlib.ticker import FuncFormatter
 import csv
 import pydicom
 import matplotlib
+from ....models.analysis.image_io import load_image_volume, series_source
+from ....models.analysis.phantom_analyzer import PhantomAnalyzer
+from ....models.analysis.render_cache import VolumeRenderCache
+from ....models.analysis.results_cache import AnalysisResultsCache
 matplotlib.use('Qt5Agg')
 plt.style.use('default')
 
@@ -86,12 +92,77 @@ class DicomAnalysisWorker(QThread):
             self.error_occurred.emit(str(e))
 
 
+class PhantomAnalysisWorker(QThread):
+    """模体分析工作线程，ROI掩膜由分析器缓存复用，结果按类别读写磁盘缓存"""
+    analysis_completed = pyqtSignal(dict)
+    error_occurred = pyqtSignal(str)
+    cache_status = pyqtSignal(int, int)  # (命中类别数, 重新计算类别数)
+    cache_missed = pyqtSignal()  # restore_only 时结果缓存未全部命中
+
+    def __init__(self, analyzer, volume, spacing, params, results_cache=None, image_file="",
+                 restore_only=False):
+        """restore_only 为True时只按已记录的文件哈希查询结果缓存，不读取图像、不计算"""
+        super().__init__()
+        self.analyzer = analyzer
+        self.volume = volume
+        self.spacing = spacing
+        self.params = params
+        self.results_cache = results_cache
+        self.image_file = image_file
+        self.restore_only = restore_only
+
+    def run(self):
+        try:
+            source, cached, missing = None, {}, None
+            if self.results_cache is not None and self.image_file:
+                try:
+                    series_uid, files = series_source(self.image_file)
+                    source = self.results_cache.source_fingerprint(series_uid, files,
+                                                                   memo_only=self.restore_only)
+                    if source is not None:
+                        cached, missing = self.results_cache.lookup(source, self.params)
+                except Exception as e:
+                    logger.warning(f"查询分析结果缓存失败: {e}")
+                    source, cached, missing = None, {}, None
+
+            if missing == [] and cached:
+                self.cache_status.emit(len(cached), 0)
+                self.analysis_completed.emit(cached)
+                return
+            if self.restore_only:
+                self.cache_missed.emit()
+                return
+
+            if self.volume is None:
+                raise ValueError("图像尚未加载")
+            fresh = self.analyzer.analyze(self.volume, self.params, self.spacing,
+                                          categories=missing, cached=cached)
+            if source is not None:
+                self.results_cache.store(source, self.params, fresh)
+
+            results = dict(cached)
+            results.update(fresh)
+            self.cache_status.emit(len(cached), len(fresh))
+            self.analysis_completed.emit(results)
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+
 class MatplotlibWidget(QWidget):
-    """matplotlib绘图组件"""
+    """matplotlib绘图组件
+
+    图像和直方图的 artist 只创建一次，后续刷新通过 set_data 更新数据，
+    避免每次 figure.clear() 后重新布局和绘制坐标轴、色标。
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
         self.figure = Figure(figsize=(8, 6), dpi=100)
         self.canvas = FigureCanvas(self.figure)
+        self.ax = None
+        self._mode = None
+        self._image = None
+        self._colorbar = None
+        self._histogram = None
         
         layout = QVBoxLayout()
         layout.addWidget(self.canvas)
@@ -99,24 +170,72 @@ class MatplotlibWidget(QWidget):
         
     def clear(self):
         self.figure.clear()
+        self.ax = None
+        self._mode = None
+        self._image = None
+        self._colorbar = None
+        self._histogram = None
         self.canvas.draw()
-        
-    def plot_image(self, image_data, title="DICOM图像"):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        im = ax.imshow(image_data, cmap='gray')
+
+    def _ensure_axes(self, mode):
+        """切换绘图模式时才重建坐标轴"""
+        if self._mode != mode or self.ax is None:
+            self.clear()
+            self.ax = self.figure.add_subplot(111)
+            self._mode = mode
+        return self.ax
+        
+    def plot_image(self, image_data, title="DICOM图像", extent=None, aspect=1.0,
+                   value_range=None, value_formatter=None):
+        """
+        显示二维图像，已有图像时只更新数据
+
+        Args:
+            image_data: 二维数组（通常为渲染缓存中的 uint8 图像）
+            extent: imshow 坐标范围
+            aspect: 显示纵横比
+            value_range: 灰度范围 (vmin, vmax)，默认取数据范围
+            value_formatter: 色标刻度格式化函数 (value, pos) -> str
+        """
+        ax = self._ensure_axes("image")
+        if value_range is None:
+            value_range = (float(np.min(image_data)), float(np.max(image_data)))
+
+        if self._image is None:
+            self._image = ax.imshow(image_data, cmap='gray', extent=extent, aspect=aspect,
+                                    vmin=value_range[0], vmax=value_range[1], interpolation='nearest')
+            self._colorbar = self.figure.colorbar(self._image, ax=ax)
+        else:
+            self._image.set_data(image_data)
+            self._image.set_clim(*value_range)
+            if extent is not None:
+                self._image.set_extent(extent)
+                ax.set_xlim(extent[0], extent[1])
+                ax.set_ylim(extent[2], extent[3])
+            ax.set_aspect(aspect)
+
+        if value_formatter is not None:
+            self._colorbar.formatter = FuncFormatter(value_formatter)
+            self._colorbar.update_ticks()
         ax.set_title(title)
-        self.figure.colorbar(im, ax=ax)
-        self.canvas.draw()
+        self.canvas.draw_idle()
         
-    def plot_histogram(self, image_data, title="像素值分布"):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.hist(image_data.flatten(), bins=100, alpha=0.7)
+    def plot_histogram(self, image_data=None, title="像素值分布", counts=None, edges=None):
+        """显示直方图，可直接传入预先计算好的 counts/edges"""
+        if counts is None or edges is None:
+            counts, edges = np.histogram(np.asarray(image_data).ravel(), bins=100)
+
+        ax = self._ensure_axes("histogram")
+        if self._histogram is None:
+            self._histogram = ax.stairs(counts, edges, fill=True, alpha=0.7)
+            ax.set_xlabel('像素值')
+            ax.set_ylabel('频次')
+        else:
+            self._histogram.set_data(counts, edges)
+        ax.set_xlim(edges[0], edges[-1])
+        ax.set_ylim(0, max(float(np.max(counts)), 1.0) * 1.05)
         ax.set_title(title)
-        ax.set_xlabel('像素值')
-        ax.set_ylabel('频次')
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
 
 class PhantomAnalysisTab(QWidget):
@@ -127,10 +246,18 @@ class PhantomAnalysisTab(QWidget):
         self.dicom_files = []
         self.analysis_results = {}
         self.current_image_data = None
+        self.current_spacing = (1.0, 1.0, 1.0)
+        self.render_cache = None
+        self.roi_patches = {}
+        self.analyzer = PhantomAnalyzer()
+        self.results_cache = AnalysisResultsCache()
+        self.analysis_worker = None
+        self._recompute_pending = False
+        self._analysis_pending = False
         
         # 分析参数
         self.analysis_params = self.experiment.parameters.get("phantom_analysis", {
-            "analysis_type": "Uniform",  # Uniform, NEMA-IQ
+            "analysis_type": self._default_analysis_type(),  # Uniform, NEMA-IQ, Hoffman
             "roi_settings": {
                 "center_x": 128,
                 "center_y": 128,
@@ -145,6 +272,10 @@ class PhantomAnalysisTab(QWidget):
                 "threshold": 0.1,
                 "include_edges": False
             },
+            "hoffman_settings": {
+                "registration_levels": [4, 2],
+                "expected_ratio": 4.0
+            },
             "export_settings": {
                 "include_images": True,
                 "include_statistics": True,
@@ -152,9 +283,23 @@ class PhantomAnalysisTab(QWidget):
             }
         })
         
+        # ROI调整后延迟触发后台重新统计
+        self.roi_recompute_timer = QTimer(self)
+        self.roi_recompute_timer.setSingleShot(True)
+        self.roi_recompute_timer.timeout.connect(self.recompute_roi_statistics)
+        
         self.init_ui()
         self.load_parameters()
 
+    def _default_analysis_type(self):
+        """根据模体类型选择默认分析类型"""
+        model_type = self.experiment.model_type or ""
+        if "霍夫曼" in model_type or "Hoffman" in model_type:
+            return "Hoffman"
+        if "NEMA" in model_type:
+            return "NEMA-IQ"
+        return "Uniform"
+
     def init_ui(self):
         """初始化用户界面"""
         main_layout = QVBoxLayout(self)
@@ -188,7 +333,7 @@ class PhantomAnalysisTab(QWidget):
         type_layout = QHBoxLayout()
         
         self.analysis_type_combo = QComboBox()
-        self.analysis_type_combo.addItems(["Uniform", "NEMA-IQ"])
+        self.analysis_type_combo.addItems(["Uniform", "NEMA-IQ", "Hoffman"])
         self.analysis_type_combo.currentTextChanged.connect(self.on_analysis_type_changed)
         type_layout.addWidget(QLabel("分析类型:"))
         type_layout.addWidget(self.analysis_type_combo)
@@ -207,6 +352,7 @@ class PhantomAnalysisTab(QWidget):
         self.center_x_spin.setRange(0, 512)
         self.center_x_spin.setValue(128)
         self.center_x_spin.valueChanged.connect(self.save_parameters)
+        self.center_x_spin.valueChanged.connect(self.schedule_roi_recompute)
         roi_layout.addWidget(self.center_x_spin, 0, 1)
         
         roi_layout.addWidget(QLabel("中心Y坐标:"), 0, 2)
@@ -214,6 +360,7 @@ class PhantomAnalysisTab(QWidget):
         self.center_y_spin.setRange(0, 512)
         self.center_y_spin.setValue(128)
         self.center_y_spin.valueChanged.connect(self.save_parameters)
+        self.center_y_spin.valueChanged.connect(self.schedule_roi_recompute)
         roi_layout.addWidget(self.center_y_spin, 0, 3)
         
         # 半径设置
@@ -222,6 +369,7 @@ class PhantomAnalysisTab(QWidget):
         self.roi_radius_spin.setRange(10, 200)
         self.roi_radius_spin.setValue(50)
         self.roi_radius_spin.valueChanged.connect(self.save_parameters)
+        self.roi_radius_spin.valueChanged.connect(self.schedule_roi_recompute)
         roi_layout.addWidget(self.roi_radius_spin, 1, 1)
         
         roi_layout.addWidget(QLabel("背景ROI半径:"), 1, 2)
@@ -229,6 +377,7 @@ class PhantomAnalysisTab(QWidget):
         self.bg_radius_spin.setRange(20, 300)
         self.bg_radius_spin.setValue(80)
         self.bg_radius_spin.valueChanged.connect(self.save_parameters)
+        self.bg_radius_spin.valueChanged.connect(self.schedule_roi_recompute)
         roi_layout.addWidget(self.bg_radius_spin, 1, 3)
         
         roi_group.setLayout(roi_layout)
@@ -407,6 +556,20 @@ class PhantomAnalysisTab(QWidget):
         
         image_control_layout.addStretch()
         
+        image_control_layout.addWidget(QLabel("视图:"))
+        self.view_combo = QComboBox()
+        for label, view in (("轴位", "axial"), ("冠状位", "coronal"), ("矢状位", "sagittal"),
+                            ("轴位MIP", "mip_axial"), ("冠状位MIP", "mip_coronal"), ("矢状位MIP", "mip_sagittal")):
+            self.view_combo.addItem(label, view)
+        self.view_combo.currentIndexChanged.connect(self.on_view_changed)
+        image_control_layout.addWidget(self.view_combo)
+        
+        image_control_layout.addWidget(QLabel("切片:"))
+        self.slice_spin = QSpinBox()
+        self.slice_spin.setRange(0, 0)
+        self.slice_spin.valueChanged.connect(self.update_image_display)
+        image_control_layout.addWidget(self.slice_spin)
+        
         self.refresh_image_btn = QPushButton("🔄 刷新显示")
         self.refresh_image_btn.clicked.connect(self.update_image_display)
         image_control_layout.addWidget(self.refresh_image_btn)
@@ -416,23 +579,18 @@ class PhantomAnalysisTab(QWidget):
         
         # 图像显示区域
         image_group = QGroupBox("📸 图像")
-        image_layout = QVBoxLayout()
-        
-        # 这里应该是图像显示控件，简化为标签
-        self.image_display = QLabel("图像将在此处显示")
-        self.image_display.setMinimumHeight(400)
-        self.image_display.setStyleSheet("""
-            QLabel {
-                border: 2px dashed #ccc;
-                background-color: #f9f9f9;
-                color: #999;
-                font-size: 16px;
-                text-align: center;
-            }
-        """)
-        self.image_display.setAlignment(Qt.AlignCenter)
-        image_layout.addWidget(self.image_display)
+        image_layout = QHBoxLayout()
         
+        image_splitter = QSplitter(Qt.Horizontal)
+        self.image_canvas = MatplotlibWidget()
+        self.image_canvas.setMinimumHeight(400)
+        image_splitter.addWidget(self.image_canvas)
+        
+        self.histogram_canvas = MatplotlibWidget()
+        image_splitter.addWidget(self.histogram_canvas)
+        image_splitter.setSizes([600, 300])
+        
+        image_layout.addWidget(image_splitter)
         image_group.setLayout(image_layout)
         layout.addWidget(image_group)
         
@@ -447,7 +605,7 @@ class PhantomAnalysisTab(QWidget):
             self.hot_sphere_ratio_spin.setEnabled(True)
             self.show_spheres_cb.setEnabled(True)
         else:
-            # Uniform模式下禁用热球相关设置
+            # Uniform/Hoffman模式下禁用热球相关设置
             self.hot_sphere_ratio_spin.setEnabled(False)
             self.show_spheres_cb.setEnabled(False)
         
@@ -492,17 +650,25 @@ class PhantomAnalysisTab(QWidget):
         try:
             self.add_analysis_log("开始加载图像...")
             
-            # 这里应该实现真实的图像加载逻辑
-            # 暂时模拟加载过程
-            self.image_display.setText(f"已加载图像: {os.path.basename(image_file)}\\n\\n"
-                                     f"图像尺寸: 256 x 256\\n"
-                                     f"像素类型: float32\\n"
-                                     f"数值范围: 0.0 - 1.0")
+            volume, spacing, metadata = load_image_volume(image_file)
+            self.current_image_data = volume
+            self.current_spacing = spacing
+            
+            nz, ny, nx = volume.shape
+            # 一次性生成显示缓存，之后切换切片/视图都不再处理全分辨率数据
+            self.render_cache = VolumeRenderCache(volume, spacing)
+            self.roi_patches = {}
+            self.image_canvas.clear()
+            self.on_view_changed()
+            counts, edges = self.render_cache.histogram
+            self.histogram_canvas.plot_histogram(counts=counts, edges=edges)
             
-            self.add_analysis_log("图像加载完成", "SUCCESS")
+            self.add_analysis_log(f"图像加载完成 ({metadata.get('format', '')}, {nx}x{ny}x{nz})", "SUCCESS")
             QMessageBox.information(self, "成功", "图像加载完成！")
             
         except Exception as e:
+            self.current_image_data = None
+            self.render_cache = None
             self.add_analysis_log(f"图像加载失败: {str(e)}", "ERROR")
             QMessageBox.warning(self, "错误", f"加载图像失败: {str(e)}")
 
@@ -513,114 +679,139 @@ class PhantomAnalysisTab(QWidget):
             QMessageBox.warning(self, "警告", "请先选择并加载图像文件")
             return
         
-        try:
-            self.add_analysis_log("开始模体分析...")
-            
-            # 显示进度条
-            self.analysis_progress.setVisible(True)
-            self.analysis_progress.setValue(0)
-            
-            # 模拟分析过程
-            self.simulate_analysis()
-            
-        except Exception as e:
-            self.add_analysis_log(f"分析失败: {str(e)}", "ERROR")
-            QMessageBox.warning(self, "错误", f"分析失败: {str(e)}")
-
-    def simulate_analysis(self):
-        """模拟分析过程"""
-        self.add_analysis_log("初始化分析参数...")
-        
-        # 模拟分析步骤
-        self.analysis_timer = QTimer()
-        self.analysis_step = 0
-        self.analysis_steps = [
-            "读取图像数据",
-            "定义ROI区域", 
-            "计算均匀性指标",
-            "分析恢复系数",
-            "计算对比度",
-            "计算噪声水平",
-            "生成分析报告"
-        ]
-        
-        self.analysis_timer.timeout.connect(self.update_analysis_progress)
-        self.analysis_timer.start(500)  # 每500ms一步
-
-    def update_analysis_progress(self):
-        """更新分析进度"""
-        if self.analysis_step < len(self.analysis_steps):
-            step_name = self.analysis_steps[self.analysis_step]
-            self.add_analysis_log(f"正在{step_name}...")
-            
-            progress = int((self.analysis_step + 1) / len(self.analysis_steps) * 100)
-            self.analysis_progress.setValue(progress)
-            
-            self.analysis_step += 1
-        else:
-            self.analysis_timer.stop()
-            self.analysis_finished()
+        # 显示进度条（分析时间不可预估，使用忙碌样式）
+        self.analysis_progress.setVisible(True)
+        self.analysis_progress.setRange(0, 0)
+        self.start_analysis_btn.setEnabled(False)
+        
+        # ROI统计或缓存查询仍在后台进行时排队，等其结束后再开始分析
+        if self.analysis_worker is not None and self.analysis_worker.isRunning():
+            self._analysis_pending = True
+            self.add_analysis_log("等待当前计算结束后开始分析")
+            return
+        
+        if self.current_image_data is None:
+            # 数据和参数均未变化时直接使用缓存结果，无需加载图像
+            self.restore_cached_results(analyze_on_miss=True)
+            return
+        
+        self.add_analysis_log("开始模体分析...")
+        self._run_analysis_worker(self.analysis_finished)
+
+    def _load_and_analyze(self):
+        """结果缓存未全部命中：加载图像后开始分析"""
+        self.load_image()
+        if self.current_image_data is None:
+            self.analysis_progress.setVisible(False)
+            self.analysis_progress.setRange(0, 100)
+            self.start_analysis_btn.setEnabled(True)
+            return
+        self.add_analysis_log("开始模体分析...")
+        self._run_analysis_worker(self.analysis_finished)
+
+    def _run_analysis_worker(self, on_completed, restore_only=False, on_missed=None):
+        """在后台线程中执行分析；restore_only 时只查询结果缓存，未全部命中则调用 on_missed"""
+        self.analysis_worker = PhantomAnalysisWorker(
+            self.analyzer, self.current_image_data, self.current_spacing,
+            json.loads(json.dumps(self.analysis_params)),
+            self.results_cache, self.image_file_edit.text().strip(), restore_only
+        )
+        self.analysis_worker.analysis_completed.connect(on_completed)
+        if not restore_only:
+            self.analysis_worker.cache_status.connect(self._on_cache_status)
+        elif on_missed is not None:
+            self.analysis_worker.cache_missed.connect(on_missed)
+        self.analysis_worker.error_occurred.connect(self.analysis_failed)
+        self.analysis_worker.finished.connect(self._on_analysis_worker_finished)
+        self.analysis_worker.start()
+
+    def _on_cache_status(self, hits, computed):
+        """记录结果缓存命中情况"""
+        if computed == 0:
+            self.add_analysis_log(f"结果缓存命中，复用 {hits} 类结果")
+        elif hits:
+            self.add_analysis_log(f"结果缓存部分命中：复用 {hits} 类，重新计算 {computed} 类")
+
+    def restore_cached_results(self, analyze_on_miss=False):
+        """
+        不加载图像，在后台线程中直接从结果缓存恢复分析结果
+
+        只使用已记录的文件哈希（文件大小和修改时间未变），不会读取图像内容；
+        DICOM序列的文件头也在工作线程中读取。analyze_on_miss 为True时，缓存未全部
+        命中则加载图像并开始分析。
+        """
+        image_file = self.image_file_edit.text().strip()
+        if not image_file or not os.path.exists(image_file):
+            if analyze_on_miss:
+                self._load_and_analyze()
+            return
+        self._run_analysis_worker(self._on_results_restored, restore_only=True,
+                                  on_missed=self._load_and_analyze if analyze_on_miss else None)
+
+    def _on_results_restored(self, results):
+        """从结果缓存恢复了全部结果"""
+        self.analysis_results = results
+        self.update_results_display()
+        self.add_analysis_log("已从结果缓存恢复上次分析结果", "SUCCESS")
+        self.analysis_progress.setVisible(False)
+        self.analysis_progress.setRange(0, 100)
+        self.start_analysis_btn.setEnabled(True)
+
+    def _on_analysis_worker_finished(self):
+        """工作线程结束后，执行排队的分析；若ROI在计算期间又被调整则再算一次"""
+        if self.sender() is not self.analysis_worker:
+            return
+        self.analysis_worker = None
+        if self._analysis_pending:
+            # 完整分析会重新统计ROI，无需再单独重算
+            self._analysis_pending = False
+            self._recompute_pending = False
+            self.start_analysis()
+        elif self._recompute_pending:
+            self._recompute_pending = False
+            self.recompute_roi_statistics()
+
+    def schedule_roi_recompute(self):
+        """ROI参数变化后延迟触发重新统计，拖动数值框时只计算最后一次"""
+        # ROI叠加只改标注属性，立即刷新
+        self.update_image_display()
+        if self.current_image_data is not None and self.analysis_results:
+            self.roi_recompute_timer.start(200)
+
+    def recompute_roi_statistics(self):
+        """后台重新计算ROI统计（掩膜来自缓存，只需重做归约）"""
+        if self.current_image_data is None:
+            return
+        if self.analysis_worker is not None and self.analysis_worker.isRunning():
+            self._recompute_pending = True
+            return
+        self._run_analysis_worker(self._on_roi_statistics_updated)
 
-    def analysis_finished(self):
+    def _on_roi_statistics_updated(self, results):
+        """ROI调整后的统计结果"""
+        self.analysis_results = results
+        self.update_results_display()
+
+    def analysis_failed(self, error_message):
+        """分析失败"""
+        self.analysis_progress.setVisible(False)
+        self.analysis_progress.setRange(0, 100)
+        self.start_analysis_btn.setEnabled(True)
+        self.add_analysis_log(f"分析失败: {error_message}", "ERROR")
+
+    def analysis_finished(self, results):
         """分析完成"""
+        self.analysis_results = results
         self.add_analysis_log("分析完成！", "SUCCESS")
         self.analysis_progress.setVisible(False)
-        
-        # 生成模拟结果
-        self.generate_mock_results()
+        self.analysis_progress.setRange(0, 100)
+        self.start_analysis_btn.setEnabled(True)
         
         # 更新结果显示
         self.update_results_display()
         
         QMessageBox.information(self, "分析完成", "模体分析已成功完成！")
 
-    def generate_mock_results(self):
-        """生成模拟分析结果"""
-        analysis_type = self.analysis_type_combo.currentText()
-        
-        if analysis_type == "Uniform":
-            self.analysis_results = {
-                "uniformity": {
-                    "integral_uniformity": 5.8,
-                    "differential_uniformity": 3.2,
-                    "mean_value": 125.6,
-                    "std_deviation": 7.3
-                },
-                "noise": {
-                    "noise_level": 2.1,
-                    "snr": 42.3
-                },
-                "statistics": {
-                    "roi_area": 7854,  # pixels
-                    "background_area": 19635,
-                    "analysis_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-            }
-        else:  # NEMA-IQ
-            self.analysis_results = {
-                "recovery_coefficients": {
-                    "sphere_10mm": 0.85,
-                    "sphere_13mm": 0.91,
-                    "sphere_17mm": 0.94,
-                    "sphere_22mm": 0.97,
-                    "sphere_28mm": 0.98,
-                    "sphere_37mm": 0.99
-                },
-                "contrast": {
-                    "hot_sphere_contrast": 3.8,
-                    "cold_sphere_contrast": -0.7
-                },
-                "noise": {
-                    "background_noise": 4.2,
-                    "uniformity": 6.1
-                },
-                "statistics": {
-                    "total_spheres": 6,
-                    "hot_sphere_ratio": self.hot_sphere_ratio_spin.value(),
-                    "analysis_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-            }
-
     def update_results_display(self):
         """更新结果显示"""
         self.results_table.setRowCount(0)
@@ -659,9 +850,25 @@ class PhantomAnalysisTab(QWidget):
             "cold_sphere_contrast": "ratio",
             "background_noise": "%",
             "uniformity": "%",
+            "mean_value": "Bq/mL",
+            "std_deviation": "Bq/mL",
             "roi_area": "pixels",
             "background_area": "pixels",
-            "hot_sphere_ratio": "ratio"
+            "hot_sphere_ratio": "ratio",
+            "rotation_x": "deg",
+            "rotation_y": "deg",
+            "rotation_z": "deg",
+            "translation_x": "mm",
+            "translation_y": "mm",
+            "translation_z": "mm",
+            "registration_time": "s",
+            "grey_white_ratio": "ratio",
+            "expected_ratio": "ratio",
+            "contrast_recovery": "%",
+            "grey_cov": "%",
+            "white_cov": "%",
+            "grey_voxels": "voxels",
+            "white_voxels": "voxels"
         }
         return unit_map.get(param, "")
 
@@ -704,10 +911,73 @@ class PhantomAnalysisTab(QWidget):
             self.add_analysis_log(f"导出失败: {str(e)}", "ERROR")
             QMessageBox.warning(self, "导出失败", f"保存分析结果失败: {str(e)}")
 
-    def update_image_display(self):
-        """更新图像显示"""
-        # 这里应该实现图像显示更新逻辑
-        self.add_analysis_log("图像显示已更新")
+    def on_view_changed(self, *args):
+        """切换视图时更新切片范围并刷新显示"""
+        if self.render_cache is None:
+            return
+        view = self.view_combo.currentData()
+        count = self.render_cache.slice_count(view)
+        self.slice_spin.blockSignals(True)
+        self.slice_spin.setRange(0, count - 1)
+        self.slice_spin.setValue(count // 2)
+        self.slice_spin.setEnabled(count > 1)
+        self.slice_spin.blockSignals(False)
+        self.update_image_display()
+
+    def update_image_display(self, *args):
+        """从显示缓存取出当前视图并刷新图像和ROI叠加"""
+        if self.render_cache is None:
+            return
+        cache = self.render_cache
+        view = self.view_combo.currentData()
+        index = self.slice_spin.value()
+        title = self.view_combo.currentText()
+        if cache.slice_count(view) > 1:
+            title += f" {index + 1}/{cache.slice_count(view)}"
+        
+        self.image_canvas.plot_image(cache.get(view, index), title=title,
+                                     extent=cache.extent(view), aspect=cache.aspect(view),
+                                     value_range=(0, 255),
+                                     value_formatter=lambda v, pos: f"{cache.to_value(v):.3g}")
+        self.update_roi_overlay(view in ("axial", "mip_axial"))
+
+    def _roi_patch(self, name, color, linestyle="-"):
+        """获取可复用的ROI圆形标注"""
+        patch = self.roi_patches.get(name)
+        if patch is None:
+            patch = Circle((0, 0), 1, fill=False, edgecolor=color, linestyle=linestyle, linewidth=1.2)
+            self.image_canvas.ax.add_patch(patch)
+            self.roi_patches[name] = patch
+        return patch
+
+    def update_roi_overlay(self, visible=True):
+        """更新ROI叠加层，只修改已有标注的位置和半径"""
+        if self.image_canvas.ax is None:
+            return
+        dx = self.current_spacing[2]
+        center = (self.center_x_spin.value(), self.center_y_spin.value())
+        
+        roi = self._roi_patch("roi", "#e53935")
+        roi.center = center
+        roi.set_radius(self.roi_radius_spin.value() / dx)
+        roi.set_visible(visible and self.show_roi_cb.isChecked())
+        
+        background = self._roi_patch("background", "#1e88e5", "--")
+        background.center = center
+        background.set_radius(self.bg_radius_spin.value() / dx)
+        background.set_visible(visible and self.show_background_cb.isChecked())
+        
+        show_spheres = (visible and self.show_spheres_cb.isChecked()
+                        and self.analysis_type_combo.currentText() == "NEMA-IQ")
+        params = {"sphere_settings": self.analysis_params.get("sphere_settings", {})}
+        spheres = self.analyzer.sphere_positions(params, center, self.current_spacing[1:])
+        for i, (x, y, diameter) in enumerate(spheres):
+            patch = self._roi_patch(f"sphere_{i}", "#fdd835")
+            patch.center = (x, y)
+            patch.set_radius(diameter / 2.0 / dx)
+            patch.set_visible(show_spheres)
+        
+        self.image_canvas.canvas.draw_idle()
 
     def add_analysis_log(self, message, level="INFO"):
         """添加分析日志"""
@@ -769,8 +1039,15 @@ class PhantomAnalysisTab(QWidget):
                     "include_edges": self.include_edges_cb.isChecked()
                 },
                 "sphere_settings": {
+                    "sphere_positions": self.analysis_params.get("sphere_settings", {}).get("sphere_positions", []),
                     "hot_sphere_ratio": self.hot_sphere_ratio_spin.value()
-                }
+                },
+                "hoffman_settings": self.analysis_params.get("hoffman_settings", {
+                    "registration_levels": [4, 2],
+                    "expected_ratio": 4.0
+                }),
+                "image_file": self.image_file_edit.text().strip(),
+                "output_dir": self.output_dir_edit.text().strip()
             })
             
             self.experiment.parameters["phantom_analysis"] = self.analysis_params
@@ -787,6 +1064,8 @@ class PhantomAnalysisTab(QWidget):
         try:
             params = self.analysis_params
             
+            self.image_file_edit.setText(params.get("image_file", ""))
+            self.output_dir_edit.setText(params.get("output_dir", ""))
             self.analysis_type_combo.setCurrentText(params.get("analysis_type", "Uniform"))
             
             roi_settings = params.get("roi_settings", {})
@@ -809,4 +1088,7 @@ class PhantomAnalysisTab(QWidget):
             logger.error(f"加载分析参数失败: {e}")
             
         # 初始化日志
-        self.add_analysis_log("模体分析模块已初始化") 
\ No newline at end of file
+        self.add_analysis_log("模体分析模块已初始化")
+        
+        # 重新打开实验时恢复上次的分析结果
+        self.restore_cached_results() 
\ No newline at end of file
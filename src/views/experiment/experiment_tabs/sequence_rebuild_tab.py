@@ -4,23 +4,165 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QGroupBox,
     QLabel, QLineEdit, QPushButton, QTextEdit, QFileDialog, QMessageBox,
     QProgressBar, QSpinBox, QDoubleSpinBox, QComboBox, QCheckBox,
-    QTableWidget, QTableWidgetItem, QHeaderView, QSplitter
+    QTableView, QHeaderView, QSplitter
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont, QTextCursor
 import os
 import sys
 import subprocess
 import logging
+import threading
+import datetime
+from ....models.reconstruction.pipeline import RebuildPipeline, RebuildCancelled
+from ....models.reconstruction.filters import FILTER_TYPES
+from ....models.reconstruction.file_scanner import default_scanner
 
 logger = logging.getLogger(__name__)
 
 
+class RebuildWorker(QThread):
+    """序列重建工作线程，实际计算由 RebuildPipeline 完成"""
+    progress_updated = pyqtSignal(int)
+    log_message = pyqtSignal(str, str)
+    rebuild_completed = pyqtSignal(dict)
+    frame_completed = pyqtSignal(str, int, int)
+    checkpoint_saved = pyqtSignal(dict)
+    rebuild_cancelled = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, params, device_model="", isotope="", series_info=None):
+        super().__init__()
+        self.params = params
+        self.device_model = device_model
+        self.isotope = isotope
+        self.series_info = series_info
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        pipeline = RebuildPipeline(self.params,
+                                   progress=self.progress_updated.emit,
+                                   log=self.log_message.emit,
+                                   cancel_event=self.cancel_event,
+                                   device_model=self.device_model,
+                                   frame_done=self.frame_completed.emit,
+                                   isotope=self.isotope,
+                                   series_info=self.series_info,
+                                   on_checkpoint=self.checkpoint_saved.emit)
+        try:
+            self.rebuild_completed.emit(pipeline.run())
+        except RebuildCancelled:
+            self.rebuild_cancelled.emit()
+        except Exception as e:
+            logger.exception("序列重建失败")
+            self.error_occurred.emit(str(e))
+
+
+class FileScanWorker(QThread):
+    """后台扫描输入目录，分批发出 (文件名, 类型, 大小, 修改时间) 条目"""
+    batch_ready = pyqtSignal(list)
+    scan_finished = pyqtSignal(int)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, path, force=False):
+        super().__init__()
+        self.path = path
+        self.force = force
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            entries = default_scanner.scan(self.path, on_batch=self.batch_ready.emit,
+                                           cancel=self.cancel_event.is_set, force=self.force)
+            if entries is not None:
+                self.scan_finished.emit(len(entries))
+        except Exception as e:
+            logger.exception("扫描输入目录失败")
+            self.error_occurred.emit(str(e))
+
+
+class InputFileModel(QAbstractTableModel):
+    """输入文件列表模型：按批追加行，显示文本在绘制时才格式化，状态按文件名单元格更新"""
+
+    HEADERS = ["文件名", "类型", "大小", "修改时间", "状态"]
+    STATUS_COLUMN = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._row_of = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if column == 2:
+            return f"{row[2] / (1024 * 1024):.1f} MB"
+        if column == 3:
+            return datetime.datetime.fromtimestamp(row[3]).strftime('%Y-%m-%d %H:%M:%S')
+        return row[column]
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._row_of = {}
+        self.endResetModel()
+
+    def append_entries(self, entries):
+        """追加一批扫描条目，状态初始为待处理"""
+        if not entries:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        for offset, (name, kind, size, mtime) in enumerate(entries):
+            self._rows.append([name, kind, size, mtime, "待处理"])
+            self._row_of[name] = first + offset
+        self.endInsertRows()
+
+    def set_status(self, name, status):
+        row = self._row_of.get(name)
+        if row is None:
+            return
+        self._rows[row][self.STATUS_COLUMN] = status
+        index = self.index(row, self.STATUS_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def status(self, name):
+        row = self._row_of.get(name)
+        return self._rows[row][self.STATUS_COLUMN] if row is not None else None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self._rows.sort(key=lambda r: r[column], reverse=(order == Qt.DescendingOrder))
+        self._row_of = {r[0]: i for i, r in enumerate(self._rows)}
+        self.layoutChanged.emit()
+
+
 class SequenceRebuildTab(QWidget):
     def __init__(self, experiment, parent=None):
         super().__init__(parent)
         self.experiment = experiment
         self.parent_window = parent
+        self.rebuild_worker = None
+        self.scan_worker = None
         
         # 序列重建参数
         self.rebuild_params = self.experiment.parameters.get("sequence_rebuild", {
@@ -33,6 +175,7 @@ class SequenceRebuildTab(QWidget):
             "scatter_correction": False,
             "random_correction": True,
             "smoothing_filter": "Gaussian",
+            "filter_fwhm": 4.0,  # mm
             "iterations": 4,
             "subsets": 16
         })
@@ -116,7 +259,7 @@ class SequenceRebuildTab(QWidget):
         correction_group = QGroupBox("🔧 校正选项")
         correction_layout = QGridLayout()
         
-        self.decay_correction_cb = QCheckBox("衰减校正")
+        self.decay_correction_cb = QCheckBox("衰变校正")
         self.decay_correction_cb.setChecked(True)
         self.decay_correction_cb.toggled.connect(self.save_parameters)
         correction_layout.addWidget(self.decay_correction_cb, 0, 0)
@@ -134,6 +277,18 @@ class SequenceRebuildTab(QWidget):
         self.random_correction_cb.toggled.connect(self.save_parameters)
         correction_layout.addWidget(self.random_correction_cb, 1, 1)
         
+        # 衰减校正使用的 μ-map（.npy，单位 1/mm，尺寸与重建图像一致）
+        correction_layout.addWidget(QLabel("μ-map:"), 2, 0)
+        mumap_layout = QHBoxLayout()
+        self.mumap_edit = QLineEdit()
+        self.mumap_edit.setPlaceholderText("衰减校正用 μ-map 文件 (.npy)")
+        self.mumap_edit.editingFinished.connect(self.save_parameters)
+        mumap_layout.addWidget(self.mumap_edit)
+        self.browse_mumap_btn = QPushButton("浏览")
+        self.browse_mumap_btn.clicked.connect(self.browse_mumap_file)
+        mumap_layout.addWidget(self.browse_mumap_btn)
+        correction_layout.addLayout(mumap_layout, 2, 1)
+        
         correction_group.setLayout(correction_layout)
         left_layout.addWidget(correction_group)
         
@@ -144,10 +299,19 @@ class SequenceRebuildTab(QWidget):
         # 平滑滤波器
         recon_layout.addWidget(QLabel("平滑滤波器:"), 0, 0)
         self.smoothing_combo = QComboBox()
-        self.smoothing_combo.addItems(["Gaussian", "Butterworth", "Hamming", "Hann"])
+        self.smoothing_combo.addItems(list(FILTER_TYPES))
         self.smoothing_combo.currentTextChanged.connect(self.save_parameters)
         recon_layout.addWidget(self.smoothing_combo, 0, 1)
         
+        # 滤波宽度
+        recon_layout.addWidget(QLabel("FWHM(mm):"), 0, 2)
+        self.filter_fwhm_spin = QDoubleSpinBox()
+        self.filter_fwhm_spin.setRange(0.0, 50.0)
+        self.filter_fwhm_spin.setSingleStep(0.5)
+        self.filter_fwhm_spin.setValue(4.0)
+        self.filter_fwhm_spin.valueChanged.connect(self.save_parameters)
+        recon_layout.addWidget(self.filter_fwhm_spin, 0, 3)
+        
         # 迭代次数
         recon_layout.addWidget(QLabel("迭代次数:"), 1, 0)
         self.iterations_spin = QSpinBox()
@@ -236,16 +400,19 @@ class SequenceRebuildTab(QWidget):
         files_group = QGroupBox("📁 文件列表")
         files_layout = QVBoxLayout()
         
-        self.files_table = QTableWidget()
-        self.files_table.setColumnCount(4)
-        self.files_table.setHorizontalHeaderLabels(["文件名", "大小", "修改时间", "状态"])
+        self.files_model = InputFileModel(self)
+        self.files_table = QTableView()
+        self.files_table.setModel(self.files_model)
+        self.files_table.setSortingEnabled(True)
+        self.files_table.setSelectionBehavior(QTableView.SelectRows)
+        self.files_table.verticalHeader().setVisible(False)
         
-        # 设置表格列宽
+        # 设置表格列宽（数万行时不按内容计算列宽）
         header = self.files_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)
-        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
+        for column, width in ((1, 70), (2, 80), (3, 140), (4, 110)):
+            header.setSectionResizeMode(column, QHeaderView.Interactive)
+            header.resizeSection(column, width)
         
         files_layout.addWidget(self.files_table)
         
@@ -253,7 +420,7 @@ class SequenceRebuildTab(QWidget):
         files_control_layout = QHBoxLayout()
         
         self.refresh_files_btn = QPushButton("🔄 刷新文件列表")
-        self.refresh_files_btn.clicked.connect(self.refresh_file_list)
+        self.refresh_files_btn.clicked.connect(lambda: self.refresh_file_list(force=True))
         files_control_layout.addWidget(self.refresh_files_btn)
         
         self.open_output_btn = QPushButton("📂 打开输出目录")
@@ -318,44 +485,50 @@ class SequenceRebuildTab(QWidget):
             self.save_parameters()
             self.add_log(f"设置输出目录: {dir_path}")
 
-    def refresh_file_list(self):
-        """刷新文件列表"""
+    def browse_mumap_file(self):
+        """选择 μ-map 文件"""
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "选择 μ-map 文件", self.mumap_edit.text(), "NumPy 文件 (*.npy)"
+        )
+        if filename:
+            self.mumap_edit.setText(filename)
+            self.save_parameters()
+
+    def refresh_file_list(self, force=False):
+        """在后台线程扫描输入目录，结果分批加入文件列表
+
+        Args:
+            force: 忽略目录缓存重新扫描（刷新按钮）
+        """
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+            self.scan_worker = None
+        self.files_model.clear()
+
         input_dir = self.input_dir_edit.text().strip()
-        if not input_dir or not os.path.exists(input_dir):
-            self.files_table.setRowCount(0)
+        if not input_dir or not os.path.isdir(input_dir):
             return
-        
-        try:
-            files = []
-            for filename in os.listdir(input_dir):
-                file_path = os.path.join(input_dir, filename)
-                if os.path.isfile(file_path):
-                    stat = os.stat(file_path)
-                    files.append({
-                        'name': filename,
-                        'size': f"{stat.st_size / (1024*1024):.1f} MB",
-                        'mtime': os.path.getmtime(file_path),
-                        'status': '待处理'
-                    })
-            
-            # 按修改时间排序
-            files.sort(key=lambda x: x['mtime'], reverse=True)
-            
-            self.files_table.setRowCount(len(files))
-            for row, file_info in enumerate(files):
-                self.files_table.setItem(row, 0, QTableWidgetItem(file_info['name']))
-                self.files_table.setItem(row, 1, QTableWidgetItem(file_info['size']))
-                
-                # 格式化时间
-                import datetime
-                mtime_str = datetime.datetime.fromtimestamp(file_info['mtime']).strftime('%Y-%m-%d %H:%M:%S')
-                self.files_table.setItem(row, 2, QTableWidgetItem(mtime_str))
-                self.files_table.setItem(row, 3, QTableWidgetItem(file_info['status']))
-            
-            self.add_log(f"刷新文件列表完成，找到 {len(files)} 个文件")
-            
-        except Exception as e:
-            self.add_log(f"刷新文件列表失败: {str(e)}", "ERROR")
+
+        worker = FileScanWorker(input_dir, force=force)
+        # 只接收当前扫描的结果，被替换的扫描线程发出的批次直接丢弃
+        worker.batch_ready.connect(lambda entries, w=worker: self._on_scan_batch(w, entries))
+        worker.scan_finished.connect(lambda count, w=worker: self._on_scan_finished(w, count))
+        worker.error_occurred.connect(lambda message: self.add_log(f"刷新文件列表失败: {message}", "ERROR"))
+        worker.finished.connect(worker.deleteLater)
+        self.scan_worker = worker
+        worker.start()
+
+    def _on_scan_batch(self, worker, entries):
+        if worker is self.scan_worker:
+            self.files_model.append_entries(entries)
+
+    def _on_scan_finished(self, worker, count):
+        if worker is not self.scan_worker:
+            return
+        self.scan_worker = None
+        # 按修改时间倒序
+        self.files_table.sortByColumn(3, Qt.DescendingOrder)
+        self.add_log(f"刷新文件列表完成，找到 {count} 个文件")
 
     def validate_settings(self):
         """验证设置"""
@@ -403,7 +576,6 @@ class SequenceRebuildTab(QWidget):
         if not self.validate_settings():
             return
         
-        # 模拟重建过程
         self.add_log("开始序列重建...", "INFO")
         self.add_log(f"输入目录: {self.input_dir_edit.text()}")
         self.add_log(f"输出目录: {self.output_dir_edit.text()}")
@@ -418,43 +590,69 @@ class SequenceRebuildTab(QWidget):
         self.start_rebuild_btn.setEnabled(False)
         self.stop_rebuild_btn.setEnabled(True)
         
-        # 模拟重建过程（这里应该调用实际的重建算法）
-        self.simulate_rebuild()
-
-    def simulate_rebuild(self):
-        """模拟重建过程"""
-        self.rebuild_timer = QTimer()
-        self.rebuild_progress = 0
-        self.rebuild_timer.timeout.connect(self.update_rebuild_progress)
-        self.rebuild_timer.start(200)  # 每200ms更新一次
-
-    def update_rebuild_progress(self):
-        """更新重建进度"""
-        self.rebuild_progress += 2
-        self.progress_bar.setValue(self.rebuild_progress)
-        
-        if self.rebuild_progress >= 100:
-            self.rebuild_timer.stop()
-            self.rebuild_finished()
-        else:
-            # 模拟重建日志
-            if self.rebuild_progress % 10 == 0:
-                frame_num = self.rebuild_progress // 10
-                self.add_log(f"正在重建第 {frame_num} 帧...")
+        self.save_parameters()
+        series_info = {
+            "patient_name": self.experiment.name,
+            "patient_id": self.experiment.experiment_id,
+            "study_description": f"{self.experiment.center} {self.experiment.model_type}"
+        }
+        self.rebuild_worker = RebuildWorker(dict(self.rebuild_params),
+                                            self.experiment.parameters.get("device_model", ""),
+                                            self.experiment.parameters.get("isotope", ""),
+                                            series_info)
+        self.rebuild_worker.progress_updated.connect(self.progress_bar.setValue)
+        self.rebuild_worker.log_message.connect(self.add_log)
+        self.rebuild_worker.rebuild_completed.connect(self.rebuild_finished)
+        self.rebuild_worker.frame_completed.connect(self.update_frame_status)
+        self.rebuild_worker.checkpoint_saved.connect(self.save_progress)
+        self.rebuild_worker.rebuild_cancelled.connect(self.rebuild_cancelled)
+        self.rebuild_worker.error_occurred.connect(self.rebuild_failed)
+        self.rebuild_worker.finished.connect(self._on_rebuild_worker_finished)
+        self.rebuild_worker.start()
 
-    def rebuild_finished(self):
-        """重建完成"""
-        self.add_log("序列重建完成！", "SUCCESS")
+    def _reset_rebuild_controls(self):
         self.progress_bar.setVisible(False)
         self.start_rebuild_btn.setEnabled(True)
         self.stop_rebuild_btn.setEnabled(False)
+
+    def _on_rebuild_worker_finished(self):
+        self.rebuild_worker = None
+
+    def rebuild_finished(self, summary):
+        """重建完成"""
+        self.add_log(f"序列重建完成！共 {summary.get('total_frames', 0)} 帧，"
+                     f"耗时 {summary.get('elapsed', 0.0):.1f}秒", "SUCCESS")
+        self._reset_rebuild_controls()
         
         # 更新文件列表状态
-        for row in range(self.files_table.rowCount()):
-            self.files_table.setItem(row, 3, QTableWidgetItem("已处理"))
+        for path in summary.get("inputs", []):
+            self.files_model.set_status(os.path.basename(path), "已处理")
         
         QMessageBox.information(self, "重建完成", "序列重建已成功完成！")
 
+    def update_frame_status(self, path, done, total):
+        """帧重建进度写入文件列表的状态列"""
+        status = "已处理" if done >= total else f"重建中 {done}/{total}帧"
+        self.files_model.set_status(os.path.basename(path), status)
+
+    def save_progress(self, progress):
+        """重建进度写回实验参数，下次打开时可提示继续"""
+        self.rebuild_params["progress"] = progress
+        self.experiment.parameters["sequence_rebuild"] = self.rebuild_params
+        if hasattr(self.parent_window, '_save_experiment'):
+            self.parent_window._save_experiment()
+
+    def rebuild_cancelled(self):
+        """重建已取消"""
+        self.add_log("重建过程已停止，再次开始重建将从最后完成的帧继续", "WARNING")
+        self._reset_rebuild_controls()
+
+    def rebuild_failed(self, error_message):
+        """重建失败"""
+        self.add_log(f"序列重建失败: {error_message}", "ERROR")
+        self._reset_rebuild_controls()
+        QMessageBox.warning(self, "重建失败", f"序列重建失败: {error_message}")
+
     def stop_rebuild(self):
         """停止重建"""
         reply = QMessageBox.question(
@@ -464,13 +662,13 @@ class SequenceRebuildTab(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            if hasattr(self, 'rebuild_timer'):
-                self.rebuild_timer.stop()
-            
-            self.add_log("重建过程已停止", "WARNING")
-            self.progress_bar.setVisible(False)
-            self.start_rebuild_btn.setEnabled(True)
-            self.stop_rebuild_btn.setEnabled(False)
+            if self.rebuild_worker is not None and self.rebuild_worker.isRunning():
+                # 工作线程在下一个检查点退出，之后发出 rebuild_cancelled
+                self.rebuild_worker.cancel()
+                self.stop_rebuild_btn.setEnabled(False)
+                self.add_log("正在停止重建...", "WARNING")
+            else:
+                self.rebuild_cancelled()
 
     def open_output_directory(self):
         """打开输出目录"""
@@ -495,7 +693,6 @@ class SequenceRebuildTab(QWidget):
 
     def add_log(self, message, level="INFO"):
         """添加日志"""
-        import datetime
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         
         if level == "ERROR":
@@ -550,7 +747,9 @@ class SequenceRebuildTab(QWidget):
                 "attenuation_correction": self.attenuation_correction_cb.isChecked(),
                 "scatter_correction": self.scatter_correction_cb.isChecked(),
                 "random_correction": self.random_correction_cb.isChecked(),
+                "mumap_path": self.mumap_edit.text().strip(),
                 "smoothing_filter": self.smoothing_combo.currentText(),
+                "filter_fwhm": self.filter_fwhm_spin.value(),
                 "iterations": self.iterations_spin.value(),
                 "subsets": self.subsets_spin.value()
             })
@@ -578,11 +777,18 @@ class SequenceRebuildTab(QWidget):
             self.attenuation_correction_cb.setChecked(params.get("attenuation_correction", False))
             self.scatter_correction_cb.setChecked(params.get("scatter_correction", False))
             self.random_correction_cb.setChecked(params.get("random_correction", True))
+            self.mumap_edit.setText(params.get("mumap_path", ""))
             
             self.smoothing_combo.setCurrentText(params.get("smoothing_filter", "Gaussian"))
+            self.filter_fwhm_spin.setValue(params.get("filter_fwhm", 4.0))
             self.iterations_spin.setValue(params.get("iterations", 4))
             self.subsets_spin.setValue(params.get("subsets", 16))
             
+            progress = params.get("progress") or {}
+            if progress.get("status") in ("interrupted", "failed", "running"):
+                self.add_log(f"上次重建未完成（已完成 {progress.get('completed_frames', 0)}/"
+                             f"{progress.get('total_frames', 0)} 帧），开始重建将从检查点继续", "WARNING")
+            
             # 如果有输入目录，刷新文件列表
             if params.get("input_dir"):
                 self.refresh_file_list()
@@ -244,11 +244,11 @@ class ExperimentWindow(QWidget):
     def _save_experiment(self):
         """保存实验数据到数据库"""
         try:
-            # 获取父窗口的数据管理器
-            if self.main_window and hasattr(self.main_window, "data_manager"):
-                self.main_window.data_manager.save_experiment(self.experiment)
-                # 发出更新信号
-                self.experiment_updated.emit(self.experiment)
+            # 通过主窗口共享的ViewModel保存（同时更新仓库缓存和实验列表）
+            if self.main_window and hasattr(self.main_window, "viewmodel"):
+                if self.main_window.viewmodel.save_experiment(self.experiment):
+                    # 发出更新信号
+                    self.experiment_updated.emit(self.experiment)
         except Exception as e:
             logger.error(f"保存实验失败: {e}")
 
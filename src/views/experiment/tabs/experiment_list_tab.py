@@ -1,18 +1,27 @@
 # src/views/experiment/tabs/experiment_list_tab.py
 
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                             QTableWidgetItem, QLineEdit, QComboBox, QPushButton, 
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+                             QLineEdit, QComboBox, QPushButton, QCheckBox, QDateEdit,
                              QLabel, QHeaderView, QAbstractItemView, QMenu,
-                             QMessageBox, QSplitter, QTextEdit, QFrame)
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
+                             QMessageBox, QSplitter, QFrame)
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QDate
 from PyQt5.QtGui import QFont, QIcon
 from typing import TYPE_CHECKING, List
+import numpy as np
 from ...dialogs.add_experiment_dialog import AddExperimentDialog
+from ...common.widgets.experiment_detail_panel import ExperimentDetailPanel
+from ...common.widgets.experiment_table_model import ExperimentTableModel
+from ....core.app_context import AppContext
+from ....core.bindings import batch_updates
 from ....models.entities.experiment import Experiment
+from ....models.listing.store import ExperimentListStore
 
 if TYPE_CHECKING:
     from ....viewmodels.tabs.experiment_list_viewmodel import ExperimentListViewModel
 
+# 分面筛选下拉框：(store 字段, 标签)
+FACETS = (("isotope", "核素"), ("center", "中心"), ("device_model", "设备"), ("model_type", "体模类型"))
+
 class ExperimentListTab(QWidget):
     """实验列表标签页"""
     
@@ -42,6 +51,9 @@ class ExperimentListTab(QWidget):
         toolbar_layout = self._create_toolbar()
         layout.addLayout(toolbar_layout)
         
+        # 分面筛选栏
+        layout.addLayout(self._create_filter_bar())
+        
         # 主要内容区域
         splitter = QSplitter(Qt.Horizontal)
         
@@ -74,14 +86,6 @@ class ExperimentListTab(QWidget):
         self.search_edit.setMaximumWidth(300)
         layout.addWidget(self.search_edit)
         
-        # 核素过滤
-        filter_label = QLabel("核素:")
-        layout.addWidget(filter_label)
-        
-        self.filter_combo = QComboBox()
-        self.filter_combo.setMinimumWidth(120)
-        layout.addWidget(self.filter_combo)
-        
         layout.addStretch()
         
         # 操作按钮
@@ -105,13 +109,45 @@ class ExperimentListTab(QWidget):
         
         return layout
     
+    def _create_filter_bar(self) -> QHBoxLayout:
+        """创建分面筛选栏：每个分面一个下拉框（取值后显示命中数），以及日期范围"""
+        layout = QHBoxLayout()
+        
+        self.facet_combos = {}
+        for field, label in FACETS:
+            layout.addWidget(QLabel(f"{label}:"))
+            combo = QComboBox()
+            combo.setMinimumWidth(120)
+            combo.addItem("全部", None)
+            layout.addWidget(combo)
+            self.facet_combos[field] = combo
+        
+        self.date_filter_check = QCheckBox("日期:")
+        layout.addWidget(self.date_filter_check)
+        self.date_from_edit = QDateEdit()
+        self.date_to_edit = QDateEdit()
+        for edit in (self.date_from_edit, self.date_to_edit):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.setDate(QDate.currentDate())
+            edit.setEnabled(False)
+        layout.addWidget(self.date_from_edit)
+        layout.addWidget(QLabel("至"))
+        layout.addWidget(self.date_to_edit)
+        
+        self.clear_filter_button = QPushButton("清除筛选")
+        layout.addWidget(self.clear_filter_button)
+        
+        layout.addStretch()
+        return layout
+    
     def _create_list_widget(self) -> QWidget:
         """创建列表区域"""
         widget = QWidget()
         layout = QVBoxLayout(widget)
         
         # 实验表格
-        self.experiment_table = QTableWidget()
+        self.experiment_table = QTableView()
         layout.addWidget(self.experiment_table)
         
         return widget
@@ -134,11 +170,9 @@ class ExperimentListTab(QWidget):
         line.setFrameShadow(QFrame.Sunken)
         layout.addWidget(line)
         
-        # 详情文本
-        self.detail_text = QTextEdit()
-        self.detail_text.setReadOnly(True)
-        self.detail_text.setText("请选择一个实验查看详情")
-        layout.addWidget(self.detail_text)
+        # 详情分页（概要同步显示，其余分页可见时去抖渲染）
+        self.detail_panel = ExperimentDetailPanel()
+        layout.addWidget(self.detail_panel)
         
         return widget
     
@@ -158,10 +192,12 @@ class ExperimentListTab(QWidget):
     
     def _setup_table(self):
         """设置表格"""
-        # 设置列
-        headers = ["实验名称", "中心", "日期", "体模类型", "核素", "设备型号", "创建时间"]
-        self.experiment_table.setColumnCount(len(headers))
-        self.experiment_table.setHorizontalHeaderLabels(headers)
+        # 设置列（绑定ViewModel后切换到其存储）
+        columns = [("name", "实验名称"), ("center", "中心"), ("date", "日期"), ("model_type", "体模类型"),
+                   ("isotope", "核素"), ("device_model", "设备型号"), ("created_at", "创建时间")]
+        self.table_model = ExperimentTableModel(ExperimentListStore(), columns, self)
+        self.experiment_table.setModel(self.table_model)
+        self.experiment_table.setSortingEnabled(True)
         
         # 表格属性
         self.experiment_table.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -171,7 +207,7 @@ class ExperimentListTab(QWidget):
         # 列宽自适应
         header = self.experiment_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)  # 实验名称列自适应
-        for i in range(1, len(headers)):
+        for i in range(1, len(columns)):
             header.setSectionResizeMode(i, QHeaderView.ResizeToContents)
         
         # 右键菜单
@@ -182,11 +218,16 @@ class ExperimentListTab(QWidget):
         """连接信号"""
         # 搜索和过滤
         self.search_edit.textChanged.connect(self._on_search_changed)
-        self.filter_combo.currentTextChanged.connect(self._on_filter_changed)
+        for field, combo in self.facet_combos.items():
+            combo.currentIndexChanged.connect(lambda _, field=field: self._on_facet_changed(field))
+        self.date_filter_check.toggled.connect(self._on_date_filter_toggled)
+        self.date_from_edit.dateChanged.connect(self._on_date_range_changed)
+        self.date_to_edit.dateChanged.connect(self._on_date_range_changed)
+        self.clear_filter_button.clicked.connect(self._on_clear_filters)
         
         # 表格选择
-        self.experiment_table.itemSelectionChanged.connect(self._on_selection_changed)
-        self.experiment_table.itemDoubleClicked.connect(self._on_item_double_clicked)
+        self.experiment_table.selectionModel().selectionChanged.connect(self._on_selection_changed)
+        self.experiment_table.doubleClicked.connect(self._on_item_double_clicked)
         
         # 按钮操作
         self.add_button.clicked.connect(self._on_add_experiment)
@@ -205,61 +246,57 @@ class ExperimentListTab(QWidget):
         if not self.viewmodel:
             return
         
+        # 表格直接读取ViewModel的列式存储
+        self.table_model.set_store(self.viewmodel.store)
+        self.viewmodel.filter_changed.connect(self._populate_table)
+        self.viewmodel.facets_changed.connect(self._load_filter_options)
+        
         # 绑定数据变化
-        self.viewmodel.experiments.item_added.connect(self._on_experiment_added)
-        self.viewmodel.experiments.item_removed.connect(self._on_experiment_removed)
+        self.viewmodel.experiments.items_inserted.connect(self._on_experiments_inserted)
+        self.viewmodel.experiments.items_removed.connect(self._on_experiments_removed)
+        self.viewmodel.experiments.list_reset.connect(self._on_experiments_reset)
         self.viewmodel.experiments.list_cleared.connect(self._on_experiments_cleared)
+        self.viewmodel.experiment_changed.connect(self._on_experiment_changed)
         
         # 绑定状态变化
         self.viewmodel.is_loading.bind_to(self._on_loading_changed)
         self.viewmodel.total_experiments.bind_to(self._update_count_display)
         self.viewmodel.filtered_count.bind_to(self._update_count_display)
         
-        # 加载核素过滤选项
+        # 加载分面过滤选项
         self._load_filter_options()
     
     def _load_experiments(self):
         """加载实验列表"""
         if self.viewmodel:
-            self.viewmodel.refresh_experiments()
+            # ViewModel 已从仓库加载，这里只用仓库缓存重建列表，不重新扫描目录
+            self.viewmodel.refresh_experiments(reload=False)
     
     def _load_filter_options(self):
-        """加载过滤选项"""
-        if self.viewmodel:
-            nuclides = self.viewmodel.get_available_nuclides()
-            self.filter_combo.clear()
-            self.filter_combo.addItems(nuclides)
-    
-    def _populate_table(self, experiments: List[Experiment]):
-        """填充表格数据"""
-        self.experiment_table.setRowCount(len(experiments))
-        
-        for row, exp in enumerate(experiments):
-            # 实验名称
-            self.experiment_table.setItem(row, 0, QTableWidgetItem(exp.name))
-            
-            # 中心
-            self.experiment_table.setItem(row, 1, QTableWidgetItem(exp.center))
-            
-            # 日期
-            self.experiment_table.setItem(row, 2, QTableWidgetItem(exp.date))
-            
-            # 体模类型
-            self.experiment_table.setItem(row, 3, QTableWidgetItem(exp.model_type))
-            
-            # 核素
-            isotope = exp.parameters.get("isotope", "")
-            self.experiment_table.setItem(row, 4, QTableWidgetItem(isotope))
-            
-            # 设备型号
-            device = exp.parameters.get("device_model", "")
-            self.experiment_table.setItem(row, 5, QTableWidgetItem(device))
-            
-            # 创建时间
-            self.experiment_table.setItem(row, 6, QTableWidgetItem(exp.created_at))
-            
-            # 存储实验对象
-            self.experiment_table.item(row, 0).setData(Qt.UserRole, exp)
+        """按ViewModel的分面计数刷新各下拉框的选项（显示为“取值 (数量)”）"""
+        if not self.viewmodel:
+            return
+        counts = self.viewmodel.facet_counts
+        for field, combo in self.facet_combos.items():
+            current = combo.currentData()
+            values = [value for value in self.viewmodel.facet_values(field) if value]
+            field_counts = counts.get(field, {})
+            # 重建选项时保持当前选择，不触发过滤
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem("全部", None)
+            for value in values:
+                combo.addItem(f"{value} ({field_counts.get(value, 0)})", value)
+            index = combo.findData(current) if current is not None else 0
+            combo.setCurrentIndex(max(index, 0))
+            combo.blockSignals(False)
+            if current is not None and index < 0:
+                # 选中的取值已不存在
+                self._on_facet_changed(field)
+    
+    def _populate_table(self):
+        """显示ViewModel当前的过滤结果（只交给模型行号，不创建单元格对象）"""
+        self.table_model.set_rows(self.viewmodel.filtered_rows)
     
     def _on_search_changed(self):
         """搜索文本变化"""
@@ -272,19 +309,53 @@ class ExperimentListTab(QWidget):
             search_text = self.search_edit.text()
             self.viewmodel.search_text.value = search_text
     
-    def _on_filter_changed(self):
-        """过滤条件变化"""
+    def _on_facet_changed(self, field: str):
+        """分面下拉框选择变化"""
         if self.viewmodel:
-            filter_nuclide = self.filter_combo.currentText()
-            self.viewmodel.filter_nuclide.value = filter_nuclide
+            value = self.facet_combos[field].currentData()
+            self.viewmodel.set_facet(field, () if value is None else (value,))
+    
+    def _on_date_filter_toggled(self, enabled: bool):
+        """启用/停用日期范围，首次启用时取全部实验的日期范围"""
+        self.date_from_edit.setEnabled(enabled)
+        self.date_to_edit.setEnabled(enabled)
+        if enabled and self.viewmodel:
+            bounds = self.viewmodel.store.facets.date_bounds()
+            if bounds:
+                for edit, text in zip((self.date_from_edit, self.date_to_edit), bounds):
+                    edit.blockSignals(True)
+                    edit.setDate(QDate.fromString(text, "yyyy-MM-dd"))
+                    edit.blockSignals(False)
+        self._on_date_range_changed()
+    
+    def _on_date_range_changed(self):
+        """日期范围变化"""
+        if not self.viewmodel:
+            return
+        if self.date_filter_check.isChecked():
+            self.viewmodel.date_range.value = (self.date_from_edit.date().toString("yyyy-MM-dd"),
+                                               self.date_to_edit.date().toString("yyyy-MM-dd"))
+        else:
+            self.viewmodel.date_range.value = (None, None)
+    
+    def _on_clear_filters(self):
+        """清除全部分面和日期筛选"""
+        for combo in self.facet_combos.values():
+            combo.blockSignals(True)
+            combo.setCurrentIndex(0)
+            combo.blockSignals(False)
+        # 分面和日期条件一起清除，只触发一次过滤
+        with batch_updates():
+            self.date_filter_check.setChecked(False)
+            if self.viewmodel:
+                self.viewmodel.facet_filters.value = {}
     
     def _on_selection_changed(self):
         """选择变化"""
-        current_row = self.experiment_table.currentRow()
-        if current_row >= 0:
-            item = self.experiment_table.item(current_row, 0)
-            if item:
-                experiment = item.data(Qt.UserRole)
+        selected = self.experiment_table.selectionModel().selectedRows()
+        if selected:
+            experiment = self.table_model.experiment_at(selected[0].row())
+            if experiment:
                 self.current_experiment = experiment
                 self._update_detail_view(experiment)
                 self._update_button_states(True)
@@ -305,21 +376,7 @@ class ExperimentListTab(QWidget):
     
     def _update_detail_view(self, experiment: Experiment):
         """更新详情视图"""
-        if experiment:
-            detail_text = f"""<h3>{experiment.name}</h3>
-            <p><b>中心:</b> {experiment.center}</p>
-            <p><b>日期:</b> {experiment.date}</p>
-            <p><b>体模类型:</b> {experiment.model_type}</p>
-            <p><b>核素:</b> {experiment.parameters.get('isotope', 'N/A')}</p>
-            <p><b>设备型号:</b> {experiment.parameters.get('device_model', 'N/A')}</p>
-            <p><b>容器体积:</b> {experiment.parameters.get('volume', 0)} L</p>
-            <p><b>目标活度:</b> {experiment.parameters.get('target_activity', 0)} {experiment.parameters.get('activity_unit', 'MBq')}</p>
-            <p><b>创建时间:</b> {experiment.created_at}</p>
-            <p><b>备注:</b> {experiment.parameters.get('remark', '无')}</p>
-            """
-            self.detail_text.setHtml(detail_text)
-        else:
-            self.detail_text.setText("请选择一个实验查看详情")
+        self.detail_panel.show_experiment(experiment)
     
     def _update_button_states(self, has_selection: bool):
         """更新按钮状态"""
@@ -354,8 +411,8 @@ class ExperimentListTab(QWidget):
     def _on_add_experiment(self):
         """添加实验"""
         dialog = AddExperimentDialog(self)
-        dialog.experiment_created.connect(self._on_experiment_created)
-        dialog.exec_()
+        if dialog.exec_() == AddExperimentDialog.Accepted:
+            self._on_experiment_created(dialog.get_experiment_data())
     
     def _on_edit_experiment(self):
         """编辑实验"""
@@ -401,31 +458,53 @@ class ExperimentListTab(QWidget):
             self.viewmodel.refresh_experiments()
             self.status_label.setText("已刷新实验列表")
     
-    def _on_experiment_created(self, experiment: Experiment):
+    def _on_experiment_created(self, experiment_data: dict):
         """处理实验创建"""
         if self.viewmodel:
             try:
-                # 通过主ViewModel创建实验
-                from ....viewmodels.main_viewmodel import MainViewModel
-                main_viewmodel = MainViewModel()  # 这里应该是注入的实例
-                main_viewmodel.create_experiment(experiment)
+                # 通过共享的主ViewModel创建实验，不重新加载实验目录
+                experiment = AppContext.instance().main_viewmodel.create_experiment(experiment_data)
+                if experiment is None:
+                    QMessageBox.warning(self, "错误", "创建实验失败")
+                    return
+                # 与主ViewModel连接的列表已自动加入，其他列表在这里增量加入
+                if self.viewmodel.store.index_of(experiment.id) is None:
+                    self.viewmodel.add_experiments([experiment])
                 self.status_label.setText(f"已创建实验: {experiment.name}")
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"创建实验失败: {str(e)}")
     
-    def _on_experiment_added(self, experiment: Experiment, index: int):
-        """实验添加事件"""
-        self._populate_table(list(self.viewmodel.experiments))
-        self._load_filter_options()
+    def _on_experiments_inserted(self, start: int, experiments: List[Experiment]):
+        """实验批量加入：只把符合过滤条件的新行插入表格"""
+        rows = np.arange(start, start + len(experiments), dtype=np.int64)
+        self.table_model.insert_store_rows(self.viewmodel.matching_rows(rows))
     
-    def _on_experiment_removed(self, experiment: Experiment, index: int):
-        """实验移除事件"""
-        self._populate_table(list(self.viewmodel.experiments))
-        self._load_filter_options()
+    def _on_experiments_removed(self, start: int, experiments: List[Experiment]):
+        """实验批量移除：只删除表格中对应的行"""
+        self.table_model.remove_store_rows(np.arange(start, start + len(experiments), dtype=np.int64))
+        if self.current_experiment in experiments:
+            self.current_experiment = None
+            self._update_detail_view(None)
+            self._update_button_states(False)
+    
+    def _on_experiment_changed(self, index: int, visible: bool, changed: tuple):
+        """单个实验修改：只刷新表格中的这一行，排序列变化时才移动该行"""
+        self.table_model.update_store_row(index, visible, changed)
+        experiment = self.viewmodel.store.experiment(index)
+        self.detail_panel.invalidate(experiment.id)
+        # 按存储索引判断是否为当前选中的实验（复制的实验文件可能共用ID）
+        selected = self.experiment_table.selectionModel().selectedRows()
+        if selected and int(self.table_model.rows[selected[0].row()]) == index:
+            self.current_experiment = experiment
+            self._update_detail_view(experiment)
+    
+    def _on_experiments_reset(self):
+        """实验列表整体替换"""
+        self._populate_table()
     
     def _on_experiments_cleared(self):
         """实验列表清空事件"""
-        self.experiment_table.setRowCount(0)
+        self.table_model.set_rows([])
         self.current_experiment = None
         self._update_detail_view(None)
         self._update_button_states(False)
@@ -437,5 +516,4 @@ class ExperimentListTab(QWidget):
             self.refresh_button.setEnabled(False)
         else:
             self.status_label.setText("就绪")
-            self.refresh_button.setEnabled(True)
-            self._populate_table(list(self.viewmodel.experiments)) 
\ No newline at end of file
+            self.refresh_button.setEnabled(True) 
\ No newline at end of file
@@ -3,7 +3,7 @@ import csv
 import os
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QTableWidget, QTableWidgetItem, QPushButton, QMessageBox,
+    QTableView, QPushButton, QMessageBox,
     QAction, QTabWidget, QHeaderView, QTabBar, QFileDialog,
     QLineEdit, QLabel, QSplitter, QFrame, QStatusBar, QSizePolicy,
     QToolBar, QButtonGroup, QSpacerItem, QAbstractItemView
@@ -11,15 +11,20 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QSize, QThread, QObject
 from PyQt5.QtGui import QIcon, QFont, QPixmap, QCloseEvent
 
-from ...core.data_manager import DataManager
+from ...core.app_context import AppContext
+from ...core.query_executor import QueryExecutor
 from ...models.entities.experiment import Experiment
-from ...viewmodels.main_viewmodel import MainViewModel
+from ...models.listing.store import ExperimentListStore, SEARCH_FIELDS
+from ..common.widgets.experiment_table_model import ExperimentTableModel
 from ..dialogs.add_experiment_dialog import AddExperimentDialog
 from ..dialogs.activity_calculator_dialog import ActivityCalculatorDialog
 from ...core.constants import PHANTOM_TYPES, DEVICE_MODELS, ISOTOPE_LIST
 
+# 搜索框停止输入该时长（毫秒）后才执行查询
+SEARCH_DEBOUNCE_MS = 150
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, context: AppContext = None):
         super().__init__()
         self.setWindowTitle("PET 模体实验管理系统")
         
@@ -28,10 +33,18 @@ class MainWindow(QMainWindow):
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
 
-        # 初始化 DataManager 并加载所有实验
-        self.data_manager = DataManager()
-        self.all_experiments = self.data_manager.load_experiments()
-        self.filtered_experiments = self.all_experiments.copy()
+        # 共享的仓库和主ViewModel，实验目录只在首次创建时扫描
+        self.context = context or AppContext.instance()
+        self.viewmodel = self.context.main_viewmodel
+        self.all_experiments = self.viewmodel.get_experiments()
+        # 列表字段的列式存储，表格模型只按需读取可见单元格
+        self.store = ExperimentListStore(self.all_experiments)
+        # 搜索和排序在后台线程执行，新的输入作废旧查询
+        self.query_executor = QueryExecutor(self.store, self)
+        self.query_executor.results_ready.connect(self._on_query_results)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self._run_search)
 
         # 保存所有已打开的实验标签页
         self.experiment_tabs = {}
@@ -40,6 +53,7 @@ class MainWindow(QMainWindow):
         self.setStyleSheet(self.get_app_style("modern"))
 
         self.init_ui()
+        self.setup_connections()
         self.start_timer()
 
         logging.debug(f"初始化主窗口，加载 {len(self.all_experiments)} 个实验")
@@ -62,7 +76,7 @@ class MainWindow(QMainWindow):
         }
 
         /* 表格样式 - 与原版一致 */
-        QTableWidget {
+        QTableView {
             background-color: #ffffff;
             border: none;
             border-radius: 8px;
@@ -72,16 +86,16 @@ class MainWindow(QMainWindow):
             font-size: 15px;
         }
 
-        QTableWidget::item {
+        QTableView::item {
             padding: 8px 12px;
             border-bottom: 1px solid #e9ecef;
         }
 
-        QTableWidget::item:hover {
+        QTableView::item:hover {
             background-color: #f5f5f5;
         }
 
-        QTableWidget::item:selected {
+        QTableView::item:selected {
             background-color: #e3f2fd;
             color: #1976d2;
         }
@@ -361,11 +375,12 @@ class MainWindow(QMainWindow):
         home_layout.addWidget(separator)
 
         # 实验列表表格
-        self.experiment_table = QTableWidget()
-        self.experiment_table.setColumnCount(7)
-        self.experiment_table.setHorizontalHeaderLabels([
-            "实验名称", "中心名称", "日期", "模体类型", "核素", "设备型号", "备注"
-        ])
+        self.experiment_model = ExperimentTableModel(self.store, [
+            ("name", "实验名称"), ("center", "中心名称"), ("date", "日期"), ("model_type", "模体类型"),
+            ("isotope", "核素"), ("device_model", "设备型号"), ("remark", "备注")
+        ], self)
+        self.experiment_table = QTableView()
+        self.experiment_table.setModel(self.experiment_model)
         self.experiment_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.experiment_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.experiment_table.setAlternatingRowColors(True)
@@ -373,7 +388,7 @@ class MainWindow(QMainWindow):
         self.experiment_table.setSortingEnabled(True)
         
         # 连接双击信号到打开实验方法
-        self.experiment_table.itemDoubleClicked.connect(self.open_experiment)
+        self.experiment_table.doubleClicked.connect(self.open_experiment)
         
         # 设置表格字体大小
         table_font = self.experiment_table.font()
@@ -519,22 +534,37 @@ class MainWindow(QMainWindow):
         QTimer.singleShot(100, self._apply_column_widths)
 
     def filter_experiments(self, text):
-        """过滤实验列表"""
-        if not text.strip():
-            self.filtered_experiments = self.all_experiments.copy()
-        else:
-            text_lower = text.lower()
-            self.filtered_experiments = []
-            for exp in self.all_experiments:
-                if (text_lower in exp.name.lower() or
-                    text_lower in exp.center.lower() or
-                    text_lower in exp.parameters.get("isotope", "").lower() or
-                    text_lower in exp.model_type.lower() or
-                    text_lower in exp.parameters.get("device_model", "").lower() or
-                    text_lower in exp.parameters.get("remark", "").lower()):
-                    self.filtered_experiments.append(exp)
-        
-        self.update_experiment_table()
+        """搜索框输入：去抖后在后台线程中过滤和排序"""
+        self.search_timer.start(SEARCH_DEBOUNCE_MS)
+
+    def _list_query(self, text):
+        """按搜索文本和表格当前的排序方式生成列表查询，结果为 (存储索引, 排序方式)"""
+        store = self.store
+        sort_spec = self.experiment_model.sort_spec()
+
+        def query(checkpoint):
+            rows = store.search(text)
+            checkpoint()
+            if sort_spec:
+                rows = store.sort_rows(rows, sort_spec)
+            return rows, sort_spec
+        return query
+
+    def _run_search(self):
+        self.query_executor.submit(self._list_query(self.search_input.text()))
+
+    def _on_query_results(self, generation, result):
+        """后台查询完成：只把行号数组交给模型"""
+        rows, sort_spec = result
+        self.experiment_model.set_rows(rows, sorted_by=sort_spec)
+        self.update_status()
+
+    def refilter(self):
+        """数据变化后按当前搜索条件立即刷新表格（同步执行，作废未完成的后台查询）"""
+        self.search_timer.stop()
+        rows, sort_spec = self.query_executor.run_now(self._list_query(self.search_input.text()))
+        self.experiment_model.set_rows(rows, sorted_by=sort_spec)
+        self.update_status()
 
     def start_timer(self):
         """启动状态更新定时器"""
@@ -544,8 +574,8 @@ class MainWindow(QMainWindow):
 
     def update_status(self):
         """更新状态栏信息"""
-        exp_count = len(self.filtered_experiments)
-        total_count = len(self.all_experiments)
+        exp_count = self.experiment_model.rowCount()
+        total_count = len(self.store)
         if exp_count == total_count:
             message = f"共 {total_count} 个实验"
         else:
@@ -553,40 +583,9 @@ class MainWindow(QMainWindow):
         self.status_label.setText(message)
 
     def update_experiment_table(self):
-        """更新实验列表表格"""
-        self.experiment_table.setRowCount(len(self.filtered_experiments))
-        
-        for i, experiment in enumerate(self.filtered_experiments):
-            name_item = QTableWidgetItem(experiment.name)
-            name_item.setData(Qt.UserRole, experiment.id)
-            self.experiment_table.setItem(i, 0, name_item)
-            
-            center_item = QTableWidgetItem(experiment.center)
-            center_item.setData(Qt.UserRole, experiment.id)
-            self.experiment_table.setItem(i, 1, center_item)
-            
-            date_item = QTableWidgetItem(experiment.date)
-            date_item.setData(Qt.UserRole, experiment.id)
-            self.experiment_table.setItem(i, 2, date_item)
-            
-            model_item = QTableWidgetItem(experiment.model_type)
-            model_item.setData(Qt.UserRole, experiment.id)
-            self.experiment_table.setItem(i, 3, model_item)
-            
-            isotope_item = QTableWidgetItem(experiment.parameters.get('isotope', ''))
-            isotope_item.setData(Qt.UserRole, experiment.id)
-            self.experiment_table.setItem(i, 4, isotope_item)
-            
-            device_item = QTableWidgetItem(experiment.parameters.get('device_model', ''))
-            device_item.setData(Qt.UserRole, experiment.id)
-            self.experiment_table.setItem(i, 5, device_item)
-            
-            remark_item = QTableWidgetItem(experiment.parameters.get('remark', ''))
-            remark_item.setData(Qt.UserRole, experiment.id)
-            self.experiment_table.setItem(i, 6, remark_item)
-        
-        # 更新状态
-        self.update_status()
+        """用 all_experiments 重建列表存储，并按当前搜索条件刷新表格"""
+        self.store.load(self.all_experiments)
+        self.refilter()
 
     def new_experiment(self):
         """创建新实验"""
@@ -595,18 +594,14 @@ class MainWindow(QMainWindow):
             exp_data = dialog.get_experiment_data()
             if exp_data:
                 try:
-                    # 创建新实验
-                    experiment = self.data_manager.create_experiment(
-                        name=exp_data['name'],
-                        center=exp_data['center'],
-                        model_type=exp_data['model_type']
-                    )
+                    # 创建新实验（保存到仓库）
+                    experiment = self.viewmodel.create_experiment(exp_data)
                     
                     if experiment:
-                        # 更新实验列表
-                        self.all_experiments = self.data_manager.load_experiments()
-                        self.filtered_experiments = self.all_experiments.copy()
-                        self.update_experiment_table()
+                        # 只把新实验加入列表存储，不重新扫描实验目录
+                        self.all_experiments = self.viewmodel.get_experiments()
+                        self.store.add(experiment)
+                        self.refilter()
                         
                         # 自动打开新实验
                         self.open_experiment_tab(experiment)
@@ -618,32 +613,16 @@ class MainWindow(QMainWindow):
                     logging.error(f"创建实验失败: {e}")
                     QMessageBox.critical(self, "错误", f"创建实验失败: {str(e)}")
 
-    def open_experiment(self, item):
+    def open_experiment(self, index):
         """从表格中双击打开实验"""
-        row = item.row()
-        experiment_id_item = self.experiment_table.item(row, 0)
-        
-        if experiment_id_item is None:
-            return
-            
-        experiment_id = experiment_id_item.data(Qt.UserRole)
-        if experiment_id is None:
+        if not index.isValid():
             return
-            
-        # 在 all_experiments 中查找实验
-        experiment = None
-        for exp in self.all_experiments:
-            if hasattr(exp, 'id') and exp.id == experiment_id:
-                experiment = exp
-                break
-            elif hasattr(exp, 'experiment_id') and exp.experiment_id == experiment_id:
-                experiment = exp
-                break
-        
-        if experiment:
-            self.open_experiment_tab(experiment)
-        else:
-            QMessageBox.warning(self, "错误", "无法找到对应的实验数据")
+        self.open_experiment_tab(self.experiment_model.experiment_at(index.row()))
+
+    def selected_experiments(self):
+        """表格中选中的实验"""
+        rows = [index.row() for index in self.experiment_table.selectionModel().selectedRows()]
+        return self.experiment_model.experiments_for_rows(rows)
 
     def open_experiment_tab(self, experiment):
         """打开实验标签页"""
@@ -668,8 +647,19 @@ class MainWindow(QMainWindow):
         self.experiment_tabs[experiment_id] = experiment_widget
 
     def _on_experiment_updated(self, experiment):
-        """实验更新时的回调"""
-        self.update_experiment_table()
+        """实验更新时的回调（自动保存时每次编辑都会触发）：只刷新该实验所在的一行"""
+        index, changed = self.store.update_fields(experiment)
+        if index is None:
+            return
+        shown = self.experiment_model.row_of_index(index) is not None
+        visible = shown
+        text = self.search_input.text()
+        if text.strip() and any(field in SEARCH_FIELDS for field in changed):
+            # 搜索字段有变化时才重新判断是否符合搜索条件
+            visible = len(self.store.search(text, [index])) > 0
+        self.experiment_model.update_store_row(index, visible, changed)
+        if visible != shown:
+            self.update_status()
 
     def close_tab(self, index: int):
         """关闭标签页"""
@@ -693,20 +683,9 @@ class MainWindow(QMainWindow):
 
     def delete_experiment(self):
         """删除选中的实验"""
-        selected_items = self.experiment_table.selectedItems()
-        if not selected_items:
-            QMessageBox.warning(self, "提示", "请先选择要删除的实验")
-            return
-        
-        # 获取选中的实验（避免重复）
-        selected_experiments = set()
-        for item in selected_items:
-            if item.column() == 0:  # 只处理第一列的项目
-                experiment = item.data(Qt.UserRole)
-                if experiment:
-                    selected_experiments.add(experiment)
-        
+        selected_experiments = self.selected_experiments()
         if not selected_experiments:
+            QMessageBox.warning(self, "提示", "请先选择要删除的实验")
             return
         
         # 确认删除
@@ -720,7 +699,7 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.Yes:
             try:
-                deleted_count = 0
+                deleted = []
                 for experiment in selected_experiments:
                     # 先关闭相关的标签页
                     if experiment.id in self.experiment_tabs:
@@ -729,16 +708,17 @@ class MainWindow(QMainWindow):
                         if tab_index >= 0:
                             self.close_tab(tab_index)
                     
-                    # 删除实验
-                    if self.data_manager.delete_experiment(experiment.id):
-                        deleted_count += 1
+                    if self.viewmodel.delete_experiment(experiment):
+                        deleted.append(experiment)
                 
-                # 重新加载数据
-                self.all_experiments = self.data_manager.load_experiments()
-                self.filtered_experiments = self.all_experiments.copy()
-                self.update_experiment_table()
+                # 只从列表中移除删除的行，存储一次重新编号
+                removed = self.store.remove_many(deleted)
+                if removed:
+                    self.experiment_model.remove_store_rows(removed)
+                self.all_experiments = self.viewmodel.get_experiments()
+                self.update_status()
                 
-                self.status_bar.showMessage(f"成功删除 {deleted_count} 个实验", 3000)
+                self.status_bar.showMessage(f"成功删除 {len(deleted)} 个实验", 3000)
                 
             except Exception as e:
                 logging.error(f"删除实验失败: {e}")
@@ -746,10 +726,10 @@ class MainWindow(QMainWindow):
 
     def export_to_csv(self, export_all=False):
         """导出数据到CSV文件"""
+        selected_experiments = [] if export_all else self.selected_experiments()
         if not export_all:
             # 检查是否有选中的实验
-            selected_items = self.experiment_table.selectedItems()
-            if not selected_items:
+            if not selected_experiments:
                 reply = QMessageBox.question(
                     self, "导出确认",
                     "没有选中任何实验，是否导出所有实验数据？",
@@ -765,7 +745,7 @@ class MainWindow(QMainWindow):
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "导出实验数据",
-            f"experiments_{len(self.filtered_experiments if export_all else 'selected')}.csv",
+            f"experiments_{self.experiment_model.rowCount() if export_all else 'selected'}.csv",
             "CSV文件 (*.csv)"
         )
         
@@ -785,16 +765,9 @@ class MainWindow(QMainWindow):
                 
                 # 确定要导出的实验
                 if export_all:
-                    experiments_to_export = self.filtered_experiments
+                    experiments_to_export = self.experiment_model.visible_experiments()
                 else:
-                    # 获取选中的实验
-                    selected_experiments = set()
-                    for item in selected_items:
-                        if item.column() == 0:  # 只处理第一列
-                            experiment = item.data(Qt.UserRole)
-                            if experiment:
-                                selected_experiments.add(experiment)
-                    experiments_to_export = list(selected_experiments)
+                    experiments_to_export = selected_experiments
                 
                 # 写入数据
                 for experiment in experiments_to_export:
@@ -829,7 +802,7 @@ class MainWindow(QMainWindow):
         """保存所有数据"""
         try:
             # 保存所有实验数据
-            self.data_manager.save_all_data(self.all_experiments)
+            self.viewmodel.save_all_data()
             self.status_bar.showMessage("数据保存成功", 2000)
         except Exception as e:
             logging.error(f"保存数据失败: {e}")
@@ -838,9 +811,8 @@ class MainWindow(QMainWindow):
     def refresh_data(self):
         """刷新数据"""
         try:
-            self.all_experiments = self.data_manager.load_experiments()
-            self.filtered_experiments = self.all_experiments.copy()
-            self.update_experiment_table()
+            # 重新扫描实验目录，完成后经 experiments_loaded 刷新表格
+            self.viewmodel.load_experiments()
             self.status_bar.showMessage("数据刷新成功", 2000)
         except Exception as e:
             logging.error(f"刷新数据失败: {e}")
@@ -849,7 +821,6 @@ class MainWindow(QMainWindow):
     def on_experiments_loaded(self, experiments):
         """实验加载完成回调"""
         self.all_experiments = experiments
-        self.filtered_experiments = experiments.copy()
         self.update_experiment_table()
 
     def show_error(self, message):
@@ -862,9 +833,11 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """重写关闭事件"""
+        self.query_executor.cancel()
+        self.query_executor.wait()
         try:
             # 保存所有数据
-            self.data_manager.save_all_data()
+            self.viewmodel.save_all_data()
             event.accept()
         except Exception as e:
             logging.error(f"关闭程序时保存数据失败: {e}")
@@ -873,8 +846,7 @@ class MainWindow(QMainWindow):
 
     def load_experiments(self):
         """加载实验数据"""
-        experiments = self.data_manager.load_experiments()
-        self.viewmodel.set_experiments(experiments)
+        self.viewmodel.load_experiments()
         
     def setup_menu(self):
         """设置菜单栏 - 简化版本，只保留必要功能"""